@@ -0,0 +1,398 @@
+import abc
+import errno
+import math
+import random
+import time
+from pathlib import Path
+
+from channel_health import FULL_SCALE
+from recorder import SEGMENT_SUFFIX, iter_samples
+from sensors import parse_gain
+
+ROOT = Path(__file__).parent.parent
+
+# Named noise profiles for `noise` in a channel spec
+NOISE_PROFILES = {
+    'none': {},
+    'quiet': {'gaussian_v': 0.0005},
+    # Engine running: alternator ripple on the sender supply plus ignition spikes
+    'engine': {'gaussian_v': 0.002, 'ripple_v': 0.004, 'ripple_hz': 180.0, 'spike_rate': 0.002, 'spike_v': 0.3},
+    'harsh': {'gaussian_v': 0.01, 'ripple_v': 0.02, 'ripple_hz': 180.0, 'spike_rate': 0.02, 'spike_v': 1.0},
+}
+
+# Channels without a spec: mid-scale drift with a little noise. A noiseless
+# constant would read the same code forever, which is a stuck sender.
+DEFAULT_CHANNEL = {'waveform': {'type': 'sine', 'offset': 2.0, 'amplitude': 0.25, 'period_s': 60.0},
+                   'noise': 'quiet'}
+
+# Faults for one channel, and the bus-wide one (in `emulation.faults`)
+I2C_ERROR = 'i2c_error'
+STUCK = 'stuck'
+OPEN_CIRCUIT = 'open_circuit'
+SHORT = 'short'
+BUS_HANG = 'bus_hang'
+CHANNEL_FAULTS = (I2C_ERROR, STUCK, OPEN_CIRCUIT, SHORT)
+
+# errno the Linux I2C driver returns for a NACK (not defined on macOS)
+EREMOTEIO = getattr(errno, 'EREMOTEIO', 121)
+
+# Time for the config write + conversion register read on a 100 kHz bus
+I2C_OVERHEAD_S = 0.0004
+
+
+class Waveform(abc.ABC):
+    """Sender output in volts as a function of emulated time (seconds)."""
+
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def __call__(self, t):
+        """Volts at emulated time t."""
+
+
+class Constant(Waveform):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = float(value)
+
+    def __call__(self, t):
+        return self.value
+
+
+class Ramp(Waveform):
+    """Linear sweep from start to end over period_s, then repeat (or hold the end)."""
+
+    __slots__ = ('start', 'end', 'period', 'repeat')
+
+    def __init__(self, start, end, period, repeat=True):
+        self.start = float(start)
+        self.end = float(end)
+        self.period = float(period)
+        self.repeat = repeat
+
+    def __call__(self, t):
+        if self.repeat:
+            t %= self.period
+        elif t >= self.period:
+            return self.end
+        return self.start + (self.end - self.start) * t / self.period
+
+
+class Sine(Waveform):
+    __slots__ = ('offset', 'amplitude', 'omega', 'phase')
+
+    def __init__(self, offset, amplitude, period, phase=0.0):
+        self.offset = float(offset)
+        self.amplitude = float(amplitude)
+        self.omega = 2 * math.pi / float(period)
+        self.phase = float(phase)
+
+    def __call__(self, t):
+        return self.offset + self.amplitude * math.sin(self.omega * t + self.phase)
+
+
+class Step(Waveform):
+    __slots__ = ('before', 'after', 'at')
+
+    def __init__(self, before, after, at):
+        self.before = float(before)
+        self.after = float(after)
+        self.at = float(at)
+
+    def __call__(self, t):
+        return self.after if t >= self.at else self.before
+
+
+class Trace(Waveform):
+    """Linear interpolation over (t, volts) points, looped or held at the last point."""
+
+    __slots__ = ('times', 'volts', 'duration', 'loop', '_index')
+
+    def __init__(self, points, loop=True):
+        if not points:
+            raise ValueError("trace has no points")
+        points = sorted(points)
+        t0 = points[0][0]
+        self.times = [t - t0 for t, _ in points]
+        self.volts = [float(v) for _, v in points]
+        self.duration = self.times[-1]
+        self.loop = loop
+        self._index = 0
+
+    def __call__(self, t):
+        if self.duration <= 0:
+            return self.volts[0]
+        if self.loop:
+            t %= self.duration
+        elif t >= self.duration:
+            return self.volts[-1]
+        times = self.times
+        # Reads move forward in time, so search on from the last position
+        i = self._index
+        if times[i] > t:
+            i = 0
+        while times[i + 1] < t:
+            i += 1
+        self._index = i
+        span = times[i + 1] - times[i]
+        if span <= 0:
+            return self.volts[i + 1]
+        return self.volts[i] + (self.volts[i + 1] - self.volts[i]) * (t - times[i]) / span
+
+
+def invert_calibration(convert, value, low, high, iterations=40):
+    """Voltage in [low, high] that `convert` maps to `value` (bisection; clipped to the ends)."""
+    v_low, v_high = convert(low), convert(high)
+    rising = v_high >= v_low
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        if (convert(mid) < value) == rising:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def trip_points(trip, metric, convert, full_scale=4.096):
+    """(t, volts) points for `metric` from a recorded trip, via the calibration inverse.
+
+    trip is a trip id path such as data/trips/trip-20261017-081500 (relative
+    to the repo root); all of its segments are read in order.
+    """
+    base = Path(trip)
+    if not base.is_absolute():
+        base = ROOT / base
+    paths = sorted(base.parent.glob(f'{base.name}-*{SEGMENT_SUFFIX}'))
+    if not paths:
+        raise ValueError(f"No recorded segments for trip '{trip}'")
+    # Keep clear of 0V, where resistance calibrations divide by zero
+    low = full_scale * 0.001
+    points = []
+    for sample in iter_samples(paths):
+        if metric in sample:
+            points.append((sample['timestamp'], invert_calibration(convert, sample[metric], low, full_scale)))
+    return points
+
+
+def build_waveform(spec, converters=None, full_scale=4.096):
+    """Build a Waveform from a channel's `waveform` spec."""
+    kind = spec.get('type', 'constant')
+    if kind == 'constant':
+        return Constant(spec.get('value', 0.0))
+    if kind == 'ramp':
+        return Ramp(spec.get('start', 0.0), spec.get('end', full_scale), spec.get('period_s', 60.0),
+                    spec.get('repeat', True))
+    if kind == 'sine':
+        return Sine(spec.get('offset', full_scale / 2), spec.get('amplitude', 0.5), spec.get('period_s', 10.0),
+                    spec.get('phase', 0.0))
+    if kind == 'step':
+        return Step(spec.get('before', 0.0), spec.get('after', full_scale), spec.get('at_s', 10.0))
+    if kind == 'trace':
+        if 'points' in spec:
+            points = spec['points']
+        else:
+            metric = spec['metric']
+            convert = (converters or {}).get(metric)
+            if convert is None:
+                raise ValueError(f"No calibration to convert recorded '{metric}' back to volts")
+            points = trip_points(spec['trip'], metric, convert, full_scale)
+        return Trace(points, spec.get('loop', True))
+    raise ValueError(f"Unknown waveform type '{kind}'")
+
+
+class _Fault:
+    __slots__ = ('kind', 'start', 'end', 'rate', 'value', 'held')
+
+    def __init__(self, spec):
+        self.kind = spec['type']
+        self.start = float(spec.get('at_s', 0.0))
+        duration = spec.get('duration_s')
+        self.end = None if duration is None else self.start + float(duration)
+        self.rate = float(spec.get('rate', 1.0))
+        self.value = spec.get('value')
+        self.held = None
+
+    def active(self, t):
+        return t >= self.start and (self.end is None or t < self.end)
+
+
+class _Channel:
+    __slots__ = ('waveform', 'rng', 'gain', 'full_scale', 'lsb', 'data_rate', 'faults',
+                 'gaussian', 'ripple', 'ripple_omega', 'spike_rate', 'spike')
+
+    def __init__(self, waveform, rng, gain, data_rate, noise, faults):
+        self.waveform = waveform
+        self.rng = rng
+        self.gain = gain
+        self.full_scale = FULL_SCALE.get(gain, 4.096)
+        self.lsb = self.full_scale / 32768
+        self.data_rate = data_rate
+        self.faults = faults
+        if isinstance(noise, str):
+            noise = NOISE_PROFILES[noise]
+        self.gaussian = float(noise.get('gaussian_v', 0.0))
+        self.ripple = float(noise.get('ripple_v', 0.0))
+        self.ripple_omega = 2 * math.pi * float(noise.get('ripple_hz', 0.0))
+        self.spike_rate = float(noise.get('spike_rate', 0.0))
+        self.spike = float(noise.get('spike_v', 0.0))
+
+
+class EmulatedADS1115:
+    """Deterministic stand-in for ADS1115Driver, for mock mode, tests and benchmarks.
+
+    Each channel's sender is a waveform (constant, ramp, sine, step, or a
+    trace: explicit points or a recorded trip played back through the
+    inverse of its calibration) plus a noise profile, and optional faults:
+    i2c_error reads raise OSError with probability `rate`, stuck repeats the
+    reading from when the fault started, open_circuit reads ~0V and short
+    reads full scale. A bus_hang fault in `emulation.faults` fails every read
+    until reset() is called, like a wedged I2C bus. Readings are clipped and
+    quantised to the 16-bit code at the channel's gain, and each channel
+    draws noise from its own RNG seeded from `seed`, so a run is reproducible.
+    Only channels with faults configured are listed in fault_channels for
+    the health monitor's stuck/open-circuit checks: a noiseless constant
+    elsewhere is a deliberate fixed reading, not a frozen converter.
+
+    With realtime, waveforms follow the wall clock since start and every read
+    sleeps for its conversion time (1/data_rate in single-shot mode, plus the
+    I2C transfer). Otherwise time is virtual: it starts at 0 and advances by
+    the conversion time of each read, plus advance(). Gain, data rate and
+    mode come from the same `sensors.adc` block as the real driver.
+
+    emulation (the `sensors.emulation` config block) supports:
+        seed: RNG seed (default 0)
+        realtime: follow the wall clock and sleep conversions (default false)
+        channels: {"<n>": {"waveform": {...}, "noise": "engine" or {...}, "faults": [...]}};
+            channels left out get DEFAULT_CHANNEL
+        faults: bus-wide faults ([{"type": "bus_hang", "at_s": ..., "duration_s": ...}])
+    """
+
+    def __init__(self, channels, adc_config=None, emulation=None, converters=None, clock=None, sleep=None):
+        cfg = adc_config or {}
+        emu = emulation or {}
+        default_gain = parse_gain(cfg.get('gain', 1))
+        default_rate = int(cfg.get('data_rate', 128))
+        overrides = cfg.get('channels', {})
+        mode = cfg.get('mode', 'auto')
+        self.channels = tuple(channels)
+        self.continuous = mode == 'continuous' or (mode == 'auto' and len(self.channels) == 1)
+        self.seed = emu.get('seed', 0)
+
+        specs = emu.get('channels', {})
+        self._channels = {}
+        for channel in self.channels:
+            override = overrides.get(str(channel), {})
+            spec = specs.get(str(channel), DEFAULT_CHANNEL)
+            gain = parse_gain(override.get('gain', default_gain))
+            faults = [_Fault(fault) for fault in spec.get('faults', ())]
+            for fault in faults:
+                if fault.kind not in CHANNEL_FAULTS:
+                    raise ValueError(f"Unknown fault type '{fault.kind}' on channel {channel}")
+            self._channels[channel] = _Channel(
+                build_waveform(spec.get('waveform', {}), converters, FULL_SCALE.get(gain, 4.096)),
+                # Seeded per channel, so adding a channel doesn't change the others
+                random.Random(f'{self.seed}:{channel}'),
+                gain,
+                int(override.get('data_rate', default_rate)),
+                spec.get('noise', 'none'),
+                faults,
+            )
+        self._bus_faults = [_Fault(fault) for fault in emu.get('faults', ())]
+        for fault in self._bus_faults:
+            if fault.kind != BUS_HANG:
+                raise ValueError(f"Unknown bus fault type '{fault.kind}'")
+        self._cleared = None
+
+        self.realtime = emu.get('realtime', False)
+        if self.realtime:
+            self.clock = clock or time.monotonic
+            self.sleep = sleep or time.sleep
+            self._start = self.clock()
+        else:
+            self.clock = None
+            self.sleep = None
+        self._t = 0.0
+        self.conversions = 0
+        self.busy_s = 0.0
+
+    @property
+    def fault_channels(self):
+        """Channels with injected faults: the only ones worth checking for stuck/open/short patterns."""
+        return tuple(channel for channel, ch in self._channels.items() if ch.faults)
+
+    def now(self):
+        """Emulated time in seconds."""
+        if self.realtime:
+            return self.clock() - self._start
+        return self._t
+
+    def advance(self, seconds):
+        """Move virtual time on, e.g. by the sample interval between polls."""
+        self._t += seconds
+
+    def _spend(self, seconds):
+        self.busy_s += seconds
+        if self.realtime:
+            self.sleep(seconds)
+        else:
+            self._t += seconds
+
+    def read_channel(self, channel):
+        ch = self._channels[channel]
+        conversion = 1.0 / ch.data_rate
+        # Single-shot: start a conversion and wait for it; continuous: fetch the latest result
+        self._spend(I2C_OVERHEAD_S if self.continuous else conversion + I2C_OVERHEAD_S)
+        now = self.now()
+        # Continuous: the result is from the last completed conversion
+        t = math.floor(now / conversion) * conversion if self.continuous else now
+        self.conversions += 1
+
+        for fault in self._bus_faults:
+            if fault.active(now) and (self._cleared is None or self._cleared < fault.start):
+                raise OSError(errno.EIO, 'I2C bus hung')
+
+        volts = None
+        for fault in ch.faults:
+            if not fault.active(now):
+                fault.held = None
+                continue
+            kind = fault.kind
+            if kind == I2C_ERROR:
+                if ch.rng.random() < fault.rate:
+                    raise OSError(EREMOTEIO, 'Remote I/O error')
+            elif kind == STUCK:
+                if fault.held is None:
+                    fault.held = self._sample(ch, t) if fault.value is None else self._quantise(ch, fault.value)
+                return fault.held
+            elif kind == OPEN_CIRCUIT:
+                volts = 0.0
+            elif kind == SHORT:
+                volts = ch.full_scale
+        if volts is None:
+            return self._sample(ch, t)
+        return self._quantise(ch, volts)
+
+    def _sample(self, ch, t):
+        volts = ch.waveform(t)
+        if ch.gaussian:
+            volts += ch.rng.gauss(0.0, ch.gaussian)
+        if ch.ripple:
+            volts += ch.ripple * math.sin(ch.ripple_omega * t)
+        if ch.spike_rate and ch.rng.random() < ch.spike_rate:
+            volts += ch.spike if ch.rng.random() < 0.5 else -ch.spike
+        return self._quantise(ch, volts)
+
+    def _quantise(self, ch, volts):
+        code = max(-32768, min(32767, round(volts / ch.lsb)))
+        return code * ch.lsb
+
+    def read_all(self):
+        """Read every configured channel in one pass. Returns {channel: voltage}."""
+        read = self.read_channel
+        return {channel: read(channel) for channel in self.channels}
+
+    def reset(self):
+        """Reopen the emulated bus: clears a bus_hang that has started."""
+        self._spend(I2C_OVERHEAD_S)
+        self._cleared = self.now()
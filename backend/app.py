@@ -1,28 +1,58 @@
-from flask import Flask, jsonify, request as flask_request
-from flask_socketio import SocketIO, emit
+# Must stay first: times every import below when BACKEND_PROFILE_STARTUP is set
+from startup_profile import profiler
+
+from flask import Flask, Response, jsonify, request as flask_request
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_cors import CORS
 import time
-import threading
 import random
 import os
-import json
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 
 from sensors import SensorInterface
+from sampler import SensorSampler
+from broadcaster import TelemetryBroadcaster
+from history import TelemetryHistory
+from recorder import TripRecorder, list_trips, iter_samples
+from replay import TripReplayer, parse_speed
+from battery import DischargeEstimator
+from power import PowerStateMachine, ONLINE, ON_BATTERY, GRACE, SHUTDOWN
+from shutdown import ShutdownCoordinator, POWEROFF, REBOOT
+from warmstart import WarmStartStore
+from config_service import ConfigService, changed_keys, restart_required
+from metrics import metrics
+from wire import JSON, BINARY, WIRE_VERSION, encode_frame, schema
+from warning_engine import WarningEngine
+from journal import EventJournal, POWER, SYSTEM
+
+profiler.mark('imports')
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Load centralized configuration
+# Load centralized configuration. CONFIG is the snapshot the backend started
+# with; code that follows live edits reads config_service.snapshot instead.
 config_path = Path(__file__).parent / '..' / 'config' / 'config.json'
-with open(config_path, 'r') as f:
-    CONFIG = json.load(f)
+config_service = ConfigService(config_path)
+CONFIG = config_service.snapshot.config
+profiler.mark('config_loaded')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 app.config['SECRET_KEY'] = 'secret!'
-socketio = SocketIO(app, cors_allowed_origins="*")
+# 'threading' for `python app.py` during development. server.py sets 'gevent' so
+# one event loop serves every client and background loops run as greenlets.
+async_mode = os.getenv('BACKEND_ASYNC_MODE', 'threading')
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=async_mode)
+
+def run_blocking(fn, args=()):
+    """Run a blocking hardware/disk call without stalling the event loop."""
+    if async_mode == 'gevent':
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return fn(*args)
 
 # Use environment variable to control mock mode (overrides config.json)
 mock_mode = os.getenv('MOCK_SENSORS', str(CONFIG['sensors']['mock_mode'])).lower() == 'true'
@@ -31,61 +61,477 @@ print(f"Starting sensor interface in {'MOCK' if mock_mode else 'HARDWARE'} mode"
 from ups import UPSInterface
 
 # Initialize sensor interface with config
+update_interval_ms = CONFIG['sensors']['update_interval_ms']
 sensor_interface = SensorInterface(
     mock=mock_mode,
     alpha=CONFIG['sensors']['smoothing']['alpha'],
-    config=CONFIG['sensors']['calibration']
+    config=CONFIG['sensors']['calibration'],
+    ema_period=update_interval_ms / 1000.0,
+    adc_config=CONFIG['sensors'].get('adc'),
+    smoothing=CONFIG['sensors']['smoothing'],
+    health=CONFIG['sensors'].get('health'),
+    emulation=CONFIG['sensors'].get('emulation'),
+    defer_hardware=True
 )
+profiler.mark('sensor_interface')
+
+# The sampler thread is the only reader of the ADC; request handlers use its snapshot
+sampler = SensorSampler(sensor_interface, interval_ms=update_interval_ms, run_blocking=run_blocking)
+
+# In-memory telemetry history for trend queries
+history_config = CONFIG['sensors'].get('history', {})
+telemetry_history = TelemetryHistory(
+    metrics=['oil_pressure', 'water_temp', 'voltage'],
+    retention=history_config.get('retention')
+)
+if history_config.get('enabled', True):
+    sampler.add_listener(telemetry_history.add)
 
 # Initialize UPS Interface
-ups_interface = UPSInterface(mock=mock_mode)
+ups_config = CONFIG.get('ups', {})
+ups_interface = UPSInterface(
+    mock=mock_mode,
+    estimator=DischargeEstimator(
+        window=ups_config.get('estimator_window_s', 300),
+        cutoff_voltage=ups_config.get('cutoff_voltage', 3.4),
+        cutoff_capacity=ups_config.get('cutoff_capacity', 5)
+    ),
+    shutdown_reserve=ups_config.get('shutdown_reserve_s', 20),
+    connect=False
+)
+profiler.mark('ups_interface')
+
+# Trip recorder: buffers samples in RAM and writes compressed chunks rarely
+recorder_config = CONFIG.get('recorder', {})
+trip_recorder = None
+if recorder_config.get('enabled', False):
+    trip_recorder = TripRecorder(
+        Path(__file__).parent / '..' / recorder_config.get('directory', 'data/trips'),
+        flush_interval=recorder_config.get('flush_interval_s', 300),
+        max_segment_bytes=int(recorder_config.get('max_segment_mb', 8) * 1024 * 1024),
+        compression_level=recorder_config.get('compression_level', 6),
+        run_blocking=run_blocking
+    )
+    sampler.add_listener(lambda snapshot, timestamp: trip_recorder.record(
+        snapshot, timestamp, ups_interface.get_status()))
+
+# Alarm journal: threshold excursions and power events, for diagnosis after a drive
+journal_config = CONFIG.get('journal', {})
+event_journal = None
+if journal_config.get('enabled', False):
+    event_journal = EventJournal(
+        Path(__file__).parent / '..' / journal_config.get('path', 'data/events/events.jsonl'),
+        capacity=journal_config.get('capacity', 1000),
+        flush_interval=journal_config.get('flush_interval_s', 300),
+        max_file_bytes=int(journal_config.get('max_file_kb', 512) * 1024)
+    )
+    event_journal.load()
+
+# Warm start: restore filter state, battery readings and discharge rates
+# saved by the previous run so gauges are settled from the first sample
+warm_start_config = CONFIG.get('warm_start', {})
+warm_start = None
+if warm_start_config.get('enabled', False):
+    warm_start = WarmStartStore(
+        Path(__file__).parent / '..' / warm_start_config.get('path', 'data/warm_start.bin'),
+        min_interval=warm_start_config.get('save_interval_s', 300),
+        max_age=warm_start_config.get('max_age_s')
+    )
+    restored = warm_start.load()
+    if 'sensors' in restored:
+        sensor_interface.restore_filter_state(restored['sensors'], warm_start_config.get('tolerance'))
+    if 'ups' in restored:
+        ups_interface.restore_battery_readings(restored['ups'])
+    if 'discharge' in restored:
+        ups_interface.estimator.restore_rates(restored['discharge'])
+
+def warm_state():
+    return {
+        'sensors': sensor_interface.filter_state(),
+        'ups': ups_interface.battery_readings(),
+        'discharge': ups_interface.estimator.rates(),
+    }
+
+# Hardware comes up in the background so the server can accept clients
+# straight away; /api/health reports progress.
+started_at = time.monotonic()
+component_status = {
+    'sensors': {'state': 'starting'},
+    'ups': {'state': 'starting'},
+}
+
+def sensors_init_error():
+    """Why the ADC isn't in use although hardware mode was asked for, or None."""
+    if not mock_mode and sensor_interface.mock:
+        return f"ADC unavailable, using mock readings: {sensor_interface.hardware_error}"
+    return None
+
+def ups_init_error():
+    """Why the UPS serial port isn't open in hardware mode, or None."""
+    if not ups_interface.mock and not ups_interface.available:
+        return f"UPS serial port not open: {ups_interface.error}"
+    return None
+
+def init_component(name, init, check=None, blocking=False):
+    """Run init() and record the component's state. check() returns an error
+    message when init() fell back quietly instead of raising."""
+    start = time.monotonic()
+    try:
+        run_blocking(init) if blocking else init()
+        error = check() if check else None
+        if error:
+            print(f"Error initialising {name}: {error}")
+            component_status[name] = {'state': 'failed', 'error': error}
+        else:
+            component_status[name] = {'state': 'ready'}
+    except Exception as e:
+        print(f"Error initialising {name}: {e}")
+        component_status[name] = {'state': 'failed', 'error': str(e)}
+    component_status[name]['init_ms'] = round((time.monotonic() - start) * 1000)
+    profiler.mark(f'{name}_ready')
+
+# The ADC imports board/busio and probes I2C, so it runs on a native thread.
+# The serial port opens quickly but starts the reader, so it stays on the loop.
+socketio.start_background_task(init_component, 'sensors', sensor_interface.init_hardware, sensors_init_error,
+                               blocking=True)
+socketio.start_background_task(init_component, 'ups', ups_interface.connect, ups_init_error)
+
+def on_first_sample(snapshot, timestamp):
+    profiler.mark('first_sample')
+    if not CONFIG['sensors'].get('broadcast', {}).get('enabled', True):
+        profiler.finish()
+
+if profiler.enabled:
+    sampler.add_listener(on_first_sample)
+
+sampler.start()
+
+# Ordered shutdown: hooks run before every power-off or reboot
+shutdown_config = CONFIG.get('shutdown', {})
+POWER_COMMANDS = {
+    POWEROFF: shutdown_config.get('poweroff_command', 'sudo shutdown -h now'),
+    REBOOT: shutdown_config.get('reboot_command', 'sudo reboot'),
+}
+
+def power_off(action):
+    """Run the power command. Returns False when skipped; raises if the command fails."""
+    if mock_mode and action == POWEROFF:
+        print("🛑 Mock mode: skipping power-off")
+        return False
+    status = os.system(POWER_COMMANDS[action])
+    if status != 0:
+        raise OSError(f"'{POWER_COMMANDS[action]}' exited with status {status}")
+    return True
+
+shutdown_coordinator = ShutdownCoordinator(power_off, deadline=shutdown_config.get('deadline_s', 15))
+hook_budgets = shutdown_config.get('hook_budgets_s', {})
+
+def notify_clients_of_shutdown():
+    socketio.emit('system_shutdown', {
+        'action': shutdown_coordinator.action,
+        'deadline_s': shutdown_coordinator.deadline
+    })
+
+def release_carplay():
+    # Let the CarPlay server close the dongle cleanly before power goes
+    import requests
+    carplay_port = CONFIG.get('carplay', {}).get('port', 5006)
+    requests.post(f'http://127.0.0.1:{carplay_port}/release', timeout=hook_budgets.get('carplay', 3))
+
+shutdown_coordinator.register('notify_clients', notify_clients_of_shutdown,
+                              priority=0, budget=hook_budgets.get('notify_clients', 0.5))
+if trip_recorder:
+    shutdown_coordinator.register('trip_recorder', lambda: trip_recorder.flush(
+        wait=True, timeout=hook_budgets.get('trip_recorder', 5)),
+        priority=10, budget=hook_budgets.get('trip_recorder', 5))
+def save_warm_start():
+    # Hooks are greenlets under gevent: keep the disk writes off the event loop
+    run_blocking(warm_start.save, (warm_state(), True))
+
+if warm_start:
+    shutdown_coordinator.register('warm_start', save_warm_start,
+                                  priority=10, budget=hook_budgets.get('warm_start', 1))
+def close_journal():
+    event_journal.record(SYSTEM, action=shutdown_coordinator.action)
+    run_blocking(event_journal.flush, (True,))
+
+if event_journal:
+    shutdown_coordinator.register('journal', close_journal,
+                                  priority=10, budget=hook_budgets.get('journal', 1))
+if CONFIG.get('carplay', {}).get('enabled', False):
+    shutdown_coordinator.register('carplay', release_carplay,
+                                  priority=10, budget=hook_budgets.get('carplay', 3))
+
+# UPS power state machine, fed by every parsed UPS frame
+power_state = PowerStateMachine(
+    loss_voltage=ups_config.get('loss_voltage', 4.0),
+    restore_voltage=ups_config.get('restore_voltage', 4.5),
+    debounce=ups_config.get('debounce_ms', 300) / 1000.0,
+    confirm=ups_config.get('confirm_s', 2),
+    grace_period=ups_config.get('grace_period_s', 60),
+    min_grace_period=ups_config.get('min_grace_period_s', 15),
+    max_grace_period=ups_config.get('max_grace_period_s', 900)
+)
+
+def on_ups_frame(ups):
+    # Let the battery model move the shutdown deadline before evaluating the frame
+    power_state.set_runtime_estimate(ups.safe_runtime())
+    power_state.update(ups.input_voltage)
+
+ups_interface.add_listener(on_ups_frame)
+
+def on_power_transition(previous, state, info):
+    """React to UPS state changes and tell every client."""
+    if event_journal:
+        event_journal.record(POWER, state=state, previous=previous, input_voltage=info['input_voltage'],
+                             battery_capacity=ups_interface.capacity)
+    if state == ON_BATTERY:
+        print(f"⚠️ Power Loss Detected! (Vin: {info['input_voltage']}V)")
+        if trip_recorder:
+            # Get the trip onto the card while we still have battery
+            trip_recorder.flush()
+        if event_journal:
+            socketio.start_background_task(run_blocking, event_journal.flush, (True,))
+    elif state == GRACE:
+        print(f"⚠️ Running on battery. Shutdown in {info['seconds_remaining']:.0f}s")
+    elif state == ONLINE:
+        print("✅ Power Restored. Shutdown cancelled.")
+    elif state == SHUTDOWN:
+        print("🛑 Initiating System Shutdown...")
+        shutdown_coordinator.start(POWEROFF)
+    socketio.emit('ups_state', info)
+
+power_state.add_listener(on_power_transition)
 
 def monitor_ups():
-    """Background thread to monitor UPS and trigger shutdown if needed."""
-    shutdown_counter = 0
-    SHUTDOWN_LIMIT = 60  # Seconds
-    
+    """Background task advancing UPS grace timers between serial frames."""
     while True:
-        status = ups_interface.get_status()
-        if status['available']:
-            # Logic: If Input Voltage (Vin) < 4.0V, we are on battery
-            if status.get('input_voltage', 5.0) < 4.0:
-                shutdown_counter += 1
-                print(f"⚠️ Power Loss Detected! Shutdown in {SHUTDOWN_LIMIT - shutdown_counter}s (Vin: {status.get('input_voltage')}V)")
-            else:
-                if shutdown_counter > 0:
-                    print("✅ Power Restored. Shutdown cancelled.")
-                shutdown_counter = 0
-                
-            if shutdown_counter >= SHUTDOWN_LIMIT:
-                print("🛑 Initiating System Shutdown...")
-                # os.system("sudo shutdown -h now")
-                shutdown_counter = 0 # Reset to avoid spamming
-        
-        time.sleep(1)
+        if ups_interface.available:
+            power_state.tick()
+        socketio.sleep(0.25)
+
+# Start UPS monitoring task
+socketio.start_background_task(monitor_ups)
+
+def persist_warm_state():
+    """Background task saving warm-start state; the store rate-limits writes."""
+    while True:
+        socketio.sleep(warm_start.min_interval)
+        try:
+            run_blocking(warm_start.save, (warm_state(),))
+        except Exception as e:
+            print(f"Error saving warm-start state: {e}")
+
+if warm_start:
+    socketio.start_background_task(persist_warm_state)
+
+def persist_journal():
+    """Background task appending new alarm journal events in batches."""
+    while True:
+        socketio.sleep(event_journal.flush_interval)
+        try:
+            run_blocking(event_journal.flush)
+        except Exception as e:
+            print(f"Error writing event journal: {e}")
+
+if event_journal:
+    socketio.start_background_task(persist_journal)
+
+broadcast_config = CONFIG['sensors'].get('broadcast', {})
+broadcaster = TelemetryBroadcaster(
+    deadbands=dict(config_service.snapshot.deadbands),
+    keyframe_interval=broadcast_config.get('keyframe_interval_ms', 5000) / 1000.0
+)
+# While an external simulator is relaying telemetry, the built-in push stands
+# down so the two sources don't fight over the gauges.
+EXTERNAL_TELEMETRY_HOLDOFF = 3.0
+external_telemetry_until = 0.0
+
+EMIT_SECONDS = metrics.histogram('telemetry_emit_seconds', 'Time to build, encode and emit one telemetry frame')
+FRAMES_SENT = metrics.counter('telemetry_frames_total', 'Telemetry frames broadcast by the backend')
+FRAMES_RELAYED = metrics.counter('telemetry_relayed_total', 'Telemetry frames relayed from simulators and replays')
+metrics.gauge('sampler_last_sample_age_seconds', 'Seconds since the latest sensor sample',
+              lambda: None if sampler.last_update is None else time.time() - sampler.last_update)
+
+# Clients get telemetry as JSON dicts unless they negotiate the compact binary
+# format (telemetry_format event). Each format is encoded once per frame.
+JSON_ROOM = 'telemetry_json'
+BINARY_ROOM = 'telemetry_binary'
+binary_clients = set()
+
+def publish_telemetry(frame):
+    """Send a telemetry frame to every client in the format it negotiated."""
+    socketio.emit('telemetry_update', frame, to=JSON_ROOM)
+    if binary_clients:
+        try:
+            payload = encode_frame(frame)
+        except ValueError as e:
+            # Only relayed frames can be this odd; binary clients also take JSON
+            print(f"Sending telemetry as JSON: {e}")
+            socketio.emit('telemetry_update', frame, to=BINARY_ROOM)
+        else:
+            socketio.emit('telemetry_binary', payload, to=BINARY_ROOM)
 
-# Start UPS monitoring thread
-ups_thread = threading.Thread(target=monitor_ups, daemon=True)
-ups_thread.start()
+# Threshold warnings are evaluated here on every sample (or relayed frame)
+# and pushed as warning_state changes: {metric: {level, value, since} or null}
+def warning_min_duration(config):
+    return config.get('ui', {}).get('visual_warnings', {}).get('min_duration_ms', 5000) / 1000.0
+
+warning_engine = WarningEngine(config_service.snapshot.thresholds, min_duration=warning_min_duration(CONFIG))
+warning_engine.add_listener(lambda changes, ended: socketio.emit('warning_state', changes))
+if event_journal:
+    warning_engine.add_listener(event_journal.warning_changes)
+metrics.gauge('warnings_active', 'Sensor threshold warnings currently active',
+              lambda: len(warning_engine.active()))
+
+def evaluate_warnings(snapshot, timestamp):
+    # A relaying simulator owns the gauges, and their warnings, while it runs
+    if time.monotonic() >= external_telemetry_until:
+        warning_engine.update(snapshot, timestamp)
+
+sampler.add_listener(evaluate_warnings)
+
+def broadcast_telemetry():
+    """Background task pushing sampler snapshots to all clients as delta frames."""
+    interval = broadcast_config.get('interval_ms', 100) / 1000.0
+    while True:
+        snapshot = sampler.latest()
+        if snapshot and time.monotonic() >= external_telemetry_until:
+            start = time.perf_counter()
+            ups_data = ups_interface.get_status()
+            frame = broadcaster.next_frame(snapshot, ups_data if ups_data['available'] else None)
+            if frame:
+                publish_telemetry(frame)
+                FRAMES_SENT.inc()
+                EMIT_SECONDS.observe(time.perf_counter() - start)
+                profiler.finish('first_telemetry_update')
+        socketio.sleep(interval)
+
+if broadcast_config.get('enabled', True):
+    socketio.start_background_task(broadcast_telemetry)
+
+def apply_config(old, new):
+    """Apply a reloaded config to the running components and tell the clients."""
+    sensors = new.config['sensors']
+    sensor_interface.set_calibration(sensors['calibration'], new.calibrations)
+    sensor_interface.alpha = sensors['smoothing']['alpha']
+    broadcaster.deadbands = dict(new.deadbands)
+    warning_engine.set_thresholds(new.thresholds, warning_min_duration(new.config))
+    ups = new.config.get('ups', {})
+    power_state.loss_voltage = ups.get('loss_voltage', 4.0)
+    power_state.restore_voltage = ups.get('restore_voltage', 4.5)
+    power_state.debounce = ups.get('debounce_ms', 300) / 1000.0
+    power_state.confirm = ups.get('confirm_s', 2)
+
+    changes = changed_keys(old.config, new.config)
+    pending = restart_required(changes)
+    if pending:
+        print(f"⚠️ Config changes that need a restart: {', '.join(pending)}")
+    socketio.emit('config_changed', {
+        'version': new.version,
+        'etag': new.etag,
+        'changed': changes,
+        'restart_required': pending,
+    })
+
+config_service.add_listener(apply_config)
+socketio.start_background_task(config_service.watch, socketio.sleep)
 
 @app.route('/')
 def index():
     return "Infotainment Backend Running"
 
+@app.route('/api/health')
+def get_health():
+    """Readiness: 200 once every component has finished starting, 503 before."""
+    components = {name: dict(status) for name, status in component_status.items()}
+    components['sensors']['mode'] = 'mock' if sensor_interface.mock else 'hardware'
+    components['sensors']['channels'] = sensor_interface.health.status()
+    components['sensors']['bus_resets'] = sensor_interface.health.bus_resets
+    components['ups']['available'] = ups_interface.available
+    last_update = sampler.last_update
+    components['sampler'] = {
+        'state': 'ready' if last_update else 'starting',
+        'last_sample_age_s': None if last_update is None else round(time.time() - last_update, 3),
+    }
+    states = {component['state'] for component in components.values()}
+    if 'starting' in states:
+        status = 'starting'
+    elif 'failed' in states:
+        status = 'degraded'
+    else:
+        status = 'ok'
+    return jsonify({
+        'status': status,
+        'uptime_s': round(time.monotonic() - started_at, 1),
+        'components': components,
+    }), 503 if status == 'starting' else 200
+
+@app.route('/metrics')
+def get_metrics():
+    """Hot-path counters and latency histograms in Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/debug/startup')
+def get_startup_profile():
+    """Startup phase timings and slowest imports (needs BACKEND_PROFILE_STARTUP=1)."""
+    return jsonify(profiler.report())
+
 @app.route('/api/config')
 def get_config():
-    """Expose configuration to frontend"""
-    return jsonify(CONFIG)
+    """Expose configuration to frontend (pre-encoded; 304 when the ETag matches)"""
+    snapshot = config_service.snapshot
+    response = Response(snapshot.body, mimetype='application/json')
+    response.set_etag(snapshot.etag)
+    # Browsers revalidate every time, so a reload shows up on the next fetch
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(flask_request)
 
 @app.route('/api/telemetry')
 def get_telemetry():
-    data = sensor_interface.get_telemetry()
+    # Copy the shared snapshot so adding UPS data doesn't mutate it
+    data = dict(sampler.latest())
     # Add UPS data to telemetry
     ups_data = ups_interface.get_status()
     if ups_data['available']:
         data['ups'] = ups_data
     return jsonify(data)
 
+@app.route('/api/telemetry/history')
+def get_telemetry_history():
+    """Query recorded telemetry: ?metric=oil_pressure&since=<unix time>&resolution=1s|10s|1m"""
+    metric = flask_request.args.get('metric', '')
+    resolution = flask_request.args.get('resolution', '1s')
+    since = flask_request.args.get('since')
+    try:
+        since = float(since) if since else None
+        data = telemetry_history.query(metric, since=since, resolution=resolution)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    data['metric'] = metric
+    data['resolution'] = resolution
+    return jsonify(data)
+
+@app.route('/api/events')
+def get_events():
+    """Alarm journal, newest first: ?limit=50&before=<next>&type=threshold|power|system&metric=&since=<unix time>"""
+    if event_journal is None:
+        return jsonify({"status": "error", "message": "Event journal is disabled"}), 404
+    args = flask_request.args
+    try:
+        before = args.get('before')
+        since = args.get('since')
+        page = event_journal.query(
+            limit=int(args.get('limit', 50)),
+            before=int(before) if before else None,
+            kind=args.get('type') or None,
+            metric=args.get('metric') or None,
+            since=float(since) if since else None
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify(page)
+
 @app.route('/api/control', methods=['POST'])
 def system_control():
     # Placeholder for system control (volume, brightness)
@@ -94,29 +540,144 @@ def system_control():
 
 @app.route('/api/system/restart', methods=['POST'])
 def system_restart():
-    """Reboot the Raspberry Pi."""
+    """Reboot the Raspberry Pi after running the shutdown hooks."""
     print("🔄 System restart requested via API")
-    # Schedule reboot in 1 second to allow response to be sent
-    def reboot():
-        time.sleep(1)
-        os.system("sudo reboot")
-    
-    threading.Thread(target=reboot).start()
+    if not shutdown_coordinator.start(REBOOT):
+        return jsonify({"status": "error", "message": f"Already shutting down ({shutdown_coordinator.action})"}), 409
     return jsonify({"status": "success", "message": "System restarting..."})
 
 @socketio.on('connect')
 def test_connect():
     print('Client connected')
     emit('my response', {'data': 'Connected'})
+    join_room(JSON_ROOM)
+    # Delta frames assume the client has a baseline, so send it one
+    frame = current_full_frame()
+    if frame:
+        emit('telemetry_update', frame)
+    emit('ups_state', power_state.info())
+    emit('warning_state', warning_engine.state())
+
+def current_full_frame():
+    snapshot = sampler.latest()
+    if not snapshot:
+        return None
+    ups_data = ups_interface.get_status()
+    return broadcaster.full_frame(snapshot, ups_data if ups_data['available'] else None)
+
+@socketio.on('telemetry_format')
+def handle_telemetry_format(data):
+    """Switch this client between JSON and binary telemetry frames.
+
+    Clients ask for {"format": "binary", "version": 1}; the reply carries the
+    format actually used and, for binary, the field table. Unsupported
+    versions stay on JSON.
+    """
+    data = data or {}
+    sid = flask_request.sid
+    if data.get('format') == BINARY and data.get('version', WIRE_VERSION) == WIRE_VERSION:
+        leave_room(JSON_ROOM)
+        join_room(BINARY_ROOM)
+        binary_clients.add(sid)
+        emit('telemetry_format', {'format': BINARY, **schema()})
+        frame = current_full_frame()
+        if frame:
+            emit('telemetry_binary', encode_frame(frame))
+    else:
+        leave_room(BINARY_ROOM)
+        join_room(JSON_ROOM)
+        binary_clients.discard(sid)
+        emit('telemetry_format', {'format': JSON})
+
+@socketio.on('warning_state')
+def handle_warning_state():
+    """Reply with every thresholded metric's warning, for views that mount after connecting."""
+    emit('warning_state', warning_engine.state())
 
 @socketio.on('telemetry_update')
 def handle_telemetry_update(data):
     """Relay telemetry data from simulators to all connected clients."""
+    if not isinstance(data, dict):
+        return
     # Inject UPS data if available
     ups_data = ups_interface.get_status()
     if ups_data['available']:
         data['ups'] = ups_data
-    emit('telemetry_update', data, broadcast=True)
+    relay_telemetry(data)
+
+def relay_telemetry(frame):
+    """Publish a frame from outside the sampler (simulator, trip replay) in place of live readings."""
+    global external_telemetry_until
+    external_telemetry_until = time.monotonic() + EXTERNAL_TELEMETRY_HOLDOFF
+    FRAMES_RELAYED.inc()
+    publish_telemetry(frame)
+    warning_engine.update(frame)
+
+# Trip replay in the backend: recorded frames take the relay path above, so
+# the dashboards, warnings and journal see them like live data
+trips_dir = Path(__file__).parent / '..' / recorder_config.get('directory', 'data/trips')
+active_replay = {}
+
+def run_replay(segments, speed, loop, stop):
+    try:
+        while not stop.is_set():
+            replayer = TripReplayer(iter_samples(segments), relay_telemetry, speed=speed, sleep=socketio.sleep)
+            active_replay['replayer'] = replayer
+            replayer.run(stop)
+            if not loop:
+                break
+    except Exception as e:
+        print(f"Error replaying trip: {e}")
+    finally:
+        if active_replay.get('stop') is stop:
+            active_replay.clear()
+
+def replay_status():
+    replayer = active_replay.get('replayer')
+    if not active_replay:
+        return None
+    return {
+        'trip': active_replay['trip'],
+        'speed': active_replay['speed'],
+        'loop': active_replay['loop'],
+        'frames_sent': replayer.frames_sent if replayer else 0,
+        'late_frames': replayer.late_frames if replayer else 0,
+    }
+
+@app.route('/api/replay', methods=['GET'])
+def get_replay():
+    """Recorded trips and the replay in progress (or null)."""
+    return jsonify({'trips': sorted(list_trips(trips_dir)), 'active': replay_status()})
+
+@app.route('/api/replay', methods=['POST'])
+def start_replay():
+    """Replay a recorded trip: {"trip": id (default: latest), "speed": 1 | 10 | "max", "loop": false}"""
+    body = flask_request.get_json(silent=True) or {}
+    try:
+        speed = parse_speed(body.get('speed', 1))
+    except (TypeError, ValueError) as e:
+        return jsonify({"status": "error", "message": f"Invalid speed: {e}"}), 400
+    trips = list_trips(trips_dir)
+    trip_id = body.get('trip') or (sorted(trips)[-1] if trips else None)
+    if trip_id not in trips:
+        return jsonify({"status": "error", "message": f"Unknown trip '{trip_id}'"}), 404
+    if active_replay:
+        return jsonify({"status": "error", "message": f"Already replaying {active_replay['trip']}"}), 409
+    stop = threading.Event()
+    active_replay.update(trip=trip_id, speed='max' if speed is None else speed, loop=bool(body.get('loop')),
+                         stop=stop, replayer=None)
+    print(f"▶️ Replaying {trip_id} at {'max' if speed is None else f'{speed:g}x'} speed")
+    socketio.start_background_task(run_replay, trips[trip_id], speed, active_replay['loop'], stop)
+    return jsonify({"status": "success", "replay": replay_status()})
+
+@app.route('/api/replay', methods=['DELETE'])
+def stop_replay():
+    """Stop the replay in progress; live readings resume after the relay holdoff."""
+    stop = active_replay.get('stop')
+    if stop is None:
+        return jsonify({"status": "error", "message": "No replay in progress"}), 404
+    stop.set()
+    return jsonify({"status": "success"})
 
 # Track which session is the simulator
 simulator_sid = None
@@ -132,15 +693,16 @@ def handle_ups_simulation(data):
         ups_interface.input_voltage = data.get('input_voltage', 0)
         ups_interface.charging = data.get('charging', False)
         ups_interface.available = True
+        ups_interface.frame_received()
         
         # Track this session as the simulator
         simulator_sid = flask_request.sid
         
         # Broadcast updated UPS state to all clients
         # We send a minimal telemetry_update with just UPS data
-        emit('telemetry_update', {
+        publish_telemetry({
             'ups': ups_interface.get_status()
-        }, broadcast=True)
+        })
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -148,19 +710,24 @@ def handle_disconnect():
     global simulator_sid
     
     print(f"Client disconnected: {flask_request.sid}, simulator_sid: {simulator_sid}")
+    binary_clients.discard(flask_request.sid)
     
     # Only reset if this was the simulator session
     if ups_interface.mock and ups_interface.available and flask_request.sid == simulator_sid:
         print("Simulator disconnected - resetting UPS state")
         ups_interface.available = False
         simulator_sid = None
-        # Broadcast that UPS is no longer available using socketio.emit
-        socketio.emit('telemetry_update', {
+        power_state.reset()
+        # Broadcast that UPS is no longer available
+        publish_telemetry({
             'ups': ups_interface.get_status()
         })
 
+profiler.mark('app_loaded')
+
 if __name__ == '__main__':
     host = CONFIG['backend']['host']
     port = CONFIG['backend']['port']
     debug = CONFIG['backend']['debug']
-    socketio.run(app, host=host, port=port, debug=debug, allow_unsafe_werkzeug=True)
+    # The reloader forks a second copy of the backend (and its hardware threads)
+    socketio.run(app, host=host, port=port, debug=debug, use_reloader=False, allow_unsafe_werkzeug=True)
@@ -0,0 +1,152 @@
+import time
+from collections import deque
+
+
+class RunningRegression:
+    """Least-squares line over a sliding window, updated in O(1) per sample.
+
+    Keeps running sums of x, y, x*x and x*y; evicting a sample subtracts its
+    terms. x values are stored relative to the first sample to keep the sums
+    well conditioned over long discharges.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.origin = None
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, x, y):
+        if self.origin is None:
+            self.origin = x
+        x -= self.origin
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+
+    def remove(self, x, y):
+        x -= self.origin
+        self.n -= 1
+        self.sx -= x
+        self.sy -= y
+        self.sxx -= x * x
+        self.sxy -= x * y
+        if self.n == 0:
+            self.reset()
+
+    def fit(self):
+        """Return (slope, intercept) in absolute x, or None if underdetermined."""
+        if self.n < 2:
+            return None
+        denom = self.n * self.sxx - self.sx * self.sx
+        if abs(denom) < 1e-12:
+            return None
+        slope = (self.n * self.sxy - self.sx * self.sy) / denom
+        intercept = (self.sy - slope * self.sx) / self.n
+        # Shift the intercept back from the origin-relative frame
+        return slope, intercept - slope * self.origin
+
+
+class DischargeEstimator:
+    """Estimates remaining battery runtime from recent UPS readings.
+
+    Battery voltage and BATCAP are each regressed against time over the last
+    `window` seconds of discharge. Each fitted line is extrapolated to its
+    cutoff (cutoff_voltage / cutoff_capacity), and the earlier crossing wins.
+    Charging resets the model, since a charge curve says nothing about
+    discharge.
+
+    The last fitted rates can be saved (rates()) and restored on the next run
+    (restore_rates()). Until the live window spans min_span seconds, the
+    restored rates are extrapolated from the latest reading instead.
+    """
+
+    def __init__(self, window=300.0, cutoff_voltage=3.4, cutoff_capacity=5.0,
+                 min_span=20.0, clock=time.monotonic):
+        self.window = window
+        self.cutoff_voltage = cutoff_voltage
+        self.cutoff_capacity = cutoff_capacity
+        self.min_span = min_span
+        self.clock = clock
+        self._samples = deque()
+        self._voltage = RunningRegression()
+        self._capacity = RunningRegression()
+        self._prior = {}
+
+    def reset(self):
+        self._samples.clear()
+        self._voltage.reset()
+        self._capacity.reset()
+
+    def add(self, voltage, capacity, charging, now=None):
+        """Record one UPS reading. voltage may be 0/None when Vbat isn't reported."""
+        now = self.clock() if now is None else now
+        if charging:
+            if self._samples:
+                self.reset()
+            return
+        # get_status() reports 0 when the UPS doesn't send Vbat
+        voltage = voltage or None
+        self._samples.append((now, voltage, capacity))
+        if voltage is not None:
+            self._voltage.add(now, voltage)
+        if capacity is not None:
+            self._capacity.add(now, capacity)
+        while self._samples and now - self._samples[0][0] > self.window:
+            t, old_voltage, old_capacity = self._samples.popleft()
+            if old_voltage is not None:
+                self._voltage.remove(t, old_voltage)
+            if old_capacity is not None:
+                self._capacity.remove(t, old_capacity)
+
+    @staticmethod
+    def _time_to(fit, target, now):
+        if fit is None:
+            return None
+        slope, intercept = fit
+        if slope >= 0:
+            return None  # Not discharging on this signal
+        return max(0.0, (target - intercept) / slope - now)
+
+    def _fits(self):
+        """(voltage fit, capacity fit) from the live window, or from the restored rates."""
+        if not self._samples:
+            return None, None
+        t, voltage, capacity = self._samples[-1]
+        if t - self._samples[0][0] >= self.min_span:
+            return self._voltage.fit(), self._capacity.fit()
+
+        def prior(name, value):
+            slope = self._prior.get(name)
+            if slope is None or value is None:
+                return None
+            return slope, value - slope * t
+
+        return prior('voltage', voltage), prior('capacity', capacity)
+
+    def rates(self):
+        """Discharge rates (units per second) for voltage and capacity, for the next run."""
+        rates = dict(self._prior)
+        if self._samples and self._samples[-1][0] - self._samples[0][0] >= self.min_span:
+            for name, fit in (('voltage', self._voltage.fit()), ('capacity', self._capacity.fit())):
+                if fit is not None and fit[0] < 0:
+                    rates[name] = fit[0]
+        return rates
+
+    def restore_rates(self, rates):
+        self._prior = {name: rates[name] for name in ('voltage', 'capacity') if rates.get(name) is not None}
+
+    def seconds_remaining(self, now=None):
+        """Estimated seconds until the first cutoff is reached, or None if unknown."""
+        voltage_fit, capacity_fit = self._fits()
+        now = self.clock() if now is None else now
+        estimates = [
+            self._time_to(voltage_fit, self.cutoff_voltage, now),
+            self._time_to(capacity_fit, self.cutoff_capacity, now),
+        ]
+        estimates = [e for e in estimates if e is not None]
+        return min(estimates) if estimates else None
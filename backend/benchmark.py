@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Benchmarks for the backend hot paths, saved as JSON for regression checks.
+
+Measures the sensor pipeline in mock mode and on the emulated ADS1115
+(virtual time, seeded, so every run reads the same voltages), calibration
+conversions, the EMA step, UPS line parsing and Socket.IO broadcast fan-out to N in-process test
+clients. Every call is timed individually for latency percentiles. The total
+gives throughput.
+
+Usage:
+    python3 benchmark.py                          # run all, save to data/benchmarks/
+    python3 benchmark.py --only ups_parse --iterations 50000
+    python3 benchmark.py --compare ../data/benchmarks/bench-20261017-081500.json
+
+Run it on the Pi for numbers that matter; compare runs from the same machine.
+"""
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_OUTPUT_DIR = ROOT / 'data' / 'benchmarks'
+
+# UART lines as sent by the UPSPack V3 (mains, discharging, with Vbat, partial)
+UPS_LINES = (
+    "SmartUPS V3.1,Vin 5.10,BATCAP 100,Vout 5.10",
+    "SmartUPS V3.1,Vin 5.08,BATCAP 99,Vout 5.09",
+    "SmartUPS V3.1,Vin 0.00,BATCAP 92,Vout 5.05",
+    "SmartUPS V3.1,Vin 0.00,BATCAP 91,Vbat 3.98",
+    "SmartUPS V3.1,BATCAP 90",
+)
+
+
+def load_config():
+    with open(ROOT / 'config' / 'config.json') as f:
+        return json.load(f)
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure(fn, iterations, warmup=100):
+    """Call fn() `iterations` times and summarise per-call latency in microseconds."""
+    for _ in range(min(warmup, iterations)):
+        fn()
+    timings = []
+    clock = time.perf_counter
+    started = clock()
+    for _ in range(iterations):
+        start = clock()
+        fn()
+        timings.append(clock() - start)
+    elapsed = clock() - started
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'ops_per_s': round(iterations / elapsed, 1),
+        'mean_us': round(sum(timings) / iterations * 1e6, 3),
+        'p50_us': round(percentile(timings, 50) * 1e6, 3),
+        'p99_us': round(percentile(timings, 99) * 1e6, 3),
+        'max_us': round(timings[-1] * 1e6, 3),
+    }
+
+
+def sensor_interface(config):
+    from sensors import SensorInterface
+    sensors = config['sensors']
+    return SensorInterface(mock=True, alpha=sensors['smoothing']['alpha'], config=sensors['calibration'],
+                           ema_period=sensors['update_interval_ms'] / 1000.0,
+                           smoothing=sensors['smoothing'])
+
+
+def bench_get_telemetry(config):
+    sensors = sensor_interface(config)
+    dt = config['sensors']['update_interval_ms'] / 1000.0
+    return lambda: sensors.get_telemetry(dt)
+
+
+def bench_emulated_pipeline(config):
+    from sensors import SensorInterface
+    sensors_config = config['sensors']
+    # Virtual time: no conversion sleeps, reproducible readings
+    emulation = dict(sensors_config.get('emulation') or {}, enabled=True, realtime=False)
+    sensors = SensorInterface(mock=True, alpha=sensors_config['smoothing']['alpha'],
+                              config=sensors_config['calibration'],
+                              ema_period=sensors_config['update_interval_ms'] / 1000.0,
+                              adc_config=sensors_config.get('adc'), smoothing=sensors_config['smoothing'],
+                              health=sensors_config.get('health'), emulation=emulation)
+    dt = sensors_config['update_interval_ms'] / 1000.0
+
+    def poll():
+        sensors.get_telemetry(dt)
+        sensors.adc.advance(dt)
+    return poll
+
+
+def bench_calibration(metric, voltage):
+    def setup(config):
+        convert = sensor_interface(config)._converters[metric]
+        return lambda: convert(voltage)
+    return setup
+
+
+def bench_apply_ema(config):
+    sensors = sensor_interface(config)
+    values = itertools.cycle((180.0, 181.5, 179.2, 180.8))
+    return lambda: sensors._apply_ema('water_temp', next(values), 0.1)
+
+
+def bench_ups_parse(config):
+    from ups import UPSInterface
+    ups = UPSInterface(mock=True)
+    lines = itertools.cycle(UPS_LINES)
+    return lambda: ups._parse_data(next(lines))
+
+
+SAMPLE_FRAME = {
+    'oil_pressure': 42.5, 'water_temp': 187.3, 'voltage': 13.9,
+    'ups': {'available': True, 'voltage': 4.02, 'capacity': 88.0, 'charging': False, 'input_voltage': 0.0,
+            'output_voltage': 5.1, 'runtime_minutes': 41.5, 'shutdown_deadline': 1792224000},
+}
+
+
+def bench_encode_json(config):
+    return lambda: json.dumps(SAMPLE_FRAME)
+
+
+def bench_encode_binary(config):
+    from wire import encode_frame
+    return lambda: encode_frame(SAMPLE_FRAME)
+
+
+def bench_fanout(clients):
+    def setup(config):
+        from flask import Flask
+        from flask_socketio import SocketIO
+        from broadcaster import TelemetryBroadcaster
+        from ups import UPSInterface
+
+        app = Flask(__name__)
+        socketio = SocketIO(app, async_mode='threading')
+        test_clients = [socketio.test_client(app) for _ in range(clients)]
+        ups = UPSInterface(mock=True)
+        ups.available = True
+        frame = TelemetryBroadcaster().full_frame(
+            {'oil_pressure': 42.5, 'water_temp': 187.3, 'voltage': 13.9}, ups.get_status())
+        emitted = itertools.count(1)
+
+        def emit():
+            socketio.emit('telemetry_update', frame)
+            # Test clients queue everything they receive; drain now and then
+            if next(emitted) % 1000 == 0:
+                for client in test_clients:
+                    client.get_received()
+        return emit
+    return setup
+
+
+def benchmarks(clients=(1, 5, 20)):
+    """Benchmark name -> setup(config) returning the callable to time."""
+    cases = {
+        'sensor_get_telemetry': bench_get_telemetry,
+        'sensor_pipeline_emulated': bench_emulated_pipeline,
+        'calibration_oil_pressure': bench_calibration('oil_pressure', 1.7),
+        'calibration_water_temp': bench_calibration('water_temp', 1.7),
+        'calibration_voltage': bench_calibration('voltage', 1.7),
+        'apply_ema': bench_apply_ema,
+        'ups_parse': bench_ups_parse,
+        'encode_json': bench_encode_json,
+        'encode_binary': bench_encode_binary,
+    }
+    for n in clients:
+        cases[f'fanout_{n}_clients'] = bench_fanout(n)
+    return cases
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(only=None, iterations=10000, fanout_iterations=2000, clients=(1, 5, 20), config=None):
+    """Run the selected benchmarks and return {'meta': ..., 'results': {name: stats}}."""
+    config = config or load_config()
+    results = {}
+    for name, setup in benchmarks(clients).items():
+        if only and name not in only:
+            continue
+        n = fanout_iterations if name.startswith('fanout_') else iterations
+        results[name] = measure(setup(config), n)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline):
+    """Lines comparing mean/p99 latency against a baseline run (negative % = faster)."""
+    lines = []
+    for name, stats in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            lines.append(f"{name:28} (not in baseline)")
+            continue
+        deltas = []
+        for key in ('mean_us', 'p99_us'):
+            change = (stats[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            deltas.append(f"{key[:-3]} {before[key]:.1f} -> {stats[key]:.1f}us ({change:+.1f}%)")
+        lines.append(f"{name:28} " + '   '.join(deltas))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backend hot-path benchmarks")
+    parser.add_argument("--only", nargs='+', help="Benchmark names to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=10000, help="Calls per benchmark")
+    parser.add_argument("--fanout-iterations", type=int, default=2000, help="Emits per fan-out benchmark")
+    parser.add_argument("--clients", default="1,5,20", help="Comma-separated fan-out client counts")
+    parser.add_argument("--output", help="JSON file to write (default: data/benchmarks/bench-<time>.json)")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    clients = tuple(int(n) for n in args.clients.split(',') if n)
+    if args.list:
+        print('\n'.join(benchmarks(clients)))
+        return 0
+
+    report = run_benchmarks(args.only, args.iterations, args.fanout_iterations, clients)
+    for name, stats in report['results'].items():
+        print(f"{name:28} {stats['ops_per_s']:>12,.0f} ops/s   mean {stats['mean_us']:8.2f}us"
+              f"   p99 {stats['p99_us']:8.2f}us")
+
+    output = Path(args.output) if args.output else DEFAULT_OUTPUT_DIR / time.strftime('bench-%Y%m%d-%H%M%S.json')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"💾 Saved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.compare} ({baseline['meta'].get('commit')}):")
+        print('\n'.join(compare(report, baseline)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
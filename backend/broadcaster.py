@@ -0,0 +1,75 @@
+import time
+
+
+def deadbands_from_config(sensors_config):
+    """Build a {metric: deadband} map from the sensors config block.
+
+    A metric's deadband comes from its `thresholds` entry, falling back to its
+    `calibration` entry, and defaults to 0 (any change is sent).
+    """
+    thresholds = sensors_config.get('thresholds', {})
+    calibration = sensors_config.get('calibration', {})
+    deadbands = {}
+    for metric in set(thresholds) | set(calibration):
+        value = thresholds.get(metric, {}).get('deadband')
+        if value is None:
+            value = calibration.get(metric, {}).get('deadband', 0.0)
+        deadbands[metric] = float(value)
+    return deadbands
+
+
+class TelemetryBroadcaster:
+    """Turns telemetry snapshots into delta frames for Socket.IO clients.
+
+    Only fields that moved by more than their deadband since they were last
+    sent are included. UPS status is coalesced into the same frame and sent
+    whole whenever any of its fields change, since clients merge frames
+    shallowly. A full keyframe goes out every keyframe_interval seconds so
+    values suppressed by the deadband converge.
+    """
+
+    def __init__(self, deadbands=None, keyframe_interval=5.0):
+        self.deadbands = deadbands or {}
+        self.keyframe_interval = keyframe_interval
+        self._last_sent = {}
+        self._last_keyframe = None
+
+    def reset(self):
+        """Forget what was sent so the next frame is a keyframe."""
+        self._last_sent = {}
+        self._last_keyframe = None
+
+    def full_frame(self, snapshot, ups=None):
+        """Complete frame for a newly connected client. Does not affect delta state."""
+        frame = dict(snapshot)
+        if ups is not None:
+            frame['ups'] = ups
+        return frame
+
+    def _changed(self, key, value):
+        if key not in self._last_sent:
+            return True
+        previous = self._last_sent[key]
+        if isinstance(value, (int, float)) and isinstance(previous, (int, float)) \
+                and not isinstance(value, bool):
+            return abs(value - previous) > self.deadbands.get(key, 0.0)
+        return value != previous
+
+    def next_frame(self, snapshot, ups=None, now=None):
+        """Return the frame to broadcast for this tick, or None if nothing changed."""
+        now = time.monotonic() if now is None else now
+        keyframe = self._last_keyframe is None or now - self._last_keyframe >= self.keyframe_interval
+
+        frame = {}
+        for key, value in snapshot.items():
+            if keyframe or self._changed(key, value):
+                frame[key] = value
+        if ups is not None and (keyframe or self._changed('ups', ups)):
+            frame['ups'] = ups
+
+        if keyframe:
+            self._last_keyframe = now
+        if not frame:
+            return None
+        self._last_sent.update(frame)
+        return frame
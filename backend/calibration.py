@@ -0,0 +1,198 @@
+import abc
+import math
+from bisect import bisect_right
+
+# Converters used when a metric has no (or an unrecognised) calibration type.
+# These match the historical hard-coded conversions.
+DEFAULT_SCALES = {
+    'oil_pressure': (20.0, 0.0),
+    'water_temp': (30.0, 50.0),
+    'voltage': (3.0, 0.0),
+}
+
+# Range used by a `linear` calibration that omits min/max values
+DEFAULT_LINEAR_RANGES = {
+    'oil_pressure': (0, 100),
+    'water_temp': (50, 200),
+}
+
+
+class Calibration(abc.ABC):
+    """Compiled voltage -> engineering unit conversion.
+
+    Instances are callables taking one voltage; convert_many() converts a
+    batch (the oversampled reads of one channel). They return None for a
+    voltage that has no meaningful value (e.g. an open-circuit sender), never
+    NaN, so nothing non-finite reaches smoothing or the JSON frames.
+    """
+
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def __call__(self, voltage):
+        """Engineering value for one voltage, or None."""
+
+    def convert_many(self, voltages):
+        return list(map(self, voltages))
+
+
+class LinearCalibration(Calibration):
+    """value = offset + scale * voltage. Also used for plain voltage dividers."""
+
+    __slots__ = ('scale', 'offset')
+
+    def __init__(self, scale, offset=0.0):
+        self.scale = scale
+        self.offset = offset
+
+    def __call__(self, voltage):
+        return self.offset + self.scale * voltage
+
+    def convert_many(self, voltages):
+        scale, offset = self.scale, self.offset
+        return [offset + scale * v for v in voltages]
+
+
+class PiecewiseLinear(Calibration):
+    """Interpolates a sorted lookup table with bisect, clamping at both ends."""
+
+    __slots__ = ('xs', 'ys', 'slopes')
+
+    def __init__(self, points):
+        points = sorted(points)
+        if len(points) < 2:
+            raise ValueError("lookup table needs at least two points")
+        self.xs = tuple(x for x, _ in points)
+        self.ys = tuple(y for _, y in points)
+        # Per-segment slopes precomputed so a lookup is one bisect and one multiply
+        self.slopes = tuple(
+            (y1 - y0) / (x1 - x0) if x1 != x0 else 0.0
+            for (x0, y0), (x1, y1) in zip(points, points[1:])
+        )
+
+    def __call__(self, x):
+        xs = self.xs
+        i = bisect_right(xs, x)
+        if i == 0:
+            return self.ys[0]
+        if i == len(xs):
+            return self.ys[-1]
+        i -= 1
+        return self.ys[i] + (x - xs[i]) * self.slopes[i]
+
+
+class SteinhartHart(Calibration):
+    """Thermistor resistance (ohms) -> temperature from the Steinhart-Hart equation."""
+
+    __slots__ = ('a', 'b', 'c', 'fahrenheit')
+
+    def __init__(self, a, b, c, fahrenheit=True):
+        self.a = a
+        self.b = b
+        self.c = c
+        self.fahrenheit = fahrenheit
+
+    def __call__(self, resistance):
+        if resistance <= 0 or math.isinf(resistance):
+            return None
+        ln_r = math.log(resistance)
+        kelvin = 1.0 / (self.a + self.b * ln_r + self.c * ln_r ** 3)
+        celsius = kelvin - 273.15
+        return celsius * 9.0 / 5.0 + 32.0 if self.fahrenheit else celsius
+
+
+class ResistanceSender(Calibration):
+    """Resistive sender to ground with a fixed resistor up to v_ref.
+
+    Recovers the sender resistance from the divider voltage and hands it to a
+    resistance -> value converter (lookup table or Steinhart-Hart).
+    """
+
+    __slots__ = ('r_fixed', 'v_ref', 'convert_resistance')
+
+    def __init__(self, convert_resistance, r_fixed, v_ref=5.0):
+        self.convert_resistance = convert_resistance
+        self.r_fixed = r_fixed
+        self.v_ref = v_ref
+
+    def __call__(self, voltage):
+        if voltage >= self.v_ref:
+            # Open circuit: sender disconnected or infinitely resistive
+            return None
+        resistance = self.r_fixed * max(voltage, 0.0) / (self.v_ref - voltage)
+        return self.convert_resistance(resistance)
+
+    def convert_many(self, voltages):
+        r_fixed, v_ref, convert = self.r_fixed, self.v_ref, self.convert_resistance
+        return [None if v >= v_ref else convert(r_fixed * max(v, 0.0) / (v_ref - v)) for v in voltages]
+
+
+def _table_value(row):
+    for key in ('value', 'temp_f', 'temp_c'):
+        if key in row:
+            return float(row[key])
+    raise ValueError(f"lookup table row has no value: {row}")
+
+
+def _divider(cfg):
+    divider = cfg.get('voltage_divider', {})
+    if 'r_fixed' not in divider:
+        raise ValueError("voltage_divider.r_fixed is required")
+    return float(divider['r_fixed']), float(divider.get('v_ref', cfg.get('adc_reference_voltage', 5.0)))
+
+
+def compile_calibration(metric, cfg):
+    """Compile one metric's calibration config into a Calibration.
+
+    Supported types:
+        linear: min_voltage/max_voltage mapped onto min_value/max_value
+        voltage_divider: voltage * divider_ratio
+        lookup: lookup_table of {"voltage", "value"} rows
+        resistance_lookup: lookup_table of {"resistance_ohms", "temp_f"|"value"} rows,
+            with voltage_divider.r_fixed (and optional v_ref)
+        steinhart_hart: steinhart_hart {"a", "b", "c"} coefficients, with voltage_divider
+
+    Raises ValueError for a recognised type with unusable parameters.
+    """
+    cfg = cfg or {}
+    kind = cfg.get('type')
+    if kind == 'linear':
+        default_min, default_max = DEFAULT_LINEAR_RANGES.get(metric, (0, 100))
+        min_v = cfg.get('min_voltage', 0.0)
+        max_v = cfg.get('max_voltage', 5.0)
+        min_val = cfg.get('min_value', default_min)
+        max_val = cfg.get('max_value', default_max)
+        if max_v == min_v:
+            raise ValueError("min_voltage and max_voltage must differ")
+        scale = (max_val - min_val) / (max_v - min_v)
+        return LinearCalibration(scale, min_val - min_v * scale)
+    if kind == 'voltage_divider':
+        return LinearCalibration(cfg.get('divider_ratio', 3.0))
+    if kind == 'lookup':
+        return PiecewiseLinear([(float(row['voltage']), _table_value(row)) for row in cfg.get('lookup_table', [])])
+    if kind == 'resistance_lookup':
+        table = PiecewiseLinear([(float(row['resistance_ohms']), _table_value(row))
+                                 for row in cfg.get('lookup_table', [])])
+        r_fixed, v_ref = _divider(cfg)
+        return ResistanceSender(table, r_fixed, v_ref)
+    if kind == 'steinhart_hart':
+        coeffs = cfg.get('steinhart_hart', {})
+        fahrenheit = 'C' not in cfg.get('unit', '°F')
+        thermistor = SteinhartHart(float(coeffs['a']), float(coeffs['b']), float(coeffs['c']), fahrenheit)
+        r_fixed, v_ref = _divider(cfg)
+        return ResistanceSender(thermistor, r_fixed, v_ref)
+
+    scale, offset = DEFAULT_SCALES.get(metric, (1.0, 0.0))
+    return LinearCalibration(scale, offset)
+
+
+def compile_calibrations(config, metrics):
+    """Compile the calibration block for each metric, falling back to defaults on bad config."""
+    compiled = {}
+    for metric in metrics:
+        try:
+            compiled[metric] = compile_calibration(metric, config.get(metric))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Warning: Invalid calibration for {metric}: {e}. Using default conversion.")
+            compiled[metric] = compile_calibration(metric, None)
+    return compiled
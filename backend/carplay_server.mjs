@@ -1,5 +1,6 @@
 import CarplayNode from 'node-carplay/node';
 import { Server } from 'socket.io';
+import { io as connectBackend } from 'socket.io-client';
 import http from 'http';
 import fs from 'fs';
 import path from 'path';
@@ -8,17 +9,48 @@ import { fileURLToPath } from 'url';
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
-// Load centralized configuration
+// Load centralized configuration. The file only bootstraps (it names the
+// backend); the backend's /api/config is the source of truth once it is up,
+// and is fetched again whenever the backend emits config_changed.
 const configPath = path.join(__dirname, '..', 'config', 'config.json');
 const configData = fs.readFileSync(configPath, 'utf8');
-const CONFIG = JSON.parse(configData);
+let CONFIG = JSON.parse(configData);
+const BACKEND_URL = process.env.BACKEND_URL || CONFIG.frontend.api_url;
+let configEtag = null;
+
+// Fetch /api/config, revalidating with the last ETag. Returns the config, or
+// null when it is unchanged (304) or the backend can't be reached.
+async function fetchConfig() {
+    try {
+        const res = await fetch(`${BACKEND_URL}/api/config`, {
+            headers: configEtag ? { 'If-None-Match': configEtag } : {},
+            signal: AbortSignal.timeout(2000),
+        });
+        if (res.status === 304) return null;
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const config = await res.json();
+        configEtag = res.headers.get('etag');
+        return config;
+    } catch (err) {
+        console.error("⚠️ Could not fetch config from backend:", err.message);
+        return null;
+    }
+}
+
+const backendConfig = await fetchConfig();
+if (backendConfig) {
+    CONFIG = backendConfig;
+} else {
+    console.log("⚠️ Backend not reachable, using config/config.json until it is");
+}
 
 // CarPlay configuration from config file
 const PORT = CONFIG.carplay.port;
 const CARPLAY_CONFIG = CONFIG.carplay.config;
 
-// Setup HTTP and Socket.IO server
-const server = http.createServer();
+// Setup HTTP and Socket.IO server. Plain HTTP requests (not Socket.IO) go to
+// handleRequest; the backend uses it to release the dongle before power-off.
+const server = http.createServer(handleRequest);
 const io = new Server(server, {
     cors: {
         origin: "*",
@@ -35,6 +67,32 @@ function updateStatus(newStatus) {
     io.emit('status', currentStatus);
 }
 
+async function releaseDongle() {
+    if (carplay && typeof carplay.stop === 'function') {
+        console.log("🔌 Releasing CarPlay dongle...");
+        await carplay.stop();
+    }
+    updateStatus({ status: 'disconnected' });
+}
+
+function handleRequest(req, res) {
+    if (req.method === 'POST' && req.url === '/release') {
+        releaseDongle()
+            .then(() => {
+                res.writeHead(200, { 'Content-Type': 'application/json' });
+                res.end(JSON.stringify({ status: 'success' }));
+            })
+            .catch((err) => {
+                console.error("❌ Error releasing dongle:", err.message);
+                res.writeHead(500, { 'Content-Type': 'application/json' });
+                res.end(JSON.stringify({ status: 'error', message: err.message }));
+            });
+        return;
+    }
+    res.writeHead(404);
+    res.end();
+}
+
 function setupCarPlay() {
     try {
         // Handle ESM/CJS interop
@@ -289,6 +347,24 @@ function setupCarPlay() {
 // Initialize on startup
 setupCarPlay();
 
+// Follow config reloads on the backend. node-carplay takes its settings once,
+// in its constructor, so a changed carplay block is kept and reported but
+// applies when this server restarts.
+async function reloadConfig() {
+    const config = await fetchConfig();
+    if (!config) return;
+    const carplayChanged = JSON.stringify(config.carplay) !== JSON.stringify(CONFIG.carplay);
+    CONFIG = config;
+    if (carplayChanged) {
+        console.log("⚠️ CarPlay config changed. Restart the CarPlay server to apply it.");
+    }
+}
+
+const backend = connectBackend(BACKEND_URL);
+// Also on (re)connect, which catches edits made while the backend was down
+backend.on('connect', reloadConfig);
+backend.on('config_changed', reloadConfig);
+
 io.on('connection', (socket) => {
     console.log('Client connected:', socket.id);
 
@@ -0,0 +1,285 @@
+import time
+from collections import deque
+
+OK = 'ok'
+DEGRADED = 'degraded'
+FAILED = 'failed'
+
+# Fault kinds
+I2C_ERROR = 'i2c_error'
+STUCK = 'stuck'
+OUT_OF_RANGE = 'out_of_range'
+OPEN_CIRCUIT = 'open_circuit'
+INVALID_VALUE = 'invalid_value'
+
+# ADS1115 full-scale input voltage per gain; a reading at full scale is clipped
+FULL_SCALE = {2 / 3: 6.144, 1: 4.096, 2: 2.048, 4: 1.024, 8: 0.512, 16: 0.256}
+
+
+class ChannelHealth:
+    """Read history and current verdict for one ADC channel."""
+
+    __slots__ = ('channel', 'state', 'fault', 'full_scale', 'open_circuit', 'open_circuit_high', 'reads', 'errors',
+                 'last_error', 'consecutive_errors', 'backoff', 'next_retry', 'last_value', 'same_count',
+                 'range_count', 'open_count', 'invalid_count', '_window', '_window_errors')
+
+    def __init__(self, channel, window, full_scale=None, open_circuit=None, open_circuit_high=None):
+        self.channel = channel
+        self.state = OK
+        self.fault = None
+        self.full_scale = full_scale
+        self.open_circuit = open_circuit
+        self.open_circuit_high = open_circuit_high
+        self.reads = 0
+        self.errors = 0
+        self.last_error = None
+        self.consecutive_errors = 0
+        self.backoff = 0.0
+        self.next_retry = None
+        self.last_value = None
+        self.same_count = 0
+        self.range_count = 0
+        self.open_count = 0
+        self.invalid_count = 0
+        self._window = deque(maxlen=window)
+        self._window_errors = 0
+
+    def push(self, failed):
+        window = self._window
+        if len(window) == window.maxlen and window[0]:
+            self._window_errors -= 1
+        window.append(failed)
+        if failed:
+            self._window_errors += 1
+
+    @property
+    def error_rate(self):
+        return self._window_errors / len(self._window) if self._window else 0.0
+
+    def info(self, now):
+        return {
+            'channel': self.channel,
+            'state': self.state,
+            'fault': self.fault,
+            'error_rate': round(self.error_rate, 3),
+            'reads': self.reads,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'retry_in_s': None if self.next_retry is None else round(max(0.0, self.next_retry - now), 1),
+        }
+
+
+class ChannelMonitor:
+    """Tracks ADC channel health and decides which channels to read.
+
+    A failed read marks its channel degraded; `fail_after` consecutive
+    failures mark it failed and back it off: it is skipped until a retry
+    time that doubles on every failed retry (up to backoff_max), so one bad
+    connector doesn't slow down the reads of the others. A good read clears
+    the backoff. A channel stays degraded while errors remain in its last
+    `window` reads.
+
+    With check_patterns (or on the channels given to check_patterns_on),
+    good reads are also checked for faults that produce plausible-looking
+    voltages: the same reading (within stuck_tolerance_v) `stuck_samples`
+    times in a row, a frozen converter. A steady input gives identical codes
+    too, so readings within rail_margin_v of 0 V or full scale (an oil
+    sender at 0 V, say) never count as stuck, and nothing does while
+    engine_running is False: with the engine off every input may sit still.
+    Also
+    `range_samples` consecutive reads at the ADC's full scale (shorted or
+    over-range), or outside the channel's open-circuit limits (a
+    disconnected sender): below open_circuit_v, or at/above
+    open_circuit_high_v. A sender to ground under a pull-up reads high when
+    its wire breaks; for those the high limit defaults to just under the
+    divider's v_ref (see set_open_circuit_high). These fail the channel
+    until the pattern stops.
+
+    Whatever check_patterns says, `range_samples` readings in a row that
+    the calibration can't turn into a value (see converted()) fail the
+    channel with invalid_value.
+
+    When every channel has failed `bus_reset_after` reads in a row (with no
+    good read on any channel since), bus_reset_due() asks the owner to
+    reinitialise the I2C bus, at most once per bus_reset_interval.
+    """
+
+    def __init__(self, channels, config=None, full_scale=None, check_patterns=True, open_circuit_high=None,
+                 clock=time.monotonic):
+        cfg = config or {}
+        self.fail_after = int(cfg.get('fail_after', 3))
+        self.backoff_initial = float(cfg.get('backoff_initial_s', 0.5))
+        self.backoff_max = float(cfg.get('backoff_max_s', 30.0))
+        self.bus_reset_after = int(cfg.get('bus_reset_after', 5))
+        self.bus_reset_interval = float(cfg.get('bus_reset_interval_s', 30.0))
+        self.stuck_samples = int(cfg.get('stuck_samples', 100))
+        self.stuck_tolerance = float(cfg.get('stuck_tolerance_v', 0.0))
+        self.rail_margin = float(cfg.get('rail_margin_v', 0.05))
+        # Set by the owner; inputs are only expected to move with the engine running
+        self.engine_running = True
+        self.range_samples = int(cfg.get('range_samples', 10))
+        self.clock = clock
+        full_scale = full_scale or {}
+        open_circuit = {int(channel): volts for channel, volts in cfg.get('open_circuit_v', {}).items()}
+        # Configured high limits win over the ones derived from the calibration
+        self._configured_high = {int(channel): volts
+                                 for channel, volts in cfg.get('open_circuit_high_v', {}).items()}
+        window = int(cfg.get('window', 20))
+        self.channels = {
+            channel: ChannelHealth(channel, window, full_scale.get(channel), open_circuit.get(channel))
+            for channel in channels
+        }
+        self.set_open_circuit_high(open_circuit_high)
+        self.check_patterns = check_patterns
+        self.bus_resets = 0
+        # Bumped on every state change, so callers can cache what they derive
+        self.version = 0
+        self._backing_off = 0
+        self._failed_reads = 0
+        self._last_reset = None
+
+    @property
+    def check_patterns(self):
+        return bool(self._pattern_channels)
+
+    @check_patterns.setter
+    def check_patterns(self, enabled):
+        self._pattern_channels = frozenset(self.channels) if enabled else frozenset()
+
+    def check_patterns_on(self, channels):
+        """Run the pattern checks on these channels only."""
+        self._pattern_channels = frozenset(channels) & frozenset(self.channels)
+
+    def set_open_circuit_high(self, limits=None):
+        """Set the derived {channel: volts} high open-circuit limits (e.g. after a calibration change)."""
+        limits = limits or {}
+        for channel, health in self.channels.items():
+            health.open_circuit_high = self._configured_high.get(channel, limits.get(channel))
+
+    def _set(self, health, state, fault):
+        if health.state == state and health.fault == fault:
+            return
+        if state == FAILED:
+            print(f"⚠️ ADC channel {health.channel} failed ({fault})")
+        elif health.state == FAILED:
+            print(f"✅ ADC channel {health.channel} recovered")
+        health.state = state
+        health.fault = fault
+        self.version += 1
+
+    def all_readable(self):
+        """True when no channel is backing off, so a single-pass read is fine."""
+        return not self._backing_off
+
+    def readable(self, channel, now=None):
+        health = self.channels[channel]
+        if health.next_retry is None:
+            return True
+        return (self.clock() if now is None else now) >= health.next_retry
+
+    def usable(self, channel):
+        return self.channels[channel].state != FAILED
+
+    def error(self, channel, exc, now=None):
+        """Record a failed read of `channel`."""
+        health = self.channels[channel]
+        health.reads += 1
+        health.errors += 1
+        health.push(True)
+        health.consecutive_errors += 1
+        health.last_error = str(exc)
+        self._failed_reads += 1
+        if health.consecutive_errors < self.fail_after:
+            if health.state == OK:
+                self._set(health, DEGRADED, I2C_ERROR)
+            return
+        if health.next_retry is None:
+            self._backing_off += 1
+        health.backoff = min(self.backoff_max, health.backoff * 2 if health.backoff else self.backoff_initial)
+        health.next_retry = (self.clock() if now is None else now) + health.backoff
+        self._set(health, FAILED, I2C_ERROR)
+
+    def value(self, channel, voltage):
+        """Record a good read of `channel`. Returns False if the value shouldn't be used."""
+        health = self.channels[channel]
+        health.reads += 1
+        health.push(False)
+        health.consecutive_errors = 0
+        self._failed_reads = 0
+        if health.next_retry is not None:
+            health.next_retry = None
+            health.backoff = 0.0
+            self._backing_off -= 1
+
+        fault = None
+        if channel in self._pattern_channels:
+            full_scale = health.full_scale
+            at_rail = voltage <= self.rail_margin or \
+                (full_scale is not None and voltage >= full_scale - self.rail_margin)
+            if self.engine_running and not at_rail and health.last_value is not None and \
+                    abs(voltage - health.last_value) <= self.stuck_tolerance:
+                # Compared with the run's first reading, so a slow drift still ends the run
+                health.same_count += 1
+            else:
+                health.same_count = 0
+                health.last_value = voltage
+            clipped = voltage < -0.1 or (full_scale is not None and voltage >= full_scale * 0.999)
+            health.range_count = health.range_count + 1 if clipped else 0
+            open_circuit = (health.open_circuit is not None and voltage < health.open_circuit) or \
+                (health.open_circuit_high is not None and voltage >= health.open_circuit_high)
+            health.open_count = health.open_count + 1 if open_circuit else 0
+            if health.same_count >= self.stuck_samples:
+                fault = STUCK
+            elif health.range_count >= self.range_samples:
+                fault = OUT_OF_RANGE
+            elif health.open_count >= self.range_samples:
+                fault = OPEN_CIRCUIT
+        if fault:
+            self._set(health, FAILED, fault)
+            return False
+        if health.invalid_count >= self.range_samples:
+            # Keep passing the reading on: only a good conversion clears this
+            self._set(health, FAILED, INVALID_VALUE)
+            return True
+        self._set_read_state(health)
+        return True
+
+    def _set_read_state(self, health):
+        if health._window_errors:
+            self._set(health, DEGRADED, I2C_ERROR)
+        else:
+            self._set(health, OK, None)
+
+    def converted(self, channel, valid):
+        """Record whether the channel's latest reading converted to a finite value."""
+        health = self.channels[channel]
+        if valid:
+            health.invalid_count = 0
+            if health.fault == INVALID_VALUE:
+                self._set_read_state(health)
+            return
+        health.invalid_count += 1
+        if health.invalid_count >= self.range_samples:
+            self._set(health, FAILED, INVALID_VALUE)
+
+    def bus_reset_due(self, now=None):
+        if self._failed_reads < self.bus_reset_after * len(self.channels):
+            return False
+        now = self.clock() if now is None else now
+        return self._last_reset is None or now - self._last_reset >= self.bus_reset_interval
+
+    def bus_reset(self, now=None):
+        """Note that the bus was reinitialised: retry every channel straight away."""
+        self.bus_resets += 1
+        self._last_reset = self.clock() if now is None else now
+        self._failed_reads = 0
+        self._backing_off = 0
+        for health in self.channels.values():
+            health.next_retry = None
+            health.backoff = 0.0
+            health.consecutive_errors = 0
+
+    def status(self):
+        """{channel: health info} for /api/health."""
+        now = self.clock()
+        return {channel: health.info(now) for channel, health in self.channels.items()}
@@ -0,0 +1,371 @@
+"""Hot-reloaded configuration shared as immutable snapshots.
+
+config/config.json is loaded into a ConfigSnapshot: the config frozen into
+read-only mappings and tuples, plus everything derived from it up front
+(compiled calibrations, threshold and deadband tables, the encoded JSON
+body served at /api/config and its ETag). Readers take `service.snapshot`
+once and use it without locks. A reload builds a complete new snapshot and
+swaps the reference, so nobody sees half an update.
+
+watch() follows the file with inotify (on the config directory, so editors
+that save by renaming are caught too), or by polling its mtime where
+inotify is unavailable. A file that fails validation is reported and the
+running snapshot stays in place.
+"""
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import json
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+from broadcaster import deadbands_from_config
+from calibration import compile_calibration
+from metrics import metrics
+
+METRICS = ('oil_pressure', 'water_temp', 'voltage')
+
+# Settings the running backend picks up on reload (clients refetch the
+# frontend blocks). Changes anywhere else take effect on the next start.
+LIVE_KEYS = (
+    'sensors.calibration',
+    'sensors.smoothing.alpha',
+    'sensors.thresholds',
+    'ups.loss_voltage',
+    'ups.restore_voltage',
+    'ups.debounce_ms',
+    'ups.confirm_s',
+    'display',
+    'ui',
+    'frontend',
+)
+# Exceptions inside LIVE_KEYS: the ADC reader is set up for its channels once
+RESTART_KEYS = ('sensors.calibration.*.channel',)
+
+CONFIG_RELOADS = metrics.counter('config_reloads_total', 'Config file reloads applied')
+CONFIG_RELOAD_ERRORS = metrics.counter('config_reload_errors_total', 'Config file reloads rejected')
+
+
+class ConfigError(ValueError):
+    """The config file is unreadable or fails validation."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__('; '.join(self.errors))
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# (dotted path, required, type check, value check, message)
+RULES = (
+    ('sensors', True, lambda v: isinstance(v, dict), None, 'must be an object'),
+    ('sensors.update_interval_ms', True, _integer, lambda v: v > 0, 'must be a positive integer'),
+    ('sensors.smoothing.alpha', True, _number, lambda v: 0 < v <= 1, 'must be a number in (0, 1]'),
+    ('sensors.calibration', True, lambda v: isinstance(v, dict), None, 'must be an object'),
+    ('sensors.thresholds', False, lambda v: isinstance(v, dict), None, 'must be an object'),
+    ('sensors.broadcast.interval_ms', False, _number, lambda v: v > 0, 'must be a positive number'),
+    ('backend.host', True, lambda v: isinstance(v, str), None, 'must be a string'),
+    ('backend.port', True, _integer, lambda v: 0 < v < 65536, 'must be a port number'),
+    ('ups.loss_voltage', False, _number, None, 'must be a number'),
+    ('ups.restore_voltage', False, _number, None, 'must be a number'),
+    ('ups.debounce_ms', False, _number, lambda v: v >= 0, 'must be a non-negative number'),
+    ('ups.confirm_s', False, _number, lambda v: v >= 0, 'must be a non-negative number'),
+    ('ups.grace_period_s', False, _number, lambda v: v >= 0, 'must be a non-negative number'),
+)
+
+_MISSING = object()
+
+
+def _lookup(config, path):
+    value = config
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def validate_config(config):
+    """Return a list of problems with a parsed config (empty when it is usable)."""
+    if not isinstance(config, dict):
+        return ['config must be a JSON object']
+    errors = []
+    for path, required, type_ok, value_ok, message in RULES:
+        value = _lookup(config, path)
+        if value is _MISSING:
+            if required:
+                errors.append(f'{path} is required')
+        elif not type_ok(value) or (value_ok and not value_ok(value)):
+            errors.append(f'{path} {message}')
+
+    sensors = config.get('sensors')
+    calibration = sensors.get('calibration') if isinstance(sensors, dict) else None
+    if isinstance(calibration, dict):
+        for metric in METRICS:
+            cfg = calibration.get(metric)
+            if cfg is None:
+                continue
+            channel = cfg.get('channel', 0) if isinstance(cfg, dict) else None
+            if not _integer(channel) or not 0 <= channel <= 3:
+                errors.append(f'sensors.calibration.{metric}.channel must be an ADS1115 channel (0-3)')
+                continue
+            try:
+                compile_calibration(metric, cfg)
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append(f'sensors.calibration.{metric}: {e}')
+
+    thresholds = sensors.get('thresholds') if isinstance(sensors, dict) else None
+    if isinstance(thresholds, dict):
+        for metric, entry in thresholds.items():
+            if not isinstance(entry, dict):
+                errors.append(f'sensors.thresholds.{metric} must be an object')
+                continue
+            for key in ('min', 'max', 'deadband', 'hysteresis'):
+                if key in entry and not _number(entry[key]):
+                    errors.append(f'sensors.thresholds.{metric}.{key} must be a number')
+            if _number(entry.get('min')) and _number(entry.get('max')) and entry['min'] >= entry['max']:
+                errors.append(f'sensors.thresholds.{metric}.min must be below max')
+
+    ups = config.get('ups')
+    if isinstance(ups, dict) and _number(ups.get('loss_voltage')) and _number(ups.get('restore_voltage')) \
+            and ups['restore_voltage'] < ups['loss_voltage']:
+        errors.append('ups.restore_voltage must not be below ups.loss_voltage')
+    return errors
+
+
+def freeze(value):
+    """Read-only copy of parsed JSON: dicts become mappingproxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def changed_keys(old, new, prefix=''):
+    """Dotted paths of the leaves that differ between two configs."""
+    if not (isinstance(old, (dict, MappingProxyType)) and isinstance(new, (dict, MappingProxyType))):
+        return [] if old == new else [prefix]
+    changes = []
+    for key in sorted(set(old) | set(new), key=str):
+        path = f'{prefix}.{key}' if prefix else str(key)
+        if key not in old or key not in new:
+            changes.append(path)
+        else:
+            changes.extend(changed_keys(old[key], new[key], path))
+    return changes
+
+
+def restart_required(changes):
+    """The changed paths that only take effect when the backend restarts."""
+    pending = []
+    for path in changes:
+        leaf = path.rsplit('.', 1)[-1]
+        if leaf in ('description', 'notes') or leaf.endswith('_description'):
+            continue
+        live = any(path == key or path.startswith(key + '.') for key in LIVE_KEYS)
+        if not live or any(fnmatch.fnmatchcase(path, pattern) for pattern in RESTART_KEYS):
+            pending.append(path)
+    return pending
+
+
+class ConfigSnapshot:
+    """One loaded config and the structures derived from it. Never mutated."""
+
+    __slots__ = ('config', 'version', 'body', 'etag', 'loaded_at', 'calibrations', 'thresholds', 'deadbands')
+
+    def __init__(self, config, version=1, loaded_at=None):
+        sensors = config.get('sensors', {})
+        calibration = sensors.get('calibration', {})
+        thresholds = sensors.get('thresholds', {})
+        body = json.dumps(config, separators=(',', ':')).encode('utf-8')
+        deadbands = deadbands_from_config(sensors)
+        fields = {
+            'config': freeze(config),
+            'version': version,
+            'body': body,
+            'etag': hashlib.sha1(body).hexdigest()[:20],
+            'loaded_at': time.time() if loaded_at is None else loaded_at,
+            'calibrations': MappingProxyType({
+                metric: compile_calibration(metric, calibration.get(metric)) for metric in METRICS
+            }),
+            # metric -> (low, high, hysteresis); no limit is None, hysteresis defaults to the deadband
+            'thresholds': MappingProxyType({
+                metric: (entry.get('min'), entry.get('max'), float(entry.get('hysteresis', deadbands.get(metric, 0.0))))
+                for metric, entry in thresholds.items()
+            }),
+            'deadbands': MappingProxyType(deadbands),
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ConfigSnapshot is immutable')
+
+
+class InotifyWatcher:
+    """Minimal inotify binding (via libc) reporting writes to one file."""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = 0o2000000
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, fd, name):
+        self.fd = fd
+        self.name = name
+
+    @classmethod
+    def open(cls, path):
+        """Watch `path`, or return None where inotify is unavailable."""
+        path = Path(path).resolve()
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+            fd = libc.inotify_init1(cls.IN_NONBLOCK | cls.IN_CLOEXEC)
+        except (AttributeError, OSError):
+            return None
+        if fd < 0:
+            return None
+        mask = cls.IN_MODIFY | cls.IN_CLOSE_WRITE | cls.IN_MOVED_TO | cls.IN_CREATE
+        if libc.inotify_add_watch(fd, str(path.parent).encode(), mask) < 0:
+            os.close(fd)
+            return None
+        return cls(fd, path.name.encode())
+
+    def wait(self, timeout):
+        """Block up to `timeout` seconds; True if the file was written meanwhile."""
+        # select() is cooperative once gevent has patched it
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(readable) and self.drain()
+
+    def drain(self):
+        """Consume queued events; True if any of them concern the file."""
+        touched = False
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return touched
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = self.EVENT.unpack_from(data, offset)
+                start = offset + self.EVENT.size
+                if data[start:start + length].rstrip(b'\0') == self.name:
+                    touched = True
+                offset = start + length
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ConfigService:
+    """Loads, validates and hot-reloads the config file.
+
+    Listeners are called as callback(old_snapshot, new_snapshot) after each
+    successful reload, from the thread or greenlet running watch().
+    """
+
+    def __init__(self, path, debounce=0.1, poll_interval=1.0):
+        self.path = Path(path)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.last_error = None
+        self._listeners = []
+        raw = self._read()
+        self._digest = hashlib.sha1(raw).digest()
+        # A broken file at startup is fatal, as it always was
+        self._snapshot = ConfigSnapshot(self._parse(raw))
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def _read(self):
+        try:
+            return self.path.read_bytes()
+        except OSError as e:
+            raise ConfigError([f'cannot read {self.path}: {e}'])
+
+    def _parse(self, raw):
+        try:
+            config = json.loads(raw)
+        except ValueError as e:
+            raise ConfigError([f'invalid JSON: {e}'])
+        errors = validate_config(config)
+        if errors:
+            raise ConfigError(errors)
+        return config
+
+    def reload(self):
+        """Re-read the file. Returns the new snapshot, or None if nothing changed or it was rejected."""
+        try:
+            raw = self._read()
+            digest = hashlib.sha1(raw).digest()
+            if digest == self._digest:
+                return None
+            snapshot = ConfigSnapshot(self._parse(raw), version=self._snapshot.version + 1)
+        except ConfigError as e:
+            self.last_error = {'at': time.time(), 'errors': e.errors}
+            CONFIG_RELOAD_ERRORS.inc()
+            print(f"⚠️ Config reload rejected, keeping version {self._snapshot.version}: {e}")
+            return None
+
+        old = self._snapshot
+        self._digest = digest
+        self._snapshot = snapshot
+        self.last_error = None
+        CONFIG_RELOADS.inc()
+        print(f"🔧 Config reloaded (version {snapshot.version})")
+        for callback in self._listeners:
+            try:
+                callback(old, snapshot)
+            except Exception as e:
+                print(f"Error in config listener: {e}")
+        return snapshot
+
+    def _stat(self):
+        try:
+            stat = self.path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def watch(self, sleep=time.sleep):
+        """Reload whenever the file changes. Runs forever; start it as a background task.
+
+        Args:
+            sleep: Sleep function, socketio.sleep under an event loop.
+        """
+        watcher = InotifyWatcher.open(self.path)
+        print(f"👀 Watching {self.path.name} ({'inotify' if watcher else 'polling'})")
+        last_stat = self._stat()
+        while True:
+            if watcher:
+                changed = watcher.wait(self.poll_interval)
+            else:
+                sleep(self.poll_interval)
+                stat = self._stat()
+                changed, last_stat = stat != last_stat, stat
+            if changed:
+                # Editors write in several steps; let them finish
+                sleep(self.debounce)
+                if watcher:
+                    watcher.drain()
+                self.reload()
@@ -0,0 +1,159 @@
+import math
+from array import array
+from bisect import bisect_left, insort
+
+
+class RingBuffer:
+    """Fixed-size circular buffer of floats backed by a preallocated array."""
+
+    __slots__ = ('size', 'count', '_data', '_index')
+
+    def __init__(self, size):
+        self.size = size
+        self.count = 0
+        self._data = array('d', bytes(8 * size))
+        self._index = 0
+
+    def push(self, value):
+        """Append a value. Returns the value it displaced, or None while filling."""
+        evicted = self._data[self._index] if self.count == self.size else None
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        return evicted
+
+    def values(self):
+        """Contents oldest first (allocates a new list)."""
+        if self.count < self.size:
+            return list(self._data[:self.count])
+        return list(self._data[self._index:]) + list(self._data[:self._index])
+
+    def clear(self):
+        self.count = 0
+        self._index = 0
+
+    def __len__(self):
+        return self.count
+
+
+class MedianFilter:
+    """Running median over the last `window` samples for spike rejection.
+
+    Keeps a sorted copy of the window next to the ring buffer, so each sample
+    is one bisect delete and one insort on arrays that never grow past the
+    window size.
+    """
+
+    def __init__(self, window):
+        self._ring = RingBuffer(window)
+        self._sorted = array('d')
+
+    def process(self, value):
+        evicted = self._ring.push(value)
+        if evicted is not None:
+            del self._sorted[bisect_left(self._sorted, evicted)]
+        insort(self._sorted, value)
+        return self._sorted[len(self._sorted) // 2]
+
+    def reset(self):
+        self._ring.clear()
+        del self._sorted[:]
+
+
+class Decimator:
+    """Averages blocks of `factor` samples and emits one value per block.
+
+    Returns None for samples that complete no block.
+    """
+
+    def __init__(self, factor):
+        self.factor = factor
+        self._sum = 0.0
+        self._count = 0
+
+    def process(self, value):
+        self._sum += value
+        self._count += 1
+        if self._count < self.factor:
+            return None
+        result = self._sum / self._count
+        self._sum = 0.0
+        self._count = 0
+        return result
+
+    def reset(self):
+        self._sum = 0.0
+        self._count = 0
+
+
+class KalmanFilter:
+    """Scalar Kalman filter for a slowly varying value (random-walk model).
+
+    process_noise is the variance added per second of elapsed time (or per
+    update when dt is unknown); measurement_noise is the sensor variance.
+    """
+
+    def __init__(self, process_noise=0.01, measurement_noise=1.0):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.estimate = None
+        self.error = 0.0
+
+    def update(self, measurement, dt=None):
+        if not math.isfinite(measurement):
+            # A NaN/inf would stay in the estimate for good; skip it
+            return self.estimate
+        if self.estimate is None:
+            self.estimate = measurement
+            self.error = self.measurement_noise
+            return measurement
+        self.error += self.process_noise * (1.0 if dt is None else dt)
+        gain = self.error / (self.error + self.measurement_noise)
+        self.estimate += gain * (measurement - self.estimate)
+        self.error *= 1.0 - gain
+        return self.estimate
+
+    def reset(self):
+        self.estimate = None
+        self.error = 0.0
+
+
+class FilterPipeline:
+    """Chain of stages, each exposing process(value) -> value or None.
+
+    A stage returning None (e.g. a Decimator mid-block) ends the chain for
+    that sample.
+    """
+
+    def __init__(self, stages=()):
+        self.stages = tuple(stages)
+
+    def process(self, value):
+        for stage in self.stages:
+            value = stage.process(value)
+            if value is None:
+                return None
+        return value
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+
+def build_pipeline(smoothing_config):
+    """Build the stages described by the `sensors.smoothing` block.
+
+    Supported keys: median_window (samples, 1 = off) and decimation (factor,
+    1 = off). The stages run on converted values; oversampling, conversion
+    and the final EMA/Kalman stage are applied by SensorInterface.
+    """
+    cfg = smoothing_config or {}
+    stages = []
+    median_window = int(cfg.get('median_window', 1))
+    if median_window > 1:
+        stages.append(MedianFilter(median_window))
+    decimation = int(cfg.get('decimation', 1))
+    if decimation > 1:
+        stages.append(Decimator(decimation))
+    return FilterPipeline(stages)
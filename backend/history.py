@@ -0,0 +1,172 @@
+import threading
+import time
+from array import array
+
+# Resolution name -> bucket width in seconds
+RESOLUTIONS = {
+    '1s': 1,
+    '10s': 10,
+    '1m': 60,
+}
+
+# Buckets kept per resolution: 2 hours at 1 s, 12 hours at 10 s, 48 hours at 1 min
+DEFAULT_RETENTION = {
+    '1s': 7200,
+    '10s': 4320,
+    '1m': 2880,
+}
+
+
+def _clean(value):
+    """Round away float32 noise; empty buckets (NaN) become None for JSON."""
+    return None if value != value else round(value, 3)
+
+
+class _Tier:
+    """Fixed-capacity ring of min/max/mean buckets for one resolution.
+
+    All storage is preallocated; closed buckets overwrite the oldest slot.
+    The bucket being filled is held in plain accumulators until its window ends.
+    """
+
+    def __init__(self, width, capacity, metrics):
+        self.width = width
+        self.capacity = capacity
+        self.metrics = metrics
+        self.count = 0
+        self.head = 0  # Next slot to write
+        self.times = array('d', bytes(8 * capacity))
+        self.mins = {m: array('f', bytes(4 * capacity)) for m in metrics}
+        self.maxs = {m: array('f', bytes(4 * capacity)) for m in metrics}
+        self.means = {m: array('f', bytes(4 * capacity)) for m in metrics}
+        # Open bucket: start time and per-metric [min, max, sum, count]
+        self.open_start = None
+        self.open = {m: [0.0, 0.0, 0.0, 0] for m in metrics}
+
+    def _close(self):
+        i = self.head
+        self.times[i] = self.open_start
+        for m, acc in self.open.items():
+            if acc[3]:
+                self.mins[m][i] = acc[0]
+                self.maxs[m][i] = acc[1]
+                self.means[m][i] = acc[2] / acc[3]
+            else:
+                nan = float('nan')
+                self.mins[m][i] = self.maxs[m][i] = self.means[m][i] = nan
+            acc[0] = acc[1] = acc[2] = 0.0
+            acc[3] = 0
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def add(self, values, timestamp):
+        start = timestamp - timestamp % self.width
+        if self.open_start is None:
+            self.open_start = start
+        elif start != self.open_start:
+            self._close()
+            self.open_start = start
+        for m, acc in self.open.items():
+            value = values.get(m)
+            if value is None:
+                continue
+            if acc[3] == 0:
+                acc[0] = acc[1] = value
+            else:
+                if value < acc[0]:
+                    acc[0] = value
+                if value > acc[1]:
+                    acc[1] = value
+            acc[2] += value
+            acc[3] += 1
+
+    def _slot(self, logical):
+        """Physical index of the logical-th oldest bucket."""
+        return (self.head - self.count + logical) % self.capacity
+
+    def _first_after(self, start):
+        """Logical index of the first bucket starting after `start` (binary search)."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.times[self._slot(mid)] <= start:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def query(self, metric, since=None):
+        # Buckets overlapping [since, now): those starting after since - width
+        first = 0 if since is None else self._first_after(since - self.width)
+        times, mins, maxs, means = [], [], [], []
+        m_min, m_max, m_mean = self.mins[metric], self.maxs[metric], self.means[metric]
+        for logical in range(first, self.count):
+            i = self._slot(logical)
+            times.append(self.times[i])
+            mins.append(_clean(m_min[i]))
+            maxs.append(_clean(m_max[i]))
+            means.append(_clean(m_mean[i]))
+        acc = self.open[metric]
+        if self.open_start is not None and acc[3]:
+            times.append(self.open_start)
+            mins.append(_clean(acc[0]))
+            maxs.append(_clean(acc[1]))
+            means.append(_clean(acc[2] / acc[3]))
+        return {'t': times, 'min': mins, 'max': maxs, 'mean': means}
+
+
+class TelemetryHistory:
+    """Bounded in-memory telemetry history with multi-resolution rollups.
+
+    Every sample is folded into 1 s, 10 s and 1 min min/max/mean buckets held
+    in preallocated arrays, so memory is fixed regardless of drive length.
+    Queries bisect to the start time and only walk the requested window.
+
+    Buckets are keyed on the monotonic clock (offset to wall time at startup)
+    so an NTP step can't reorder them; times are converted back to the
+    current wall clock when queried.
+    """
+
+    def __init__(self, metrics, retention=None, clock=time.monotonic, wall_clock=time.time):
+        self.metrics = tuple(metrics)
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self._epoch = wall_clock() - clock()
+        retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self._tiers = {
+            name: _Tier(width, int(retention[name]), self.metrics)
+            for name, width in RESOLUTIONS.items()
+        }
+        self._lock = threading.Lock()
+
+    def _step(self):
+        """Seconds the wall clock has been stepped (or slewed) since startup."""
+        return round(self.wall_clock() - self.clock() - self._epoch, 3)
+
+    def add(self, snapshot, timestamp=None):
+        """Record a telemetry snapshot. Signature matches SensorSampler listeners.
+
+        The wall-clock `timestamp` is not used: the sample is bucketed at the
+        current monotonic time.
+        """
+        key = self.clock() + self._epoch
+        with self._lock:
+            for tier in self._tiers.values():
+                tier.add(snapshot, key)
+
+    def query(self, metric, since=None, resolution='1s'):
+        """Return {'t', 'min', 'max', 'mean'} columns for buckets that end after `since`.
+
+        Raises ValueError for an unknown metric or resolution.
+        """
+        if metric not in self.metrics:
+            raise ValueError(f"Unknown metric '{metric}'")
+        if resolution not in self._tiers:
+            raise ValueError(f"Unknown resolution '{resolution}' (expected one of {', '.join(RESOLUTIONS)})")
+        step = self._step()
+        with self._lock:
+            data = self._tiers[resolution].query(metric, None if since is None else since - step)
+        if step:
+            data['t'] = [t + step for t in data['t']]
+        return data
@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+THRESHOLD = 'threshold'
+POWER = 'power'
+SYSTEM = 'system'
+
+
+class EventJournal:
+    """Alarm and power event log: bounded in RAM, appended to disk in batches.
+
+    Threshold excursions come from the WarningEngine (one event per
+    excursion, updated with its peak, end and duration when it clears).
+    Power and system events are recorded directly. The newest `capacity`
+    events are kept in memory for /api/events; older ones are only on disk.
+
+    Events are written as JSON lines by flush(), at most once per
+    `flush_interval` unless forced (power loss, shutdown), with a single
+    fsync per batch, like the trip recorder's chunks. An event
+    that changes after it was written (an excursion that was still open) is
+    written again; load() keeps the last copy of each id. An excursion
+    still open when the process stopped is closed by load() at the time of
+    the last write and marked interrupted. The file is rotated once it
+    passes `max_file_bytes`, keeping one previous file.
+    """
+
+    def __init__(self, path, capacity=1000, flush_interval=300, max_file_bytes=512 * 1024,
+                 max_pending=1000, clock=time.time):
+        self.path = Path(path)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_pending = max_pending
+        self.clock = clock
+        self.dropped = 0
+        self.events_written = 0
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._events = deque(maxlen=capacity)
+        self._open = {}
+        # Events (by id) changed since the last flush, in change order
+        self._pending = {}
+        self._last_flush = None
+        self._next_id = 1
+
+    def load(self):
+        """Read the newest events back from disk (previous file first)."""
+        latest = {}
+        last_write = None
+        for path in (self._rotated_path(), self.path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    lines = f.readlines()
+                    modified = os.fstat(f.fileno()).st_mtime
+            except OSError:
+                continue
+            last_write = modified if last_write is None else max(last_write, modified)
+            for line in lines:
+                try:
+                    event = json.loads(line)
+                    latest[event['id']] = event
+                except (ValueError, KeyError, TypeError):
+                    # A line cut short by a power loss
+                    continue
+        events = sorted(latest.values(), key=lambda event: event['id'])[-self.capacity:]
+        with self._lock:
+            known = {event['id'] for event in self._events}
+            restored = [event for event in events if event['id'] not in known]
+            for event in restored:
+                if event['type'] == THRESHOLD and event.get('end') is None:
+                    # Its real end was never seen: close it at the last flush
+                    end = max(event['start'], last_write)
+                    event['end'] = round(end, 3)
+                    event['duration_s'] = round(end - event['start'], 3)
+                    event['interrupted'] = True
+                    self._changed(event)
+            merged = restored + list(self._events)
+            self._events = deque(merged, maxlen=self.capacity)
+            if events:
+                self._next_id = max(self._next_id, events[-1]['id'] + 1)
+        return len(events)
+
+    def _rotated_path(self):
+        return self.path.with_name(self.path.stem + '.1' + self.path.suffix)
+
+    def _add(self, event):
+        """Store a new event (lock held). Returns it."""
+        event['id'] = self._next_id
+        self._next_id += 1
+        self._events.append(event)
+        self._changed(event)
+        return event
+
+    def _changed(self, event):
+        self._pending.pop(event['id'], None)
+        self._pending[event['id']] = event
+        while len(self._pending) > self.max_pending:
+            # Writes are held back too long; lose the oldest rather than grow
+            self._pending.pop(next(iter(self._pending)))
+            self.dropped += 1
+
+    def record(self, kind, **fields):
+        """Record a point-in-time event (power, system). Returns it."""
+        with self._lock:
+            return dict(self._add({'type': kind, 'time': round(self.clock(), 3), **fields}))
+
+    def warning_changes(self, changes, ended):
+        """WarningEngine listener: open and close threshold excursions."""
+        with self._lock:
+            for metric, info in ended.items():
+                event = self._open.pop(metric, None)
+                if event is None:
+                    continue
+                event['end'] = round(info['end'], 3)
+                event['duration_s'] = round(info['end'] - info['since'], 3)
+                event['peak'] = info['peak']
+                self._changed(event)
+            for metric, info in changes.items():
+                if info is None:
+                    continue
+                self._open[metric] = self._add({
+                    'type': THRESHOLD,
+                    'metric': metric,
+                    'level': info['level'],
+                    'start': round(info['since'], 3),
+                    'end': None,
+                    'duration_s': None,
+                    'value': info['value'],
+                    'peak': info['peak'],
+                })
+
+    def query(self, limit=50, before=None, kind=None, metric=None, since=None):
+        """Newest-first page of events.
+
+        Args:
+            limit: Events per page (1-500).
+            before: Only events with a smaller id: the 'next' cursor of the previous page.
+            kind: Only this event type (threshold, power, system).
+            metric: Only threshold events for this metric.
+            since: Only events that started or happened at or after this Unix time.
+
+        Returns {'events': [...], 'next': cursor or None}.
+        """
+        if not 1 <= limit <= 500:
+            raise ValueError("limit must be between 1 and 500")
+        with self._lock:
+            events = list(self._events)
+        page = []
+        for event in reversed(events):
+            if before is not None and event['id'] >= before:
+                continue
+            if kind and event['type'] != kind:
+                continue
+            if metric and event.get('metric') != metric:
+                continue
+            if since is not None and event.get('start', event.get('time')) < since:
+                continue
+            if len(page) == limit:
+                return {'events': page, 'next': page[-1]['id']}
+            page.append(dict(event))
+        return {'events': page, 'next': None}
+
+    def flush(self, force=False):
+        """Append the changed events to the journal file. Returns the number written.
+
+        Without force, writes at most once per flush_interval.
+        """
+        with self._write_lock:
+            now = time.monotonic()
+            if not force and self._last_flush is not None and now - self._last_flush < self.flush_interval:
+                return 0
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                lines = [json.dumps(event, separators=(',', ':')) + '\n' for event in pending.values()]
+            self._last_flush = now
+            if not lines:
+                return 0
+            data = ''.join(lines).encode('utf-8')
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.path.exists() and self.path.stat().st_size + len(data) > self.max_file_bytes:
+                    os.replace(self.path, self._rotated_path())
+                with open(self.path, 'ab') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError:
+                # Keep the batch for the next attempt, behind anything newer
+                with self._lock:
+                    for event_id, event in pending.items():
+                        self._pending.setdefault(event_id, event)
+                raise
+            self.events_written += len(lines)
+            return len(lines)
@@ -0,0 +1,142 @@
+"""Low-overhead counters and histograms, exported in Prometheus text format.
+
+Instruments are created once at import time and updated on hot paths.
+Updating one allocates nothing beyond the float being recorded: counts live
+in preallocated arrays and histogram buckets are found by bisection over
+fixed bounds. Updates take no lock. Each instrument is updated from one
+thread (the sampler, the UPS reader or the event loop), and a rare lost
+increment under contention is an acceptable price for that.
+
+    ADC_READ_SECONDS = metrics.histogram('adc_read_seconds', 'Time to read all ADC channels')
+
+    start = time.perf_counter()
+    ...
+    ADC_READ_SECONDS.observe(time.perf_counter() - start)
+"""
+from array import array
+from bisect import bisect_left
+
+# Seconds; suits everything from an EMA step to a slow I2C transaction
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _format(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._value = array('d', (0.0,))
+
+    def inc(self, amount=1):
+        self._value[0] += amount
+
+    @property
+    def value(self):
+        return self._value[0]
+
+    def render(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter',
+                f'{self.name} {_format(self._value[0])}']
+
+
+class Gauge:
+    """Value read from `read()` when metrics are exported."""
+
+    def __init__(self, name, help, read):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def render(self):
+        try:
+            value = self.read()
+        except Exception:
+            value = None
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge']
+        if value is not None:
+            lines.append(f'{self.name} {_format(value)}')
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram. bounds are upper bucket limits, ascending."""
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.bounds = tuple(sorted(buckets))
+        # One extra slot for observations above the last bound (+Inf)
+        self._counts = array('Q', bytes(8 * (len(self.bounds) + 1)))
+        self._sum = array('d', (0.0,))
+
+    def observe(self, value):
+        self._counts[bisect_left(self.bounds, value)] += 1
+        self._sum[0] += value
+
+    @property
+    def count(self):
+        return sum(self._counts)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (e.g. 0.99), or None if empty."""
+        total = self.count
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self._counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self._counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format(bound)}"}} {cumulative}')
+        lines.append(f'{self.name}_sum {_format(self._sum[0])}')
+        lines.append(f'{self.name}_count {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Named instruments. Asking twice for a name returns the same instrument."""
+
+    def __init__(self, namespace='infotainment'):
+        self.namespace = namespace
+        self._metrics = {}
+
+    def _get(self, cls, name, *args):
+        full_name = f'{self.namespace}_{name}' if self.namespace else name
+        metric = self._metrics.get(full_name)
+        if metric is None:
+            metric = self._metrics[full_name] = cls(full_name, *args)
+        return metric
+
+    def counter(self, name, help):
+        return self._get(Counter, name, help)
+
+    def gauge(self, name, help, read):
+        return self._get(Gauge, name, help, read)
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help, buckets)
+
+    def render(self):
+        """Every instrument in Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,152 @@
+import threading
+import time
+
+ONLINE = 'ONLINE'
+ON_BATTERY = 'ON_BATTERY'
+GRACE = 'GRACE'
+SHUTDOWN = 'SHUTDOWN'
+
+
+class PowerStateMachine:
+    """UPS power state driven by input voltage readings as they arrive.
+
+    ONLINE -> ON_BATTERY once readings have stayed below loss_voltage for
+    `debounce` seconds (so at least two consecutive low frames).
+    ON_BATTERY -> GRACE after `confirm` more seconds on battery (rides
+    through cranking dips before committing to a countdown).
+    GRACE -> SHUTDOWN when `grace_period` expires. SHUTDOWN is final.
+    With a battery runtime estimate (set_runtime_estimate) the deadline moves
+    to what the battery can sustain, bounded by min/max_grace_period.
+
+    Power counts as restored only when readings stay at or above
+    restore_voltage for `debounce` seconds, so a single noisy reading neither
+    trips nor cancels a shutdown.
+
+    update() is called for every parsed UPS frame. tick() advances the timers
+    when no frames arrive. Listeners get (previous, state, info) on every
+    transition, from whichever thread called update() or tick().
+    """
+
+    def __init__(self, loss_voltage=4.0, restore_voltage=4.5, debounce=0.3, confirm=2.0,
+                 grace_period=60.0, min_grace_period=None, max_grace_period=None, clock=time.monotonic):
+        self.loss_voltage = loss_voltage
+        self.restore_voltage = restore_voltage
+        self.debounce = debounce
+        self.confirm = confirm
+        self.grace_period = grace_period
+        self.default_grace_period = grace_period
+        self.min_grace_period = grace_period if min_grace_period is None else min_grace_period
+        self.max_grace_period = grace_period if max_grace_period is None else max_grace_period
+        self.clock = clock
+
+        self.state = ONLINE
+        self.input_voltage = None
+        self._entered = clock()
+        self._low_since = None
+        self._high_since = None
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Register callback(previous, state, info) for state transitions."""
+        self._listeners.append(callback)
+
+    def seconds_remaining(self, now=None):
+        """Seconds until SHUTDOWN while in GRACE, else None."""
+        if self.state != GRACE:
+            return None
+        now = self.clock() if now is None else now
+        return max(0.0, self.grace_period - (now - self._entered))
+
+    def set_runtime_estimate(self, seconds, now=None):
+        """Base the GRACE deadline on `seconds` of safe runtime left (None = no estimate)."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            if seconds is None:
+                self.grace_period = self.default_grace_period
+                return
+            elapsed = now - self._entered if self.state == GRACE else 0.0
+            self.grace_period = min(max(elapsed + seconds, self.min_grace_period), self.max_grace_period)
+
+    def info(self, now=None):
+        remaining = self.seconds_remaining(now)
+        return {
+            'state': self.state,
+            'input_voltage': self.input_voltage,
+            'seconds_remaining': None if remaining is None else round(remaining, 1),
+        }
+
+    def update(self, input_voltage, now=None):
+        """Feed one Vin reading (one UPS frame)."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.input_voltage = input_voltage
+            if input_voltage < self.loss_voltage:
+                self._high_since = None
+                if self._low_since is None:
+                    self._low_since = now
+            elif input_voltage >= self.restore_voltage:
+                self._low_since = None
+                if self._high_since is None:
+                    self._high_since = now
+            else:
+                # Inside the hysteresis band: neither loss nor restore makes progress
+                self._low_since = None
+                self._high_since = None
+            transitions = self._advance(now, reading=True)
+        self._notify(transitions, now)
+
+    def tick(self, now=None):
+        """Advance time-based transitions without a new reading."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            transitions = self._advance(now)
+        self._notify(transitions, now)
+
+    def reset(self, now=None):
+        """Return to ONLINE, e.g. when the UPS itself goes away."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._low_since = None
+            self._high_since = None
+            transitions = []
+            if self.state != ONLINE:
+                self._set(ONLINE, now, transitions)
+        self._notify(transitions, now)
+
+    def _set(self, state, now, transitions):
+        transitions.append((self.state, state))
+        self.state = state
+        self._entered = now
+
+    def _advance(self, now, reading=False):
+        transitions = []
+        if self.state == SHUTDOWN:
+            return transitions
+        # Loss and restore are only confirmed by a reading, never by the clock alone
+        if reading:
+            if self.state == ONLINE:
+                if self._low_since is not None and now - self._low_since >= self.debounce:
+                    self._set(ON_BATTERY, now, transitions)
+            elif self._high_since is not None and now - self._high_since >= self.debounce:
+                self._set(ONLINE, now, transitions)
+                return transitions
+        if self.state == ON_BATTERY and now - self._entered >= self.confirm:
+            self._set(GRACE, now, transitions)
+        if self.state == GRACE and now - self._entered >= self.grace_period:
+            self._set(SHUTDOWN, now, transitions)
+        return transitions
+
+    def _notify(self, transitions, now):
+        for previous, state in transitions:
+            info = {
+                'state': state,
+                'previous': previous,
+                'input_voltage': self.input_voltage,
+                'seconds_remaining': self.grace_period if state == GRACE else None,
+            }
+            for callback in self._listeners:
+                try:
+                    callback(previous, state, info)
+                except Exception as e:
+                    print(f"Error in power state listener {callback!r}: {e}")
@@ -0,0 +1,247 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+# Columns recorded for every sample. 'timestamp' is stored as float64,
+# everything else as float32 with NaN for missing values.
+DEFAULT_COLUMNS = (
+    'timestamp',
+    'oil_pressure',
+    'water_temp',
+    'voltage',
+    'ups_voltage',
+    'ups_capacity',
+    'ups_input_voltage',
+    'ups_charging',
+)
+
+UPS_FIELDS = {
+    'ups_voltage': 'voltage',
+    'ups_capacity': 'capacity',
+    'ups_input_voltage': 'input_voltage',
+    'ups_charging': 'charging',
+}
+
+SEGMENT_SUFFIX = '.mtrip'
+
+# Chunk layout (little endian):
+#   header   magic, version, n_columns, n_rows, t_first, t_last, names_len, payload_len
+#   names    column names, utf-8, NUL separated
+#   payload  zlib(column arrays concatenated in name order)
+CHUNK_MAGIC = b'MTRP'
+CHUNK_VERSION = 1
+CHUNK_HEADER = struct.Struct('<4sBHIddHI')
+
+
+def _typecode(column):
+    return 'd' if column == 'timestamp' else 'f'
+
+
+def encode_chunk(columns, level=6):
+    """Serialise {name: array} columns of equal length into one chunk."""
+    names = tuple(columns)
+    n_rows = len(columns[names[0]]) if names else 0
+    timestamps = columns.get('timestamp')
+    t_first = timestamps[0] if timestamps else 0.0
+    t_last = timestamps[-1] if timestamps else 0.0
+    name_bytes = '\0'.join(names).encode('utf-8')
+    payload = zlib.compress(b''.join(columns[name].tobytes() for name in names), level)
+    header = CHUNK_HEADER.pack(CHUNK_MAGIC, CHUNK_VERSION, len(names), n_rows,
+                               t_first, t_last, len(name_bytes), len(payload))
+    return header + name_bytes + payload
+
+
+class TripRecorder:
+    """Buffers telemetry in RAM and writes it to disk in large compressed chunks.
+
+    Samples are appended to per-column arrays. Every `flush_interval` seconds
+    (or when asked, e.g. on UPS power loss) the buffer is swapped out and a
+    writer thread compresses it into one chunk appended to the current
+    segment file, followed by a single fsync. A new segment file is started
+    once the current one passes `max_segment_bytes`. This keeps SD card
+    writes rare and large.
+
+    run_blocking(fn, args) runs compression and disk writes, e.g. on a native
+    thread pool when serving from an event loop.
+    """
+
+    def __init__(self, directory, flush_interval=300, max_segment_bytes=8 * 1024 * 1024,
+                 compression_level=6, columns=DEFAULT_COLUMNS, run_blocking=None):
+        self.directory = Path(directory)
+        self.run_blocking = run_blocking
+        self.flush_interval = flush_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.compression_level = compression_level
+        self.columns = tuple(columns)
+        self.trip_id = time.strftime('trip-%Y%m%d-%H%M%S')
+        self.segment = 0
+        self.chunks_written = 0
+        self.bytes_written = 0
+
+        self._lock = threading.Lock()
+        self._buffer = self._new_buffer()
+        self._last_flush = time.monotonic()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='trip-writer', daemon=True)
+        self._writer.start()
+
+    def _new_buffer(self):
+        return {name: array(_typecode(name)) for name in self.columns}
+
+    @property
+    def buffered_rows(self):
+        return len(self._buffer['timestamp'])
+
+    def record(self, snapshot, timestamp, ups=None):
+        """Append one sample. `ups` is an optional UPSInterface.get_status() dict."""
+        nan = float('nan')
+        with self._lock:
+            buffer = self._buffer
+            for name in self.columns:
+                if name == 'timestamp':
+                    value = timestamp
+                elif name in UPS_FIELDS:
+                    value = ups.get(UPS_FIELDS[name], nan) if ups and ups.get('available') else nan
+                else:
+                    value = snapshot.get(name, nan)
+                buffer[name].append(nan if value is None else float(value))
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self, wait=False, timeout=None):
+        """Hand the buffered samples to the writer thread.
+
+        With wait=True, block until everything queued so far is on disk
+        (used on power loss and shutdown). Returns False if the timeout expired.
+        """
+        with self._lock:
+            self._last_flush = time.monotonic()
+            buffer = self._buffer
+            if len(buffer['timestamp']):
+                self._buffer = self._new_buffer()
+                self._queue.put(buffer)
+        if not wait:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _segment_path(self):
+        return self.directory / f'{self.trip_id}-{self.segment:03d}{SEGMENT_SUFFIX}'
+
+    def _write_chunk(self, columns):
+        chunk = encode_chunk(columns, self.compression_level)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._segment_path()
+        if path.exists() and path.stat().st_size + len(chunk) > self.max_segment_bytes:
+            self.segment += 1
+            path = self._segment_path()
+        with open(path, 'ab') as f:
+            f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        self.chunks_written += 1
+        self.bytes_written += len(chunk)
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif self.run_blocking is None:
+                    self._write_chunk(item)
+                else:
+                    self.run_blocking(self._write_chunk, (item,))
+            except Exception as e:
+                print(f"Error writing trip log: {e}")
+            finally:
+                self._queue.task_done()
+
+
+class SegmentReader:
+    """Reads chunks from a segment file through a read-only memory map.
+
+    Chunk headers are parsed in place, so listing a segment doesn't read the
+    compressed payloads. Use as a context manager or call close().
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def headers(self):
+        """Yield (offset, names, n_rows, t_first, t_last, payload_offset, payload_len) per chunk.
+
+        Stops at the first truncated or corrupt chunk (e.g. power cut mid-write).
+        """
+        data = self._map
+        offset = 0
+        end = len(data)
+        while offset + CHUNK_HEADER.size <= end:
+            magic, version, _, n_rows, t_first, t_last, names_len, payload_len = \
+                CHUNK_HEADER.unpack_from(data, offset)
+            if magic != CHUNK_MAGIC or version != CHUNK_VERSION:
+                return
+            names_offset = offset + CHUNK_HEADER.size
+            payload_offset = names_offset + names_len
+            if payload_offset + payload_len > end:
+                return
+            names = bytes(data[names_offset:payload_offset]).decode('utf-8').split('\0')
+            yield offset, names, n_rows, t_first, t_last, payload_offset, payload_len
+            offset = payload_offset + payload_len
+
+    def chunks(self):
+        """Yield {column: array} for each chunk in the segment."""
+        for _, names, n_rows, _, _, payload_offset, payload_len in self.headers():
+            raw = zlib.decompress(self._map[payload_offset:payload_offset + payload_len])
+            columns = {}
+            position = 0
+            for name in names:
+                column = array(_typecode(name))
+                size = column.itemsize * n_rows
+                column.frombytes(raw[position:position + size])
+                position += size
+                columns[name] = column
+            yield columns
+
+
+def list_trips(directory):
+    """Return {trip_id: [segment paths in order]} for recorded trips."""
+    trips = {}
+    for path in sorted(Path(directory).glob(f'trip-*{SEGMENT_SUFFIX}')):
+        trip_id = path.stem.rsplit('-', 1)[0]
+        trips.setdefault(trip_id, []).append(path)
+    return trips
+
+
+def iter_samples(paths):
+    """Yield one dict per recorded sample across the given segments, in order.
+
+    NaN (missing) values are omitted from each sample.
+    """
+    for path in paths:
+        with SegmentReader(path) as reader:
+            for columns in reader.chunks():
+                names = list(columns)
+                for row in zip(*(columns[name] for name in names)):
+                    yield {name: value for name, value in zip(names, row) if value == value}
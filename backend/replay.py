@@ -0,0 +1,75 @@
+import time
+
+from recorder import UPS_FIELDS
+
+SENSOR_FIELDS = ('oil_pressure', 'water_temp', 'voltage')
+
+
+def parse_speed(value):
+    """Playback speed from 'max' (no pacing: None) or a multiplier above 0."""
+    if value is None or value == 'max':
+        return None
+    speed = float(value)
+    if not speed > 0:
+        raise ValueError("speed must be greater than 0, or 'max'")
+    return speed
+
+
+def sample_to_frame(sample):
+    """Convert a recorded sample into a telemetry_update payload."""
+    frame = {name: round(sample[name], 1) for name in SENSOR_FIELDS if name in sample}
+    ups = {}
+    for column, field in UPS_FIELDS.items():
+        if column in sample:
+            ups[field] = bool(sample[column]) if field == 'charging' else round(sample[column], 2)
+    if ups:
+        ups['available'] = True
+        frame['ups'] = ups
+    return frame
+
+
+class TripReplayer:
+    """Pushes recorded samples through an emit callback with their original timing.
+
+    speed scales time (2.0 plays twice as fast) and must be above 0;
+    speed=None replays as fast as possible. Each frame is scheduled against an absolute deadline computed from
+    the replay start, so sleep jitter doesn't accumulate over a long trip.
+    """
+
+    def __init__(self, samples, emit, speed=1.0, clock=time.monotonic, sleep=time.sleep):
+        if speed is not None and not speed > 0:
+            raise ValueError("speed must be greater than 0 (None for no pacing)")
+        self.samples = samples
+        self.emit = emit
+        self.speed = speed
+        self.clock = clock
+        self.sleep = sleep
+        self.frames_sent = 0
+        self.late_frames = 0
+        self.max_lateness = 0.0
+
+    def run(self, stop=None):
+        """Replay every sample. `stop` is an optional threading.Event to abort early."""
+        start = None
+        first_t = None
+        for sample in self.samples:
+            if stop is not None and stop.is_set():
+                break
+            t = sample.get('timestamp')
+            if self.speed and t is not None:
+                if start is None:
+                    start = self.clock()
+                    first_t = t
+                deadline = start + (t - first_t) / self.speed
+                delay = deadline - self.clock()
+                if delay > 0:
+                    self.sleep(delay)
+                else:
+                    lateness = -delay
+                    # Anything over a millisecond behind schedule counts as late
+                    if lateness > 0.001:
+                        self.late_frames += 1
+                    self.max_lateness = max(self.max_lateness, lateness)
+            self.emit(sample_to_frame(sample))
+            self.frames_sent += 1
+        return self.frames_sent
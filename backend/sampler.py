@@ -0,0 +1,107 @@
+import time
+import threading
+
+from metrics import metrics
+
+TICK_SECONDS = metrics.histogram('sampler_tick_seconds', 'Duration of one sampler tick: read, filter, publish and listeners')
+TICK_OVERRUNS = metrics.counter('sampler_overruns_total', 'Sampler ticks that overran the sample interval')
+
+
+class SensorSampler:
+    """Background thread that owns the ADC and publishes the latest telemetry.
+
+    The sampler is the only caller of SensorInterface.poll(), so the
+    I2C bus is touched once per interval no matter how many clients are
+    connected. Each tick builds a fresh dict and swaps it into a single slot;
+    readers grab the reference without locking and must treat it as read-only.
+
+    run_blocking(fn, args) executes the bus read. Under an event loop server
+    it should hand the call to a native thread pool so I2C waits don't stall
+    the loop; by default the read runs inline on the sampler thread.
+    """
+
+    def __init__(self, sensor_interface, interval_ms=1000, run_blocking=None):
+        self.sensor_interface = sensor_interface
+        self.interval = interval_ms / 1000.0
+        self.run_blocking = run_blocking
+        self._snapshot = {}
+        self._snapshot_time = None
+        self._last_sample = None
+        self._listeners = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback):
+        """Register callback(snapshot, timestamp), called from the sampler thread after each tick."""
+        self._listeners.append(callback)
+
+    def latest(self):
+        """Return the most recent snapshot in O(1) without touching the bus."""
+        return self._snapshot
+
+    @property
+    def last_update(self):
+        """Wall-clock time (time.time()) of the latest snapshot, or None before the first sample."""
+        return self._snapshot_time
+
+    def sample_once(self):
+        """Take one reading, publish it and notify listeners.
+
+        Returns the new snapshot, or None if the filter pipeline is decimating
+        and produced no output this tick.
+        """
+        now = time.monotonic()
+        dt = None if self._last_sample is None else now - self._last_sample
+        self._last_sample = now
+
+        if self.run_blocking is None:
+            snapshot = self.sensor_interface.poll(dt)
+        else:
+            snapshot = self.run_blocking(self.sensor_interface.poll, (dt,))
+        if snapshot is None:
+            return None
+        timestamp = time.time()
+        # Publish the snapshot before its timestamp so a reader never sees a
+        # timestamp newer than the data it describes.
+        self._snapshot = snapshot
+        self._snapshot_time = timestamp
+
+        for callback in self._listeners:
+            try:
+                callback(snapshot, timestamp)
+            except Exception as e:
+                print(f"Error in sampler listener {callback!r}: {e}")
+        return snapshot
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                self.sample_once()
+            except Exception as e:
+                print(f"Error sampling sensors: {e}")
+            TICK_SECONDS.observe(time.perf_counter() - start)
+
+            # Schedule against absolute deadlines so read time doesn't add drift
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Overran the interval (slow bus); resync instead of bursting
+                TICK_OVERRUNS.inc()
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='sensor-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
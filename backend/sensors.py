@@ -1,11 +1,148 @@
+import math
 import random
 import time
 
+from calibration import ResistanceSender, compile_calibrations
+from channel_health import ChannelMonitor, FULL_SCALE, OK
+from filters import KalmanFilter, build_pipeline
+from metrics import metrics
+
+ADC_READ_SECONDS = metrics.histogram('adc_read_seconds', 'Time to read every configured ADC channel once')
+ADC_READS = metrics.counter('adc_reads_total', 'Passes over the ADC channels')
+ADC_ERRORS = metrics.counter('adc_read_errors_total', 'Failed ADC reads (whole pass or single channel)')
+FILTER_SECONDS = metrics.histogram('sensor_filter_seconds', 'Time to convert and smooth one sample')
+BUS_RESETS = metrics.counter('i2c_bus_resets_total', 'I2C bus reinitialisations after repeated ADC failures')
+
+# ADC channel used for each metric when the calibration config doesn't say
+DEFAULT_CHANNELS = {
+    'oil_pressure': 0,
+    'water_temp': 1,
+    'voltage': 2,
+}
+
+
+def parse_gain(value):
+    """Accept ADS1115 gains as numbers or strings like "2/3"."""
+    if isinstance(value, str) and '/' in value:
+        num, den = value.split('/', 1)
+        return float(num) / float(den)
+    return float(value)
+
+
+def _finite(value):
+    return value is not None and math.isfinite(value)
+
+
+class MockADC:
+    """Stand-in ADC for mock mode returning random voltages between 0 and 5V."""
+
+    def __init__(self, channels=(0, 1, 2, 3)):
+        self.channels = tuple(channels)
+
+    def read_channel(self, channel):
+        return random.uniform(0, 5.0)
+
+    def read_all(self):
+        return {channel: random.uniform(0, 5.0) for channel in self.channels}
+
+
+class ADS1115Driver:
+    """ADS1115 access with channel objects built once at startup.
+
+    Each channel can have its own gain and data rate (samples per second); the
+    chip registers are only rewritten when the next channel needs different
+    settings. With a single channel configured the chip runs in continuous
+    conversion mode and reads are a bare conversion-register fetch. With
+    several channels it stays in single-shot mode, where the library polls the
+    conversion-ready bit instead of sleeping a fixed two conversion periods on
+    every mux change.
+
+    adc_config (the `sensors.adc` config block) supports:
+        i2c_address: I2C address of the chip (default 0x48)
+        gain / data_rate: defaults for all channels
+        mode: "auto" (default), "continuous" or "single"
+        channels: {"<n>": {"gain": ..., "data_rate": ...}} per-channel overrides
+    """
+
+    def __init__(self, channels, adc_config=None):
+        self.i2c = None
+        self._open(tuple(channels), adc_config)
+
+    def _open(self, channels, adc_config):
+        import board
+        import busio
+        import adafruit_ads1x15.ads1115 as ADS
+        from adafruit_ads1x15.ads1x15 import Mode
+        from adafruit_ads1x15.analog_in import AnalogIn
+
+        self._config = adc_config
+        cfg = adc_config or {}
+        default_gain = parse_gain(cfg.get('gain', 1))
+        default_rate = int(cfg.get('data_rate', 128))
+        overrides = cfg.get('channels', {})
+
+        self.i2c = i2c = busio.I2C(board.SCL, board.SDA)
+        self.ads = ADS.ADS1115(i2c, gain=default_gain, data_rate=default_rate,
+                               address=int(cfg.get('i2c_address', 0x48)))
+
+        mode = cfg.get('mode', 'auto')
+        continuous = mode == 'continuous' or (mode == 'auto' and len(channels) == 1)
+        self.ads.mode = Mode.CONTINUOUS if continuous else Mode.SINGLE
+
+        # channel -> (AnalogIn, gain, data_rate); ADS1115 pins are plain ints 0-3
+        self._channels = {}
+        for channel in channels:
+            override = overrides.get(str(channel), {})
+            self._channels[channel] = (
+                AnalogIn(self.ads, channel),
+                parse_gain(override.get('gain', default_gain)),
+                int(override.get('data_rate', default_rate)),
+            )
+        self._order = tuple(self._channels)
+
+    def read_channel(self, channel):
+        chan, gain, data_rate = self._channels[channel]
+        ads = self.ads
+        # Setters write the config register, so skip them when nothing changes
+        if ads.gain != gain:
+            ads.gain = gain
+        if ads.data_rate != data_rate:
+            ads.data_rate = data_rate
+        return chan.voltage
+
+    def read_all(self):
+        """Read every configured channel in one pass. Returns {channel: voltage}."""
+        read = self.read_channel
+        return {channel: read(channel) for channel in self._order}
+
+    def reset(self):
+        """Release and reopen the I2C bus, e.g. after a glitch left it hung."""
+        if self.i2c is not None:
+            try:
+                self.i2c.deinit()
+            except Exception:
+                pass
+            self.i2c = None
+        self._open(self._order, self._config)
+
+
 class SensorInterface:
-    def __init__(self, mock=True, alpha=0.2, config=None):
+    def __init__(self, mock=True, alpha=0.2, config=None, ema_period=None, adc_config=None,
+                 smoothing=None, health=None, emulation=None, defer_hardware=False):
         self.mock = mock
+        self.adc_config = adc_config
+        # Why hardware mode fell back to mock readings, if it did
+        self.hardware_error = None
+        # sensors.emulation: in mock mode, read an emulated ADS1115 instead of random voltages
+        self.emulation = emulation
         self.alpha = alpha  # EMA smoothing factor
         self.config = config or {}  # Sensor calibration config
+        # Conversions are compiled once; the hot path never reads the config dict
+        self._converters = compile_calibrations(self.config, DEFAULT_CHANNELS)
+        # Sample period (seconds) that alpha is tuned for. When set, callers can
+        # pass the elapsed time to get_telemetry() and the EMA decays with
+        # wall-clock time instead of per call.
+        self.ema_period = ema_period
         
         # Store previous EMA values for each telemetry metric
         self._ema_values = {
@@ -13,120 +150,386 @@ class SensorInterface:
             'water_temp': None,
             'voltage': None,
         }
-        # In a real scenario, initialize I2C/ADC here
-        if not mock:
+
+        # Filter pipeline (sensors.smoothing): convert `oversample` ADC reads per
+        # sample as one batch and average them, run median/decimation stages on
+        # the converted value, then smooth it with the EMA or a Kalman stage.
+        smoothing = smoothing or {}
+        self.smoothing_enabled = smoothing.get('enabled', True)
+        self.oversample = max(1, int(smoothing.get('oversample', 1)))
+        self.decimation = max(1, int(smoothing.get('decimation', 1)))
+        self.filter_stage = smoothing.get('stage', 'ema')
+        self._pipelines = {metric: build_pipeline(smoothing) for metric in DEFAULT_CHANNELS}
+        kalman_cfg = smoothing.get('kalman', {})
+        self._kalman = {
+            metric: KalmanFilter(kalman_cfg.get('process_noise', 0.01), kalman_cfg.get('measurement_noise', 1.0))
+            for metric in DEFAULT_CHANNELS
+        }
+        self._pending_dt = None
+        self._telemetry = None
+        # Last converted value per metric, fed again while its reads can't be converted
+        self._last_samples = {metric: None for metric in DEFAULT_CHANNELS}
+        # Smoothing state restored from a previous run, applied on first reading
+        self._warm_seeds = {}
+
+        # Map each metric to its ADC channel from the calibration config
+        self.channels = {
+            metric: self.config.get(metric, {}).get('channel', default)
+            for metric, default in DEFAULT_CHANNELS.items()
+        }
+
+        # Per-channel health (sensors.health): failing channels are backed off,
+        # and their metric reads None instead of a made-up value. A read that
+        # fails once reuses the channel's last good voltage.
+        adc_channels = sorted(set(self.channels.values()))
+        self.health = ChannelMonitor(adc_channels, health, full_scale=self._full_scale(adc_channels),
+                                     check_patterns=not mock, open_circuit_high=self._open_circuit_high())
+        # Stuck-reading checks only while the engine runs, judged from the battery
+        # voltage (charging); unknown until the first sample
+        self.engine_running_v = float((health or {}).get('engine_running_v', 13.2))
+        self.health.engine_running = False
+        self._held = {channel: 0.0 for channel in adc_channels}
+        self._health_version = None
+        self._health_summary = {}
+
+        # With defer_hardware the ADC (and its board/I2C imports) is set up by
+        # a later init_hardware() call; poll() returns None until then.
+        self.adc = None
+        if mock or not defer_hardware:
+            self.init_hardware()
+
+    @property
+    def ready(self):
+        return self.adc is not None
+
+    def init_hardware(self):
+        """Open the ADC, falling back to mock readings if it can't be used."""
+        if self.adc is not None:
+            return
+        adc_channels = sorted(set(self.channels.values()))
+        adc = None
+        if not self.mock:
             try:
-                import board
-                import busio
-                import adafruit_ads1x15.ads1115 as ADS
-                from adafruit_ads1x15.analog_in import AnalogIn
-                
-                i2c = busio.I2C(board.SCL, board.SDA)
-                self.adc = ADS.ADS1115(i2c)
+                adc = ADS1115Driver(adc_channels, self.adc_config)
             except ImportError:
                 print("Warning: ADC libraries not installed. Install with: pip install adafruit-circuitpython-ads1x15")
                 self.mock = True
+                self.hardware_error = "ADC libraries not installed"
             except Exception as e:
                 print(f"Warning: Could not initialize ADC: {e}. Falling back to mock mode.")
                 self.mock = True
-        
+                self.hardware_error = str(e)
+        if adc is None:
+            adc = self._mock_adc(adc_channels)
+        self.adc = adc
+        if isinstance(adc, MockADC):
+            # Random mock voltages would look like faults
+            self.health.check_patterns = False
+        else:
+            # The emulator only asks for checks where faults are injected, so a
+            # noiseless constant waveform isn't reported as a stuck sender
+            self.health.check_patterns_on(getattr(adc, 'fault_channels', adc_channels))
+
+    def _mock_adc(self, channels):
+        emulation = self.emulation
+        if not emulation or not emulation.get('enabled', True):
+            return MockADC(channels)
+        from adc_emulator import EmulatedADS1115
+        try:
+            return EmulatedADS1115(channels, self.adc_config, emulation, self._converters)
+        except (ValueError, KeyError, OSError) as e:
+            print(f"Warning: Invalid sensor emulation config: {e}. Using random mock readings.")
+            return MockADC(channels)
+
+    def _full_scale(self, channels):
+        """{channel: full-scale volts} from the ADC gain settings."""
+        cfg = self.adc_config or {}
+        default_gain = parse_gain(cfg.get('gain', 1))
+        overrides = cfg.get('channels', {})
+        return {
+            channel: FULL_SCALE.get(parse_gain(overrides.get(str(channel), {}).get('gain', default_gain)))
+            for channel in channels
+        }
+
+    def _open_circuit_high(self):
+        """{channel: volts} at which a sender under a pull-up resistor reads as disconnected."""
+        limits = {}
+        for metric, channel in self.channels.items():
+            convert = self._converters[metric]
+            if isinstance(convert, ResistanceSender):
+                # A broken wire leaves the input pulled up to v_ref, less a little noise
+                limits[channel] = convert.v_ref * 0.99
+        return limits
+
+    def set_calibration(self, config, converters=None):
+        """Swap in a new calibration config while sampling continues.
+
+        The next poll() converts with the new calibrations; smoothing state is
+        kept, so values glide to the new readings. Channel assignments are
+        fixed when the ADC is set up and are not changed here.
+
+        Args:
+            config: The sensors.calibration block.
+            converters: Already compiled calibrations for it, if at hand.
+        """
+        self._converters = dict(converters or compile_calibrations(config, DEFAULT_CHANNELS))
+        self.config = config
+        self._last_samples = {metric: None for metric in DEFAULT_CHANNELS}
+        self.health.set_open_circuit_high(self._open_circuit_high())
+
     def _oil_pressure_from_voltage(self, voltage):
         """Convert voltage to oil pressure using config calibration."""
-        cfg = self.config.get('oil_pressure', {})
-        if cfg.get('type') == 'linear':
-            min_v = cfg.get('min_voltage', 0.0)
-            max_v = cfg.get('max_voltage', 5.0)
-            min_val = cfg.get('min_value', 0)
-            max_val = cfg.get('max_value', 100)
-            # Linear interpolation
-            return min_val + (voltage - min_v) * (max_val - min_val) / (max_v - min_v)
-        # Fallback to default
-        return voltage * 20.0
+        return self._converters['oil_pressure'](voltage)
 
     def _water_temp_from_voltage(self, voltage):
         """Convert voltage to water temperature using config calibration."""
-        cfg = self.config.get('water_temp', {})
-        if cfg.get('type') == 'linear':
-            min_v = cfg.get('min_voltage', 0.0)
-            max_v = cfg.get('max_voltage', 5.0)
-            min_val = cfg.get('min_value', 50)
-            max_val = cfg.get('max_value', 200)
-            return min_val + (voltage - min_v) * (max_val - min_val) / (max_v - min_v)
-        # Fallback to default
-        return (voltage * 30.0) + 50.0
+        return self._converters['water_temp'](voltage)
 
     def _battery_voltage_from_voltage(self, voltage):
         """Convert measured voltage to actual battery voltage using config."""
-        cfg = self.config.get('voltage', {})
-        if cfg.get('type') == 'voltage_divider':
-            ratio = cfg.get('divider_ratio', 3.0)
-            return voltage * ratio
-        # Fallback to default
-        return voltage * 3.0
-
-    def _apply_ema(self, metric, raw_value):
+        return self._converters['voltage'](voltage)
+
+    def _effective_alpha(self, dt):
+        """Scale alpha to the elapsed time so smoothing is independent of call rate."""
+        if dt is None or not self.ema_period:
+            return self.alpha
+        return 1.0 - (1.0 - self.alpha) ** (dt / self.ema_period)
+
+    def _apply_ema(self, metric, raw_value, dt=None):
         """Apply exponential moving average smoothing.
         If no previous EMA exists, initialize with the raw value.
         """
         prev = self._ema_values.get(metric)
+        if not math.isfinite(raw_value):
+            # A NaN/inf would stay in the average for good; skip it
+            return prev
         if prev is None:
             ema = raw_value
         else:
-            ema = self.alpha * raw_value + (1 - self.alpha) * prev
+            alpha = self._effective_alpha(dt)
+            ema = alpha * raw_value + (1 - alpha) * prev
         self._ema_values[metric] = ema
         return ema
 
     def read_voltage(self, channel):
         """Reads raw voltage from the ADC channel.
-        
+
         Args:
             channel: ADC channel number (0-3)
-            
+
         Returns:
-            Voltage reading (0-5V range)
+            Voltage reading (0-5V range), or None if the read failed or the
+            channel is failed or backing off
         """
-        if self.mock:
-            # Return a random voltage between 0 and 5V
-            return random.uniform(0, 5.0)
-        else:
-            try:
-                from adafruit_ads1x15.analog_in import AnalogIn
-                import adafruit_ads1x15.ads1115 as ADS
-                
-                # Map channel numbers to ADS pins
-                pins = [ADS.P0, ADS.P1, ADS.P2, ADS.P3]
-                chan = AnalogIn(self.adc, pins[channel])
-                
-                # ADS1115 returns voltage directly
-                return chan.voltage
-            except Exception as e:
-                print(f"Error reading ADC channel {channel}: {e}")
-                return 0.0
-
-    def get_telemetry(self):
-        """Returns a dictionary of sensor readings converted to appropriate units with EMA smoothing."""
-        if self.mock:
-            # Simulate realistic raw voltages
-            raw_oil = random.uniform(0, 5)
-            raw_temp = random.uniform(0, 5)
-            raw_volt = random.uniform(0, 5)
-        else:
-            raw_oil = self.read_voltage(0)
-            raw_temp = self.read_voltage(1)
-            raw_volt = self.read_voltage(2)
+        health = self.health
+        if not health.readable(channel):
+            return None
+        try:
+            voltage = self.adc.read_channel(channel)
+        except Exception as e:
+            ADC_ERRORS.inc()
+            health.error(channel, e)
+            return None
+        return voltage if health.value(channel, voltage) else None
+
+    def filter_state(self):
+        """Smoothing state worth carrying over to the next run (see restore_filter_state)."""
+        return {
+            metric: {
+                'ema': self._ema_values.get(metric),
+                'kalman': [self._kalman[metric].estimate, self._kalman[metric].error],
+            }
+            for metric in DEFAULT_CHANNELS
+        }
 
-        # Convert raw voltages to physical units
-        oil_pressure_raw = self._oil_pressure_from_voltage(raw_oil)
-        water_temp_raw = self._water_temp_from_voltage(raw_temp)
-        voltage_raw = self._battery_voltage_from_voltage(raw_volt)
+    def restore_filter_state(self, state, tolerance=None):
+        """Seed the smoothing stage from filter_state() of an earlier run.
 
-        # Apply EMA smoothing
-        oil_pressure = self._apply_ema('oil_pressure', oil_pressure_raw)
-        water_temp = self._apply_ema('water_temp', water_temp_raw)
-        voltage = self._apply_ema('voltage', voltage_raw)
+        Seeds are provisional: each one is used only if the first live reading
+        of its metric is within tolerance[metric] of it, so a stale seed (e.g.
+        engine cooled down since) never drags the gauge.
+        """
+        tolerance = tolerance or {}
+        for metric, seed in state.items():
+            if metric in DEFAULT_CHANNELS and metric in tolerance:
+                self._warm_seeds[metric] = (seed, tolerance[metric])
 
-        return {
-            'oil_pressure': round(oil_pressure, 1),
-            'water_temp': round(water_temp, 1),
-            'voltage': round(voltage, 1)
+    def _apply_warm_seed(self, metric, value):
+        seed, tolerance = self._warm_seeds.pop(metric)
+        ema = seed.get('ema')
+        estimate, error = seed.get('kalman') or (None, 0.0)
+        anchor = estimate if self.filter_stage == 'kalman' else ema
+        if anchor is None or abs(value - anchor) > tolerance:
+            return
+        self._ema_values[metric] = ema
+        self._kalman[metric].estimate = estimate
+        self._kalman[metric].error = error
+
+    def _smooth(self, metric, value, dt):
+        """Final smoothing stage on a converted value."""
+        if not _finite(value):
+            # Unconvertible reading (e.g. open-circuit sender): hold the last output
+            return self._telemetry.get(metric) if self._telemetry else None
+        if not self.smoothing_enabled:
+            return value
+        if self._warm_seeds and metric in self._warm_seeds:
+            self._apply_warm_seed(metric, value)
+        if self.filter_stage == 'kalman':
+            return self._kalman[metric].update(value, dt)
+        return self._apply_ema(metric, value, dt)
+
+    def _read_all(self):
+        """One pass over the ADC channels: {channel: voltage or None}."""
+        ADC_READS.inc()
+        health = self.health
+        start = time.perf_counter()
+        try:
+            if health.all_readable():
+                try:
+                    readings = self.adc.read_all()
+                except Exception:
+                    ADC_ERRORS.inc()
+                    # Read channel by channel to find the one(s) failing
+                    readings = None
+                else:
+                    value = health.value
+                    for channel, voltage in readings.items():
+                        if not value(channel, voltage):
+                            readings[channel] = None
+            else:
+                readings = None
+            if readings is None:
+                readings = {channel: self.read_voltage(channel) for channel in self._held}
+            if health.bus_reset_due():
+                self._reset_bus()
+            return readings
+        finally:
+            ADC_READ_SECONDS.observe(time.perf_counter() - start)
+
+    def _reset_bus(self):
+        """Reopen the I2C bus after every channel kept failing."""
+        print("🔄 Reinitialising the I2C bus after repeated ADC failures")
+        self.health.bus_reset()
+        BUS_RESETS.inc()
+        reset = getattr(self.adc, 'reset', None)
+        if reset is None:
+            return
+        try:
+            reset()
+        except Exception as e:
+            print(f"Error reinitialising the I2C bus: {e}")
+
+    def _read_oversampled(self):
+        """`oversample` consecutive reads of every channel: {channel: [voltages]}, skipping failed reads."""
+        batches = {channel: [] for channel in self._held}
+        for _ in range(self.oversample):
+            for channel, value in self._read_all().items():
+                if value is not None:
+                    batches.setdefault(channel, []).append(value)
+        return batches
+
+    def _convert(self, metric, voltages):
+        """Convert one channel's batch of reads; the mean of the convertible values, or None."""
+        values = [value for value in self._converters[metric].convert_many(voltages) if _finite(value)]
+        if not values:
+            return None
+        return values[0] if len(values) == 1 else sum(values) / len(values)
+
+    def poll(self, dt=None):
+        """Take one sample through the filter pipeline.
+
+        Returns a new telemetry dict when the pipeline produced an output, or
+        None when a decimation stage is still filling its block.
+
+        Args:
+            dt: Seconds since the previous poll. Only used when ema_period is set
+                or the Kalman stage is active.
+        """
+        if self.adc is None:
+            return None
+        if dt is not None:
+            self._pending_dt = dt + (self._pending_dt or 0.0)
+
+        batches = self._read_oversampled()
+        start = time.perf_counter()
+        held = self._held
+        for channel, voltages in batches.items():
+            if voltages:
+                held[channel] = voltages[-1]
+        converted = self.health.converted
+        last_samples = self._last_samples
+        filtered = {}
+        emitted = False
+        for metric, channel in self.channels.items():
+            # Failed channels convert their held voltage so decimation stays in step
+            sample = self._convert(metric, batches.get(channel) or [held.get(channel, 0.0)])
+            converted(channel, sample is not None)
+            if sample is None:
+                # Unconvertible (e.g. open-circuit sender): repeat the last good value
+                sample = last_samples[metric]
+            else:
+                last_samples[metric] = sample
+            if sample is not None:
+                filtered[metric] = self._pipelines[metric].process(sample)
+                # Stages share one config, so metrics emit on the same samples
+                emitted = emitted or filtered[metric] is not None
+        if not emitted:
+            return None
+
+        dt, self._pending_dt = self._pending_dt, None
+
+        # Apply EMA (or Kalman) smoothing
+        oil_pressure = self._smooth('oil_pressure', filtered.get('oil_pressure'), dt)
+        water_temp = self._smooth('water_temp', filtered.get('water_temp'), dt)
+        voltage = self._smooth('voltage', filtered.get('voltage'), dt)
+
+        telemetry = {
+            'oil_pressure': None if oil_pressure is None else round(oil_pressure, 1),
+            'water_temp': None if water_temp is None else round(water_temp, 1),
+            'voltage': None if voltage is None else round(voltage, 1)
         }
+        # Before blanking: a stuck battery channel must not read as engine off and clear itself
+        self.health.engine_running = voltage is not None and voltage >= self.engine_running_v
+        telemetry['sensor_health'] = self._sensor_health(telemetry)
+        self._telemetry = telemetry
+        FILTER_SECONDS.observe(time.perf_counter() - start)
+        return self._telemetry
+
+    def _sensor_health(self, telemetry):
+        """Blank out metrics on failed channels; returns {metric: {state, fault}} for the unhealthy ones."""
+        health = self.health
+        if health.version != self._health_version:
+            summary = {}
+            for metric, channel in self.channels.items():
+                channel_health = health.channels[channel]
+                if channel_health.state != OK:
+                    summary[metric] = {'state': channel_health.state, 'fault': channel_health.fault}
+            self._health_summary = summary
+            self._health_version = health.version
+        for metric, channel in self.channels.items():
+            if not health.usable(channel):
+                telemetry[metric] = None
+                # Start smoothing afresh once the channel recovers
+                self._ema_values[metric] = None
+                self._kalman[metric].reset()
+        return self._health_summary
+
+    def get_telemetry(self, dt=None):
+        """Returns a dictionary of sensor readings converted to appropriate units with EMA smoothing.
+
+        Unlike poll(), returns the latest pipeline output if this sample was
+        absorbed by decimation. Returns None only before init_hardware() has
+        run (defer_hardware) or while no reading has been converted yet.
+
+        Args:
+            dt: Seconds since the previous sample. Only used when ema_period is set.
+        """
+        if self.adc is None:
+            return self._telemetry
+        telemetry = self.poll(dt)
+        # The first output needs at most one decimation block; never spin past it
+        for _ in range(self.decimation - 1):
+            if telemetry is not None or self._telemetry is not None:
+                break
+            telemetry = self.poll()
+        return telemetry if telemetry is not None else self._telemetry
@@ -0,0 +1,33 @@
+"""Production entry point for the backend.
+
+Serves HTTP and Socket.IO from a single gevent event loop instead of the
+threaded Werkzeug development server: every client shares one loop, and the
+sampler, UPS reader, broadcaster and recorder run as greenlets. Blocking I2C
+reads and disk writes are handed to gevent's native thread pool (see
+run_blocking in app.py). No debugger or reloader.
+
+    python3 server.py
+"""
+# Times the imports below when BACKEND_PROFILE_STARTUP is set; imports
+# nothing that monkey patching needs to see first
+from startup_profile import profiler
+
+from gevent import monkey
+
+# Must run before anything imports socket/threading/select
+monkey.patch_all()
+profiler.mark('gevent_patched')
+
+import os
+
+os.environ.setdefault('BACKEND_ASYNC_MODE', 'gevent')
+
+from app import app, socketio, CONFIG
+
+if __name__ == '__main__':
+    host = CONFIG['backend']['host']
+    port = CONFIG['backend']['port']
+    print(f"Serving backend on {host}:{port} ({os.environ['BACKEND_ASYNC_MODE']})")
+    # Greenlets only run once the server has bound and entered the event loop
+    socketio.start_background_task(profiler.mark, 'server_listening')
+    socketio.run(app, host=host, port=port)
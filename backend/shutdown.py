@@ -0,0 +1,153 @@
+import threading
+import time
+
+POWEROFF = 'poweroff'
+REBOOT = 'reboot'
+
+
+class ShutdownHook:
+    def __init__(self, name, callback, priority, budget):
+        self.name = name
+        self.callback = callback
+        self.priority = priority
+        self.budget = budget
+
+
+class ShutdownCoordinator:
+    """Runs registered shutdown hooks, then powers off within a fixed deadline.
+
+    Hooks run in ascending priority order. Hooks sharing a priority are
+    independent and run in parallel; the next priority starts once each has
+    finished or used up its own budget (seconds). A hook that overruns its
+    budget is abandoned, not awaited, so a slow hook can't take its
+    neighbours' time. Whatever happens, power_off(action) is called no later
+    than `deadline` seconds after run() starts.
+
+    power_off returns False when it didn't power off (mock mode); if it
+    does that or raises, the coordinator is free for another run. Otherwise
+    it stays claimed, as the system is going down.
+
+    Each hook is timed; run() returns one result per hook:
+    {name, priority, budget, status, duration}, status being ok, error,
+    timeout (abandoned at its budget) or skipped (the deadline was already
+    spent).
+    """
+
+    def __init__(self, power_off, deadline=15.0, clock=time.monotonic):
+        self.power_off = power_off
+        self.deadline = deadline
+        self.clock = clock
+        self.hooks = []
+        self.action = None
+        self.results = []
+        self._lock = threading.Lock()
+
+    def register(self, name, callback, priority=50, budget=2.0):
+        """Add callback() to run on shutdown. Lower priority runs first."""
+        self.hooks.append(ShutdownHook(name, callback, priority, budget))
+
+    @property
+    def in_progress(self):
+        return self.action is not None
+
+    def start(self, action=POWEROFF):
+        """Run the shutdown on a background thread. Returns False if one is already under way."""
+        if not self._claim(action):
+            return False
+        threading.Thread(target=self._run, name='shutdown', daemon=True).start()
+        return True
+
+    def run(self, action=POWEROFF):
+        """Run the shutdown on the calling thread. Returns the hook results, or None if already under way."""
+        if not self._claim(action):
+            return None
+        return self._run()
+
+    def _claim(self, action):
+        with self._lock:
+            if self.action is not None:
+                return False
+            self.action = action
+            return True
+
+    def _groups(self):
+        groups = {}
+        for hook in self.hooks:
+            groups.setdefault(hook.priority, []).append(hook)
+        return [groups[priority] for priority in sorted(groups)]
+
+    def _run(self):
+        powering_off = False
+        try:
+            started = self.clock()
+            end = started + self.deadline
+            results = []
+            for group in self._groups():
+                remaining = end - self.clock()
+                if remaining <= 0:
+                    results.extend(self._result(hook, 'skipped') for hook in group)
+                    continue
+                results.extend(self._run_group(group, remaining))
+
+            self.results = results
+            for result in results:
+                duration = '' if result['duration'] is None else f" in {result['duration'] * 1000:.0f}ms"
+                print(f"   {result['name']}: {result['status']}{duration}")
+            print(f"🛑 Shutdown hooks finished in {self.clock() - started:.2f}s, {self.action}")
+            try:
+                powering_off = self.power_off(self.action) is not False
+            except Exception as e:
+                print(f"Error during {self.action}: {e}")
+            return results
+        finally:
+            if not powering_off:
+                # Nothing is going down, so later restart/shutdown requests must not get 409
+                with self._lock:
+                    self.action = None
+
+    def _run_group(self, group, remaining):
+        outcomes = {}
+
+        def call(hook):
+            hook_start = self.clock()
+            try:
+                hook.callback()
+                status = 'ok'
+            except Exception as e:
+                print(f"Error in shutdown hook {hook.name}: {e}")
+                status = 'error'
+            outcomes[hook.name] = (status, self.clock() - hook_start)
+
+        threads = []
+        for hook in group:
+            thread = threading.Thread(target=call, args=(hook,), name=f'shutdown-{hook.name}', daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        # Each hook gets its own budget (capped by the time left before the
+        # deadline); shortest first, so every join waits only on its own end time
+        group_start = time.monotonic()
+        abandoned = set()
+        for hook, thread in sorted(zip(group, threads), key=lambda pair: pair[0].budget):
+            thread.join(max(0.0, group_start + min(hook.budget, remaining) - time.monotonic()))
+            if thread.is_alive():
+                abandoned.add(hook.name)
+
+        results = []
+        for hook in group:
+            if hook.name in abandoned or hook.name not in outcomes:
+                results.append(self._result(hook, 'timeout'))
+            else:
+                status, duration = outcomes[hook.name]
+                results.append(self._result(hook, status, duration))
+        return results
+
+    @staticmethod
+    def _result(hook, status, duration=None):
+        return {
+            'name': hook.name,
+            'priority': hook.priority,
+            'budget': hook.budget,
+            'status': status,
+            'duration': None if duration is None else round(duration, 3),
+        }
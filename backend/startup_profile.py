@@ -0,0 +1,140 @@
+"""Startup profiler for the backend, enabled with BACKEND_PROFILE_STARTUP=1.
+
+Records when each startup phase completes, measured from process start (as
+reported by /proc, so interpreter start-up counts too), plus how long every
+module took to import. The report is logged once the first telemetry frame
+goes out and is served at /api/debug/startup.
+
+Import it before anything heavy: only imports made after it are timed. It
+deliberately imports nothing beyond the standard modules already loaded at
+interpreter start, so it is safe to import ahead of gevent's monkey patching.
+"""
+import _thread
+import builtins
+import os
+import sys
+import time
+
+ENV_VAR = 'BACKEND_PROFILE_STARTUP'
+
+
+def _process_age():
+    """Seconds since this process started, from /proc (0.0 where unavailable)."""
+    try:
+        with open('/proc/self/stat') as f:
+            # Fields after the parenthesised command name; starttime is field 22
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupProfiler:
+    """Phase timestamps and per-module import times for one startup.
+
+    When disabled every method is a cheap no-op, so call sites don't need
+    to check.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.finished = False
+        self._origin = time.monotonic() - _process_age()
+        self._phases = []
+        self._marked = set()
+        # module -> [total seconds, self seconds (excluding nested imports)]
+        self._imports = {}
+        self._stacks = {}
+        self._original_import = None
+        if enabled:
+            self.mark('profiler_loaded')
+            self._install()
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv(ENV_VAR, '').lower() in ('1', 'true', 'yes'))
+
+    def mark(self, phase):
+        """Record that `phase` completed now. Only the first mark of a phase counts."""
+        if not self.enabled or phase in self._marked:
+            return
+        self._marked.add(phase)
+        self._phases.append((phase, time.monotonic() - self._origin))
+
+    def finish(self, phase=None):
+        """Mark the last phase, stop timing imports and log the report (once)."""
+        if not self.enabled or self.finished:
+            return
+        if phase:
+            self.mark(phase)
+        self.finished = True
+        self._uninstall()
+        self.log_report()
+
+    def _install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def _uninstall(self):
+        if self._original_import is not None and builtins.__import__ == self._timed_import:
+            builtins.__import__ = self._original_import
+        self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if level:
+            package = (globals or {}).get('__package__') or ''
+            base = package.rsplit('.', level - 1)[0] if level > 1 else package
+            module = f'{base}.{name}' if name else base
+        else:
+            module = name
+        if module in sys.modules or original is None:
+            return (original or builtins.__import__)(name, globals, locals, fromlist, level)
+
+        # One stack of nested import timings per thread
+        stack = self._stacks.setdefault(_thread.get_ident(), [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            entry = self._imports.setdefault(module, [0.0, 0.0])
+            entry[0] += elapsed
+            entry[1] += elapsed - nested
+
+    def report(self, top=30):
+        """Phases in order and the `top` slowest imports by cumulative time."""
+        if not self.enabled:
+            return {'enabled': False}
+        imports = sorted(self._imports.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            'enabled': True,
+            'finished': self.finished,
+            'phases': [{'phase': phase, 'at_s': round(at, 3)} for phase, at in self._phases],
+            'import_count': len(imports),
+            'import_self_total_s': round(sum(entry[1] for _, entry in imports), 3),
+            'imports': [
+                {'module': module, 'total_ms': round(total * 1000, 1), 'self_ms': round(own * 1000, 1)}
+                for module, (total, own) in imports[:top]
+            ],
+        }
+
+    def log_report(self, top=15):
+        report = self.report(top)
+        print("⏱️ Startup profile (seconds since process start):")
+        previous = 0.0
+        for phase in report['phases']:
+            print(f"   {phase['at_s']:7.3f}  (+{phase['at_s'] - previous:.3f})  {phase['phase']}")
+            previous = phase['at_s']
+        print(f"   {report['import_count']} modules imported, {report['import_self_total_s']:.3f}s in total. Slowest:")
+        for entry in report['imports']:
+            print(f"   {entry['total_ms']:8.1f}ms  (self {entry['self_ms']:.1f}ms)  {entry['module']}")
+
+
+profiler = StartupProfiler.from_env()
@@ -0,0 +1,173 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from adc_emulator import EmulatedADS1115, Trace, build_waveform, invert_calibration, trip_points, I2C_OVERHEAD_S
+from calibration import compile_calibrations
+from recorder import TripRecorder
+from sensors import SensorInterface, DEFAULT_CHANNELS
+
+ADC = {'gain': 1, 'data_rate': 475}
+EMULATION = {
+    'seed': 7,
+    'channels': {
+        '0': {'waveform': {'type': 'sine', 'offset': 2.0, 'amplitude': 0.5, 'period_s': 1.0}, 'noise': 'engine'},
+        '1': {'waveform': {'type': 'ramp', 'start': 0.5, 'end': 3.5, 'period_s': 10.0}, 'noise': 'quiet'},
+        '2': {'waveform': {'type': 'constant', 'value': 4.0}, 'noise': 'quiet'},
+    },
+}
+CALIBRATION = {
+    'oil_pressure': {'type': 'linear', 'min_voltage': 0, 'max_voltage': 5, 'min_value': 0, 'max_value': 100},
+    'water_temp': {'type': 'linear', 'min_voltage': 0, 'max_voltage': 5, 'min_value': 50, 'max_value': 200},
+    'voltage': {'type': 'voltage_divider', 'divider_ratio': 3.0},
+}
+
+
+def reads(adc, passes=200):
+    return [adc.read_all() for _ in range(passes)]
+
+
+class TestEmulatedADS1115:
+    def test_same_seed_same_readings(self):
+        first = reads(EmulatedADS1115([0, 1, 2], ADC, EMULATION))
+        assert reads(EmulatedADS1115([0, 1, 2], ADC, EMULATION)) == first
+        assert reads(EmulatedADS1115([0, 1, 2], ADC, dict(EMULATION, seed=8))) != first
+
+    def test_channel_noise_independent_of_other_channels(self):
+        emulation = {'channels': {'0': {'waveform': {'value': 2.0}, 'noise': {'gaussian_v': 0.01}}}}
+        both = reads(EmulatedADS1115([0, 1], ADC, emulation), 50)
+        alone = EmulatedADS1115([0], ADC, emulation)
+        assert [r[0] for r in both] == [alone.read_channel(0) for _ in range(50)]
+
+    def test_quantised_and_clipped(self):
+        adc = EmulatedADS1115([0], {'gain': 1}, {'channels': {'0': {'waveform': {'value': 5.0}}}})
+        lsb = 4.096 / 32768
+        assert adc.read_channel(0) == pytest.approx(32767 * lsb)
+        adc = EmulatedADS1115([0], {'gain': 1}, {'channels': {'0': {'waveform': {'value': 1.00003}}}})
+        assert adc.read_channel(0) == pytest.approx(round(1.00003 / lsb) * lsb)
+
+    def test_virtual_time_follows_conversion_time(self):
+        adc = EmulatedADS1115([0, 1], {'data_rate': 128}, EMULATION)
+        adc.read_all()
+        assert adc.now() == pytest.approx(2 * (1 / 128 + I2C_OVERHEAD_S))
+        adc.advance(1.0)
+        assert adc.now() == pytest.approx(1.0 + 2 * (1 / 128 + I2C_OVERHEAD_S))
+        # One channel: continuous mode, reads only pay for the I2C transfer
+        adc = EmulatedADS1115([0], {'data_rate': 128}, EMULATION)
+        adc.read_channel(0)
+        assert adc.now() == pytest.approx(I2C_OVERHEAD_S)
+
+    def test_realtime_sleeps_each_conversion(self):
+        clock = [100.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            clock[0] += seconds
+
+        adc = EmulatedADS1115([0, 1], {'data_rate': 250}, dict(EMULATION, realtime=True),
+                              clock=lambda: clock[0], sleep=sleep)
+        adc.read_all()
+        assert slept == [pytest.approx(1 / 250 + I2C_OVERHEAD_S)] * 2
+        assert adc.now() == pytest.approx(sum(slept))
+
+    def test_channel_faults(self):
+        emulation = {'channels': {
+            '0': {'waveform': {'type': 'ramp', 'start': 1.0, 'end': 3.0, 'period_s': 1.0},
+                  'faults': [{'type': 'stuck', 'at_s': 0.1, 'duration_s': 0.2}]},
+            '1': {'waveform': {'value': 2.0}, 'faults': [{'type': 'i2c_error', 'at_s': 0.1, 'rate': 1.0}]},
+        }}
+        adc = EmulatedADS1115([0, 1], ADC, emulation)
+        adc.read_channel(1)
+        adc.advance(0.1)
+        with pytest.raises(OSError):
+            adc.read_channel(1)
+        held = adc.read_channel(0)
+        adc.advance(0.1)
+        assert adc.read_channel(0) == held
+        adc.advance(0.2)
+        assert adc.read_channel(0) != held
+
+    def test_bus_hang_until_reset(self):
+        adc = EmulatedADS1115([0], ADC, dict(EMULATION, faults=[{'type': 'bus_hang', 'at_s': 0.5}]))
+        adc.read_channel(0)
+        adc.advance(0.5)
+        with pytest.raises(OSError):
+            adc.read_all()
+        adc.reset()
+        adc.read_all()
+
+    def test_unknown_waveform_rejected(self):
+        with pytest.raises(ValueError):
+            build_waveform({'type': 'square'})
+
+
+class TestTraces:
+    def test_trace_interpolates_and_loops(self):
+        trace = Trace([(10.0, 1.0), (12.0, 2.0), (14.0, 1.0)])
+        assert trace(1.0) == pytest.approx(1.5)
+        assert trace(3.0) == pytest.approx(1.5)
+        assert trace(5.0) == pytest.approx(1.5)
+        held = Trace([(0.0, 1.0), (1.0, 3.0)], loop=False)
+        assert held(0.5) == pytest.approx(2.0)
+        assert held(7.0) == 3.0
+
+    def test_invert_calibration(self):
+        convert = compile_calibrations(CALIBRATION, DEFAULT_CHANNELS)['water_temp']
+        assert invert_calibration(convert, 125.0, 0.0, 4.096) == pytest.approx(2.5)
+
+    def test_recorded_trip_plays_back(self, tmp_path):
+        recorder = TripRecorder(tmp_path)
+        for i in range(5):
+            recorder.record({'oil_pressure': 20.0 + i, 'water_temp': 150.0, 'voltage': 13.0}, 1000.0 + i)
+        assert recorder.flush(wait=True, timeout=5)
+        converters = compile_calibrations(CALIBRATION, DEFAULT_CHANNELS)
+        points = trip_points(tmp_path / recorder.trip_id, 'oil_pressure', converters['oil_pressure'])
+        assert [round(v, 4) for _, v in points] == [1.0, 1.05, 1.1, 1.15, 1.2]
+
+        sensors = SensorInterface(mock=True, alpha=1.0, config=CALIBRATION, emulation={'channels': {
+            '0': {'waveform': {'type': 'trace', 'trip': str(tmp_path / recorder.trip_id), 'metric': 'oil_pressure'}},
+        }})
+        assert sensors.get_telemetry()['oil_pressure'] == 20.0
+
+
+class TestEmulatedPipeline:
+    def sensors(self, emulation):
+        return SensorInterface(mock=True, alpha=0.5, config=CALIBRATION, adc_config=ADC, emulation=emulation,
+                               smoothing={'oversample': 4}, health={'range_samples': 3, 'open_circuit_v': {'1': 0.05}})
+
+    def run(self, sensors, polls=50):
+        telemetry = []
+        for _ in range(polls):
+            telemetry.append(sensors.get_telemetry(0.1))
+            sensors.adc.advance(0.1)
+        return telemetry
+
+    def test_pipeline_is_reproducible(self):
+        first = self.run(self.sensors(EMULATION))
+        assert self.run(self.sensors(EMULATION)) == first
+        assert first[-1]['voltage'] == 12.0
+        assert all(not t['sensor_health'] for t in first)
+
+    def test_noiseless_constant_is_not_stuck(self):
+        # Only channel 2 configured, and without noise: every read is the same code
+        emulation = {'channels': {'2': {'waveform': {'type': 'constant', 'value': 4.0}}}}
+        sensors = SensorInterface(mock=True, alpha=0.5, config=CALIBRATION, adc_config=ADC, emulation=emulation)
+        assert sensors.adc.fault_channels == ()
+        telemetry = self.run(sensors, 120)
+        assert telemetry[-1]['voltage'] == 12.0
+        assert None not in (telemetry[-1]['oil_pressure'], telemetry[-1]['water_temp'])
+        assert telemetry[-1]['sensor_health'] == {}
+
+    def test_open_circuit_fault_reaches_telemetry(self):
+        emulation = {'seed': 1, 'channels': dict(EMULATION['channels'], **{
+            '1': {'waveform': {'value': 2.0}, 'noise': 'quiet', 'faults': [{'type': 'open_circuit', 'at_s': 1.0}]},
+        })}
+        telemetry = self.run(self.sensors(emulation), 20)
+        assert telemetry[5]['water_temp'] == pytest.approx(110.0, abs=0.5)
+        assert telemetry[-1]['water_temp'] is None
+        assert telemetry[-1]['sensor_health'] == {'water_temp': {'state': 'failed', 'fault': 'open_circuit'}}
+        assert telemetry[-1]['oil_pressure'] is not None
@@ -24,3 +24,167 @@ def test_config_endpoint(client):
     data = json.loads(rv.data)
     assert 'sensors' in data
     assert 'display' in data
+
+def test_history_endpoint(client):
+    rv = client.get('/api/telemetry/history?metric=voltage&resolution=10s')
+    assert rv.status_code == 200
+    data = json.loads(rv.data)
+    assert data['metric'] == 'voltage'
+    assert set(['t', 'min', 'max', 'mean']) <= set(data)
+
+def test_history_endpoint_rejects_unknown_metric(client):
+    rv = client.get('/api/telemetry/history?metric=boost')
+    assert rv.status_code == 400
+
+def test_health_endpoint(client):
+    rv = client.get('/api/health')
+    assert rv.status_code in (200, 503)
+    data = json.loads(rv.data)
+    assert data['status'] in ('ok', 'starting', 'degraded')
+    assert set(['sensors', 'ups', 'sampler']) <= set(data['components'])
+    assert data['components']['sensors']['mode'] == 'mock'
+    channels = data['components']['sensors']['channels']
+    assert channels['0']['state'] == 'ok'
+    assert data['components']['sensors']['bus_resets'] == 0
+
+def test_health_reports_closed_ups_port(client, monkeypatch):
+    import app as app_module
+    monkeypatch.setattr(app_module.ups_interface, 'mock', False)
+    monkeypatch.setattr(app_module.ups_interface, 'available', False)
+    monkeypatch.setattr(app_module.ups_interface, 'error', 'could not open port /dev/serial0')
+    monkeypatch.setitem(app_module.component_status, 'ups', {'state': 'starting'})
+    app_module.init_component('ups', lambda: None, app_module.ups_init_error)
+    data = json.loads(client.get('/api/health').data)
+    assert data['components']['ups']['state'] == 'failed'
+    assert '/dev/serial0' in data['components']['ups']['error']
+    assert data['status'] != 'ok'
+
+def test_health_reports_adc_mock_fallback(client, monkeypatch):
+    import app as app_module
+    monkeypatch.setattr(app_module, 'mock_mode', False)
+    monkeypatch.setattr(app_module.sensor_interface, 'hardware_error', 'ADC libraries not installed')
+    monkeypatch.setitem(app_module.component_status, 'sensors', {'state': 'starting'})
+    # sensor_interface is in mock mode here, as after a failed hardware init
+    app_module.init_component('sensors', lambda: None, app_module.sensors_init_error)
+    data = json.loads(client.get('/api/health').data)
+    assert data['components']['sensors']['state'] == 'failed'
+    assert data['components']['sensors']['mode'] == 'mock'
+    assert 'ADC libraries not installed' in data['components']['sensors']['error']
+    assert data['status'] != 'ok'
+
+def test_metrics_endpoint(client):
+    rv = client.get('/metrics')
+    assert rv.status_code == 200
+    assert rv.mimetype == 'text/plain'
+    text = rv.data.decode()
+    assert '# TYPE infotainment_sampler_tick_seconds histogram' in text
+    assert 'infotainment_adc_read_errors_total' in text
+
+def test_binary_telemetry_negotiation():
+    from app import socketio, publish_telemetry
+    from wire import decode_frame
+    json_client = socketio.test_client(app)
+    binary_client = socketio.test_client(app)
+    binary_client.emit('telemetry_format', {'format': 'binary', 'version': 1})
+    reply = [m for m in binary_client.get_received() if m['name'] == 'telemetry_format'][0]['args'][0]
+    assert reply['format'] == 'binary'
+    json_client.get_received()
+
+    publish_telemetry({'water_temp': 187.3})
+    binary_frames = [m['args'][0] for m in binary_client.get_received() if m['name'] == 'telemetry_binary']
+    json_frames = [m['args'][0] for m in json_client.get_received() if m['name'] == 'telemetry_update']
+    # The broadcast loop may interleave its own frames
+    assert {'water_temp': 187.3} in [decode_frame(frame) for frame in binary_frames]
+    assert {'water_temp': 187.3} in json_frames
+
+    # A relayed frame that can't be packed still reaches binary clients, as JSON
+    oversized = {'water_temp': 187.3, 'note': 'x' * 70000}
+    publish_telemetry(oversized)
+    assert oversized in [m['args'][0] for m in binary_client.get_received() if m['name'] == 'telemetry_update']
+    json_client.disconnect()
+    binary_client.disconnect()
+
+def test_replay_endpoint(client, monkeypatch, tmp_path):
+    import time
+    import app as app_module
+    from recorder import TripRecorder
+    recorder = TripRecorder(tmp_path)
+    for i in range(3):
+        recorder.record({'oil_pressure': 40.0 + i, 'water_temp': 180.0, 'voltage': 13.8}, 100.0 + i)
+    recorder.flush(wait=True)
+    monkeypatch.setattr(app_module, 'trips_dir', tmp_path)
+    monkeypatch.setattr(app_module, 'external_telemetry_until', 0.0)
+
+    assert client.get('/api/replay').get_json() == {'trips': [recorder.trip_id], 'active': None}
+    assert client.post('/api/replay', json={'speed': 0}).status_code == 400
+    assert client.post('/api/replay', json={'trip': 'trip-missing'}).status_code == 404
+    assert client.delete('/api/replay').status_code == 404
+
+    listener = app_module.socketio.test_client(app)
+    rv = client.post('/api/replay', json={'trip': recorder.trip_id, 'speed': 'max'})
+    assert rv.status_code == 200
+    deadline = time.monotonic() + 5
+    while client.get('/api/replay').get_json()['active'] is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.get('/api/replay').get_json()['active'] is None
+    frames = [m['args'][0] for m in listener.get_received() if m['name'] == 'telemetry_update']
+    # The broadcast loop may interleave its own frames before the holdoff starts
+    assert {40.0, 41.0, 42.0} <= {f.get('oil_pressure') for f in frames}
+    listener.disconnect()
+
+def test_config_endpoint_etag(client):
+    rv = client.get('/api/config')
+    etag = rv.headers['ETag']
+    assert etag
+    rv = client.get('/api/config', headers={'If-None-Match': etag})
+    assert rv.status_code == 304
+    assert rv.data == b''
+
+def test_config_reload_applies_calibration():
+    from app import socketio, config_service, apply_config, sensor_interface
+    from config_service import ConfigSnapshot
+    current = config_service.snapshot
+    config = json.loads(current.body)
+    config['sensors']['calibration']['oil_pressure']['max_value'] = 150
+    reloaded = ConfigSnapshot(config, version=current.version + 1)
+    client = socketio.test_client(app)
+    client.get_received()
+    try:
+        apply_config(current, reloaded)
+        assert sensor_interface._converters['oil_pressure'](5.0) == pytest.approx(150)
+        event = [m['args'][0] for m in client.get_received() if m['name'] == 'config_changed'][0]
+        assert event['changed'] == ['sensors.calibration.oil_pressure.max_value']
+        assert event['restart_required'] == []
+    finally:
+        apply_config(reloaded, current)
+        client.disconnect()
+    assert sensor_interface._converters['oil_pressure'](5.0) == pytest.approx(100)
+
+def test_relayed_telemetry_raises_warning_state():
+    from app import socketio, warning_engine, config_service
+    client = socketio.test_client(app)
+    initial = [m['args'][0] for m in client.get_received() if m['name'] == 'warning_state']
+    assert set(initial[0]) == {'oil_pressure', 'water_temp', 'voltage'}
+    try:
+        client.emit('telemetry_update', {'oil_pressure': 2.0, 'water_temp': 180.0, 'voltage': 13.8})
+        events = [m['args'][0] for m in client.get_received() if m['name'] == 'warning_state']
+        assert events[-1]['oil_pressure']['level'] == 'low'
+        client.emit('warning_state')
+        state = [m['args'][0] for m in client.get_received() if m['name'] == 'warning_state'][-1]
+        assert state['oil_pressure']['value'] == 2.0
+        assert state['voltage'] is None
+    finally:
+        # Clear the warning so later tests start from a quiet engine
+        warning_engine.set_thresholds({})
+        warning_engine.update({})
+        warning_engine.set_thresholds(config_service.snapshot.thresholds)
+        client.disconnect()
+
+def test_events_endpoint(client):
+    from app import event_journal
+    event_journal.record('system', action='test')
+    rv = client.get('/api/events?type=system&limit=1')
+    assert rv.status_code == 200
+    data = json.loads(rv.data)
+    assert data['events'][0]['action'] == 'test'
+    assert client.get('/api/events?limit=abc').status_code == 400
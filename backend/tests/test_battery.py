@@ -0,0 +1,95 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from battery import RunningRegression, DischargeEstimator
+
+class TestRunningRegression:
+    def test_fit_line(self):
+        regression = RunningRegression()
+        for x in range(1000, 1010):
+            regression.add(x, 2.0 * x + 1.0)
+        slope, intercept = regression.fit()
+        assert slope == pytest.approx(2.0)
+        assert intercept == pytest.approx(1.0)
+
+    def test_remove_matches_refit(self):
+        regression = RunningRegression()
+        points = [(0, 5.0), (1, 4.0), (2, 3.5), (3, 3.0), (4, 1.0)]
+        for x, y in points:
+            regression.add(x, y)
+        regression.remove(*points[0])
+        fresh = RunningRegression()
+        for x, y in points[1:]:
+            fresh.add(x, y)
+        assert regression.fit() == pytest.approx(fresh.fit())
+
+    def test_underdetermined(self):
+        regression = RunningRegression()
+        assert regression.fit() is None
+        regression.add(1.0, 1.0)
+        regression.add(1.0, 2.0)
+        assert regression.fit() is None
+
+class TestDischargeEstimator:
+    def discharge(self, estimator, seconds, voltage_rate=0.001, capacity_rate=0.1):
+        for t in range(seconds + 1):
+            estimator.add(4.0 - voltage_rate * t, 90.0 - capacity_rate * t, False, now=float(t))
+
+    def test_unknown_until_min_span(self):
+        estimator = DischargeEstimator(min_span=20)
+        self.discharge(estimator, 10)
+        assert estimator.seconds_remaining(now=10.0) is None
+
+    def test_voltage_limited_estimate(self):
+        estimator = DischargeEstimator(cutoff_voltage=3.4, cutoff_capacity=5.0)
+        self.discharge(estimator, 60)
+        # Voltage hits 3.4 at t=600, capacity hits 5 at t=850
+        assert estimator.seconds_remaining(now=60.0) == pytest.approx(540.0)
+
+    def test_capacity_limited_estimate(self):
+        estimator = DischargeEstimator(cutoff_voltage=3.4, cutoff_capacity=5.0)
+        self.discharge(estimator, 60, voltage_rate=0.0001, capacity_rate=0.5)
+        # Capacity hits 5 at t=170
+        assert estimator.seconds_remaining(now=60.0) == pytest.approx(110.0)
+
+    def test_missing_battery_voltage_uses_capacity(self):
+        estimator = DischargeEstimator(cutoff_capacity=5.0)
+        for t in range(61):
+            estimator.add(0, 90.0 - 0.5 * t, False, now=float(t))
+        assert estimator.seconds_remaining(now=60.0) == pytest.approx(110.0)
+
+    def test_window_forgets_old_slope(self):
+        estimator = DischargeEstimator(window=30, cutoff_voltage=3.4, cutoff_capacity=-1)
+        for t in range(61):
+            # Fast drop for the first 30 s, then a slow one
+            voltage = 4.0 - 0.01 * min(t, 30) - 0.001 * max(t - 30, 0)
+            estimator.add(voltage, None, False, now=float(t))
+        expected_at_60 = 4.0 - 0.3 - 0.03
+        assert estimator.seconds_remaining(now=60.0) == pytest.approx((expected_at_60 - 3.4) / 0.001)
+
+    def test_charging_resets(self):
+        estimator = DischargeEstimator()
+        self.discharge(estimator, 60)
+        estimator.add(4.1, 80.0, True, now=61.0)
+        assert estimator.seconds_remaining(now=61.0) is None
+
+    def test_flat_readings_give_no_estimate(self):
+        estimator = DischargeEstimator()
+        self.discharge(estimator, 60, voltage_rate=0.0, capacity_rate=0.0)
+        assert estimator.seconds_remaining(now=60.0) is None
+
+    def test_restored_rates_used_until_window_fills(self):
+        previous = DischargeEstimator(cutoff_voltage=3.4, cutoff_capacity=5.0)
+        self.discharge(previous, 60)
+        rates = previous.rates()
+        assert rates['voltage'] == pytest.approx(-0.001)
+
+        estimator = DischargeEstimator(cutoff_voltage=3.4, cutoff_capacity=5.0)
+        estimator.restore_rates(rates)
+        estimator.add(3.9, 80.0, False, now=0.0)
+        # (3.9 - 3.4) / 0.001
+        assert estimator.seconds_remaining(now=0.0) == pytest.approx(500.0)
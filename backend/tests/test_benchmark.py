@@ -0,0 +1,33 @@
+import json
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmark import measure, run_benchmarks, compare, main
+
+def test_measure_stats():
+    stats = measure(lambda: None, 200, warmup=10)
+    assert stats['iterations'] == 200
+    assert stats['p50_us'] <= stats['p99_us'] <= stats['max_us']
+
+def test_every_benchmark_runs():
+    report = run_benchmarks(iterations=20, fanout_iterations=5, clients=(2,))
+    assert set(report['results']) == {
+        'sensor_get_telemetry', 'sensor_pipeline_emulated', 'calibration_oil_pressure', 'calibration_water_temp',
+        'calibration_voltage', 'apply_ema', 'ups_parse', 'encode_json', 'encode_binary', 'fanout_2_clients',
+    }
+    assert report['meta']['python']
+
+def test_compare_against_baseline():
+    baseline = {'results': {'apply_ema': {'mean_us': 1.0, 'p99_us': 2.0}}}
+    current = {'results': {'apply_ema': {'mean_us': 0.5, 'p99_us': 2.0}, 'ups_parse': {'mean_us': 3.0, 'p99_us': 5.0}}}
+    lines = compare(current, baseline)
+    assert '(-50.0%)' in lines[0]
+    assert 'not in baseline' in lines[1]
+
+def test_cli_writes_json(tmp_path):
+    output = tmp_path / 'bench.json'
+    assert main(['--only', 'apply_ema', '--iterations', '10', '--output', str(output)]) == 0
+    assert set(json.loads(output.read_text())['results']) == {'apply_ema'}
@@ -0,0 +1,58 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from broadcaster import TelemetryBroadcaster, deadbands_from_config
+
+class TestTelemetryBroadcaster:
+    @pytest.fixture
+    def broadcaster(self):
+        return TelemetryBroadcaster(deadbands={'oil_pressure': 1.0, 'voltage': 0.05}, keyframe_interval=5.0)
+
+    def test_first_frame_is_full(self, broadcaster):
+        frame = broadcaster.next_frame({'oil_pressure': 40.0, 'voltage': 13.8}, now=0.0)
+        assert frame == {'oil_pressure': 40.0, 'voltage': 13.8}
+
+    def test_changes_inside_deadband_suppressed(self, broadcaster):
+        broadcaster.next_frame({'oil_pressure': 40.0, 'voltage': 13.8}, now=0.0)
+        assert broadcaster.next_frame({'oil_pressure': 40.5, 'voltage': 13.8}, now=0.1) is None
+
+    def test_only_changed_fields_sent(self, broadcaster):
+        broadcaster.next_frame({'oil_pressure': 40.0, 'voltage': 13.8}, now=0.0)
+        frame = broadcaster.next_frame({'oil_pressure': 42.0, 'voltage': 13.8}, now=0.1)
+        assert frame == {'oil_pressure': 42.0}
+
+    def test_deadband_measured_from_last_sent_value(self, broadcaster):
+        broadcaster.next_frame({'oil_pressure': 40.0}, now=0.0)
+        assert broadcaster.next_frame({'oil_pressure': 40.8}, now=0.1) is None
+        # Drift accumulates against 40.0, not against 40.8
+        assert broadcaster.next_frame({'oil_pressure': 41.5}, now=0.2) == {'oil_pressure': 41.5}
+
+    def test_ups_coalesced_and_sent_whole(self, broadcaster):
+        ups = {'available': True, 'capacity': 90.0, 'charging': True}
+        broadcaster.next_frame({'voltage': 13.8}, ups=ups, now=0.0)
+        assert broadcaster.next_frame({'voltage': 13.8}, ups=dict(ups), now=0.1) is None
+        changed = dict(ups, capacity=89.0)
+        frame = broadcaster.next_frame({'voltage': 13.8}, ups=changed, now=0.2)
+        assert frame == {'ups': changed}
+
+    def test_keyframe_resends_everything(self, broadcaster):
+        broadcaster.next_frame({'oil_pressure': 40.0, 'voltage': 13.8}, now=0.0)
+        frame = broadcaster.next_frame({'oil_pressure': 40.2, 'voltage': 13.8}, now=5.0)
+        assert frame == {'oil_pressure': 40.2, 'voltage': 13.8}
+
+    def test_full_frame_does_not_affect_deltas(self, broadcaster):
+        broadcaster.next_frame({'oil_pressure': 40.0}, now=0.0)
+        broadcaster.full_frame({'oil_pressure': 60.0})
+        assert broadcaster.next_frame({'oil_pressure': 40.0}, now=0.1) is None
+
+
+def test_deadbands_from_config():
+    sensors = {
+        'calibration': {'oil_pressure': {'type': 'linear'}, 'voltage': {'deadband': 0.2}},
+        'thresholds': {'oil_pressure': {'min': 10, 'deadband': 0.5}},
+    }
+    assert deadbands_from_config(sensors) == {'oil_pressure': 0.5, 'voltage': 0.2}
@@ -0,0 +1,78 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from calibration import Calibration, compile_calibration, compile_calibrations, LinearCalibration
+
+WATER_TEMP_SENDER = {
+    'type': 'resistance_lookup',
+    'lookup_table': [
+        {'resistance_ohms': 1400, 'temp_f': 100},
+        {'resistance_ohms': 1150, 'temp_f': 120},
+        {'resistance_ohms': 650, 'temp_f': 160},
+        {'resistance_ohms': 270, 'temp_f': 200},
+        {'resistance_ohms': 73, 'temp_f': 250},
+    ],
+    'voltage_divider': {'r_fixed': 1000},
+}
+
+def divider_voltage(resistance, r_fixed=1000, v_ref=5.0):
+    return v_ref * resistance / (resistance + r_fixed)
+
+class TestCompileCalibration:
+    def test_linear(self):
+        convert = compile_calibration('oil_pressure', {'type': 'linear', 'min_voltage': 0.5, 'max_voltage': 4.5,
+                                                       'min_value': 0, 'max_value': 100})
+        assert convert(2.5) == pytest.approx(50.0)
+        assert convert(0.5) == pytest.approx(0.0)
+
+    def test_voltage_divider(self):
+        assert compile_calibration('voltage', {'type': 'voltage_divider', 'divider_ratio': 3.0})(4.0) == 12.0
+
+    def test_unknown_type_uses_default(self):
+        assert compile_calibration('water_temp', None)(1.0) == 80.0
+
+    def test_resistance_lookup_hits_table_points(self):
+        convert = compile_calibration('water_temp', WATER_TEMP_SENDER)
+        assert convert(divider_voltage(650)) == pytest.approx(160.0)
+        assert convert(divider_voltage(270)) == pytest.approx(200.0)
+
+    def test_resistance_lookup_interpolates(self):
+        convert = compile_calibration('water_temp', WATER_TEMP_SENDER)
+        # Halfway between 650 and 270 ohms
+        assert convert(divider_voltage(460)) == pytest.approx(180.0)
+
+    def test_resistance_lookup_clamps(self):
+        convert = compile_calibration('water_temp', WATER_TEMP_SENDER)
+        assert convert(0.0) == 250.0
+        # Open circuit (sender unplugged) has no value
+        assert convert(5.0) is None
+
+    def test_steinhart_hart(self):
+        # Common 10k NTC coefficients; 10k ohms is ~25 C
+        cfg = {'type': 'steinhart_hart', 'unit': '°C',
+               'steinhart_hart': {'a': 1.009249522e-03, 'b': 2.378405444e-04, 'c': 2.019202697e-07},
+               'voltage_divider': {'r_fixed': 10000}}
+        convert = compile_calibration('water_temp', cfg)
+        assert convert(2.5) == pytest.approx(25.0, abs=0.5)
+        assert convert(5.0) is None
+
+    def test_convert_many(self):
+        convert = compile_calibration('voltage', {'type': 'voltage_divider', 'divider_ratio': 2.0})
+        assert convert.convert_many([1.0, 2.0]) == [2.0, 4.0]
+        table = compile_calibration('water_temp', WATER_TEMP_SENDER)
+        volts = [divider_voltage(r) for r in (1400, 650)]
+        assert table.convert_many(volts + [5.0]) == pytest.approx([100.0, 160.0, None])
+        assert table.convert_many(volts) == [table(v) for v in volts]
+
+    def test_base_class_is_abstract(self):
+        with pytest.raises(TypeError):
+            Calibration()
+
+    def test_invalid_config_falls_back(self):
+        compiled = compile_calibrations({'water_temp': {'type': 'resistance_lookup', 'lookup_table': []}},
+                                        ['water_temp'])
+        assert isinstance(compiled['water_temp'], LinearCalibration)
@@ -0,0 +1,151 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from channel_health import (ChannelMonitor, OK, DEGRADED, FAILED, I2C_ERROR, STUCK, OUT_OF_RANGE, OPEN_CIRCUIT,
+                            INVALID_VALUE)
+
+
+@pytest.fixture
+def clock():
+    return [0.0]
+
+
+@pytest.fixture
+def monitor(clock):
+    config = {'fail_after': 3, 'backoff_initial_s': 1.0, 'backoff_max_s': 4.0, 'window': 5,
+              'stuck_samples': 4, 'range_samples': 3, 'open_circuit_v': {'1': 0.05},
+              'bus_reset_after': 2, 'bus_reset_interval_s': 10}
+    return ChannelMonitor([0, 1], config, full_scale={0: 4.096, 1: 4.096}, clock=lambda: clock[0])
+
+
+class TestChannelMonitor:
+    def test_single_error_degrades(self, monitor):
+        monitor.error(0, OSError('Remote I/O error'))
+        assert monitor.channels[0].state == DEGRADED
+        assert monitor.usable(0) and monitor.readable(0)
+        assert monitor.value(0, 1.0)
+        # The error is still in the window
+        assert monitor.channels[0].state == DEGRADED
+        for _ in range(5):
+            monitor.value(0, 1.0 + _ / 100)
+        assert monitor.channels[0].state == OK
+
+    def test_backoff_doubles_and_caps(self, monitor, clock):
+        for _ in range(3):
+            monitor.error(0, OSError('nack'))
+        health = monitor.channels[0]
+        assert health.state == FAILED and health.fault == I2C_ERROR
+        assert not monitor.usable(0)
+        assert not monitor.readable(0) and monitor.readable(1)
+        assert not monitor.all_readable()
+        clock[0] = 1.0
+        assert monitor.readable(0)
+        monitor.error(0, OSError('nack'))
+        assert health.backoff == 2.0
+        monitor.error(0, OSError('nack'))
+        monitor.error(0, OSError('nack'))
+        assert health.backoff == 4.0
+        assert monitor.status()[0]['retry_in_s'] == 4.0
+
+    def test_good_read_clears_backoff(self, monitor, clock):
+        for _ in range(3):
+            monitor.error(0, OSError('nack'))
+        clock[0] = 5.0
+        assert monitor.value(0, 2.0)
+        assert monitor.usable(0) and monitor.all_readable()
+        assert monitor.channels[0].backoff == 0.0
+
+    def test_stuck_reading_fails_channel(self, monitor):
+        results = [monitor.value(0, 1.234) for _ in range(5)]
+        assert results == [True, True, True, True, False]
+        assert monitor.channels[0].fault == STUCK
+        assert monitor.value(0, 1.5)
+        assert monitor.channels[0].state == OK
+
+    def test_readings_at_rails_never_stuck(self, monitor):
+        assert all(monitor.value(0, 0.0) for _ in range(10))
+        assert all(monitor.value(0, 4.09) for _ in range(5))
+
+    def test_no_stuck_check_with_engine_off(self, monitor):
+        monitor.engine_running = False
+        assert all(monitor.value(0, 1.234) for _ in range(10))
+        monitor.engine_running = True
+        assert not all(monitor.value(0, 1.234) for _ in range(5))
+
+    def test_stuck_tolerance(self, clock):
+        monitor = ChannelMonitor([0], {'stuck_samples': 3, 'stuck_tolerance_v': 0.001})
+        assert all(monitor.value(0, 1.0 + i * 0.0004) for i in range(3))
+        assert not monitor.value(0, 1.0008)
+        assert monitor.channels[0].fault == STUCK
+        # Measured from the run's first reading, so a drift ends the run
+        assert monitor.value(0, 1.0012)
+
+    def test_full_scale_and_open_circuit(self, monitor):
+        for _ in range(3):
+            monitor.value(0, 4.096 + _ * 0.001)
+        assert monitor.channels[0].fault == OUT_OF_RANGE
+        for _ in range(3):
+            monitor.value(1, 0.01 * _)
+        assert monitor.channels[1].fault == OPEN_CIRCUIT
+
+    def test_high_open_circuit_limit(self, clock):
+        monitor = ChannelMonitor([0, 1], {'range_samples': 2, 'open_circuit_high_v': {'1': 3.0}},
+                                 full_scale={0: 6.144, 1: 6.144}, open_circuit_high={0: 4.95, 1: 4.95})
+        # Configured limit wins over the derived one
+        assert monitor.channels[1].open_circuit_high == 3.0
+        for voltage in (4.97, 4.98):
+            monitor.value(0, voltage)
+        assert monitor.channels[0].fault == OPEN_CIRCUIT
+        monitor.set_open_circuit_high({})
+        assert monitor.channels[0].open_circuit_high is None
+        assert monitor.channels[1].open_circuit_high == 3.0
+
+    def test_unconvertible_readings_fail_channel(self, monitor):
+        for i in range(3):
+            assert monitor.value(0, 1.0 + i / 100)
+            monitor.converted(0, False)
+        assert monitor.channels[0].state == FAILED and monitor.channels[0].fault == INVALID_VALUE
+        # Readings still flow so a good conversion can clear it
+        assert monitor.value(0, 1.5)
+        assert monitor.channels[0].fault == INVALID_VALUE
+        monitor.converted(0, True)
+        assert monitor.channels[0].state == OK
+
+    def test_patterns_ignored_without_check(self, clock):
+        monitor = ChannelMonitor([0], {'stuck_samples': 2}, check_patterns=False)
+        assert all(monitor.value(0, 0.0) for _ in range(5))
+
+    def test_patterns_on_selected_channels(self, clock):
+        monitor = ChannelMonitor([0, 1], {'stuck_samples': 2})
+        monitor.check_patterns_on([1])
+        assert all(monitor.value(0, 1.0) for _ in range(5))
+        assert not all(monitor.value(1, 1.0) for _ in range(5))
+        assert monitor.channels[1].fault == STUCK
+
+    def test_bus_reset_after_every_channel_fails(self, monitor, clock):
+        for _ in range(2):
+            monitor.error(0, OSError('nack'))
+            assert not monitor.bus_reset_due()
+            monitor.error(1, OSError('nack'))
+        assert monitor.bus_reset_due()
+        monitor.bus_reset()
+        assert monitor.all_readable() and monitor.bus_resets == 1
+        for _ in range(2):
+            monitor.error(0, OSError('nack'))
+            monitor.error(1, OSError('nack'))
+        # Rate limited
+        assert not monitor.bus_reset_due()
+        clock[0] = 10.0
+        assert monitor.bus_reset_due()
+
+    def test_version_changes_on_transitions_only(self, monitor):
+        version = monitor.version
+        monitor.value(0, 1.0)
+        assert monitor.version == version
+        monitor.error(0, OSError('nack'))
+        monitor.error(0, OSError('nack'))
+        assert monitor.version == version + 1
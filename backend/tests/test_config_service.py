@@ -0,0 +1,148 @@
+import pytest
+import sys
+import json
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config_service import (ConfigService, ConfigSnapshot, ConfigError, InotifyWatcher,
+                            validate_config, changed_keys, restart_required)
+
+REPO_CONFIG = Path(__file__).parent.parent.parent / 'config' / 'config.json'
+
+
+def minimal_config(**calibration):
+    return {
+        'sensors': {
+            'update_interval_ms': 1000,
+            'smoothing': {'alpha': 0.2},
+            'calibration': calibration or {
+                'oil_pressure': {'channel': 0, 'type': 'linear', 'min_value': 0, 'max_value': 100},
+            },
+            'thresholds': {'oil_pressure': {'min': 10, 'max': 90, 'deadband': 0.5}},
+        },
+        'backend': {'host': '0.0.0.0', 'port': 5001},
+    }
+
+
+def write(path, config):
+    path.write_text(json.dumps(config))
+
+
+class TestValidation:
+    def test_repo_config_is_valid(self):
+        assert validate_config(json.loads(REPO_CONFIG.read_text())) == []
+
+    def test_reports_each_problem(self):
+        config = minimal_config()
+        config['sensors']['smoothing']['alpha'] = 1.5
+        config['sensors']['thresholds']['oil_pressure']['min'] = 95
+        del config['backend']['port']
+        errors = validate_config(config)
+        assert 'sensors.smoothing.alpha must be a number in (0, 1]' in errors
+        assert 'sensors.thresholds.oil_pressure.min must be below max' in errors
+        assert 'backend.port is required' in errors
+
+    def test_calibrations_must_compile(self):
+        config = minimal_config(water_temp={'channel': 1, 'type': 'linear', 'min_voltage': 2, 'max_voltage': 2})
+        assert validate_config(config) == ['sensors.calibration.water_temp: min_voltage and max_voltage must differ']
+        config = minimal_config(voltage={'channel': 7, 'type': 'voltage_divider'})
+        assert validate_config(config) == ['sensors.calibration.voltage.channel must be an ADS1115 channel (0-3)']
+
+
+class TestSnapshot:
+    def test_derived_structures(self):
+        snapshot = ConfigSnapshot(minimal_config())
+        assert snapshot.calibrations['oil_pressure'](2.5) == pytest.approx(50.0)
+        assert snapshot.thresholds['oil_pressure'] == (10, 90, 0.5)
+        assert snapshot.deadbands['oil_pressure'] == 0.5
+        assert json.loads(snapshot.body) == minimal_config()
+        assert snapshot.etag == ConfigSnapshot(minimal_config()).etag
+
+    def test_immutable(self):
+        snapshot = ConfigSnapshot(minimal_config())
+        with pytest.raises(AttributeError):
+            snapshot.version = 2
+        with pytest.raises(TypeError):
+            snapshot.config['sensors']['smoothing']['alpha'] = 0.5
+        assert snapshot.config['sensors']['smoothing']['alpha'] == 0.2
+
+    def test_changed_keys_and_restart(self):
+        old = minimal_config()
+        new = minimal_config()
+        new['sensors']['calibration']['oil_pressure']['max_value'] = 150
+        new['sensors']['calibration']['oil_pressure']['channel'] = 3
+        new['backend']['port'] = 5002
+        changes = changed_keys(ConfigSnapshot(old).config, new)
+        assert changes == ['backend.port', 'sensors.calibration.oil_pressure.channel',
+                           'sensors.calibration.oil_pressure.max_value']
+        assert restart_required(changes) == ['backend.port', 'sensors.calibration.oil_pressure.channel']
+
+
+class TestConfigService:
+    @pytest.fixture
+    def path(self, tmp_path):
+        path = tmp_path / 'config.json'
+        write(path, minimal_config())
+        return path
+
+    def test_invalid_file_at_startup_raises(self, tmp_path):
+        path = tmp_path / 'config.json'
+        path.write_text('{"sensors": ')
+        with pytest.raises(ConfigError):
+            ConfigService(path)
+
+    def test_reload_swaps_snapshot_and_notifies(self, path):
+        service = ConfigService(path)
+        first = service.snapshot
+        seen = []
+        service.add_listener(lambda old, new: seen.append((old, new)))
+        config = minimal_config()
+        config['sensors']['smoothing']['alpha'] = 0.5
+        write(path, config)
+
+        new = service.reload()
+        assert service.snapshot is new
+        assert new.version == 2
+        assert new.etag != first.etag
+        assert seen == [(first, new)]
+        assert first.config['sensors']['smoothing']['alpha'] == 0.2
+
+    def test_unchanged_file_is_not_reloaded(self, path):
+        service = ConfigService(path)
+        path.touch()
+        assert service.reload() is None
+        assert service.snapshot.version == 1
+
+    def test_invalid_reload_keeps_running_snapshot(self, path):
+        service = ConfigService(path)
+        config = minimal_config()
+        config['sensors']['update_interval_ms'] = 0
+        write(path, config)
+        assert service.reload() is None
+        assert service.snapshot.version == 1
+        assert service.last_error['errors'] == ['sensors.update_interval_ms must be a positive integer']
+
+        write(path, minimal_config(voltage={'channel': 2, 'type': 'voltage_divider'}))
+        assert service.reload().version == 2
+        assert service.last_error is None
+
+    @pytest.mark.skipif(InotifyWatcher.open(REPO_CONFIG) is None, reason="inotify unavailable")
+    def test_watch_reloads_on_rename(self, path):
+        service = ConfigService(path, debounce=0.01, poll_interval=0.05)
+        reloaded = threading.Event()
+        service.add_listener(lambda old, new: reloaded.set())
+        threading.Thread(target=service.watch, daemon=True).start()
+        time.sleep(0.1)
+
+        # Save the way editors do: write a temporary file, then rename it over
+        config = minimal_config()
+        config['sensors']['thresholds']['oil_pressure']['max'] = 80
+        tmp = path.with_suffix('.tmp')
+        write(tmp, config)
+        tmp.replace(path)
+        assert reloaded.wait(2.0)
+        assert service.snapshot.thresholds['oil_pressure'] == (10, 80, 0.5)
@@ -0,0 +1,110 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from filters import RingBuffer, MedianFilter, Decimator, KalmanFilter, FilterPipeline, build_pipeline
+from sensors import SensorInterface
+
+class TestRingBuffer:
+    def test_push_and_evict(self):
+        ring = RingBuffer(3)
+        assert ring.push(1.0) is None
+        ring.push(2.0)
+        ring.push(3.0)
+        assert ring.push(4.0) == 1.0
+        assert ring.values() == [2.0, 3.0, 4.0]
+        assert len(ring) == 3
+
+class TestMedianFilter:
+    def test_rejects_single_spike(self):
+        median = MedianFilter(3)
+        outputs = [median.process(v) for v in [10.0, 10.0, 90.0, 10.0, 10.0]]
+        assert 90.0 not in outputs
+        assert outputs[-1] == 10.0
+
+    def test_window_slides(self):
+        median = MedianFilter(3)
+        for v in [1.0, 2.0, 3.0, 10.0, 11.0]:
+            result = median.process(v)
+        assert result == 10.0
+
+class TestDecimator:
+    def test_emits_block_average(self):
+        decimator = Decimator(3)
+        assert decimator.process(1.0) is None
+        assert decimator.process(2.0) is None
+        assert decimator.process(6.0) == 3.0
+        assert decimator.process(1.0) is None
+
+class TestKalmanFilter:
+    def test_first_measurement_taken_as_is(self):
+        assert KalmanFilter().update(5.0) == 5.0
+
+    def test_converges_towards_measurement(self):
+        kalman = KalmanFilter(process_noise=0.01, measurement_noise=1.0)
+        kalman.update(0.0)
+        values = [kalman.update(10.0) for _ in range(50)]
+        assert 0.0 < values[0] < 10.0
+        assert values[-1] == pytest.approx(10.0, abs=0.5)
+
+    def test_ignores_non_finite_measurement(self):
+        kalman = KalmanFilter()
+        assert kalman.update(float('nan')) is None
+        kalman.update(4.0)
+        assert kalman.update(float('nan')) == 4.0
+        assert kalman.update(4.0) == 4.0
+
+class TestPipeline:
+    def test_none_short_circuits(self):
+        pipeline = FilterPipeline([Decimator(2), MedianFilter(3)])
+        assert pipeline.process(1.0) is None
+        assert pipeline.process(3.0) == 2.0
+
+    def test_build_pipeline_defaults_to_passthrough(self):
+        pipeline = build_pipeline({})
+        assert pipeline.stages == ()
+        assert pipeline.process(4.2) == 4.2
+
+    def test_build_pipeline_from_config(self):
+        pipeline = build_pipeline({'median_window': 5, 'decimation': 4})
+        assert [type(stage) for stage in pipeline.stages] == [MedianFilter, Decimator]
+
+class TestSensorPipeline:
+    def test_decimation_skips_polls(self):
+        sensors = SensorInterface(mock=True, smoothing={'decimation': 3})
+        results = [sensors.poll() for _ in range(6)]
+        assert [r is not None for r in results] == [False, False, True, False, False, True]
+
+    def test_get_telemetry_always_returns_reading(self):
+        sensors = SensorInterface(mock=True, smoothing={'decimation': 3})
+        assert 'voltage' in sensors.get_telemetry()
+        assert 'voltage' in sensors.get_telemetry()
+
+    def test_oversample_reads_adc_n_times(self):
+        sensors = SensorInterface(mock=True, smoothing={'oversample': 4})
+        calls = []
+        sensors.adc.read_all = lambda: calls.append(1) or {0: 1.0, 1: 1.0, 2: 1.0}
+        sensors.poll()
+        assert len(calls) == 4
+
+    def test_oversampled_reads_converted_as_batch(self):
+        config = {'water_temp': {'type': 'resistance_lookup', 'voltage_divider': {'r_fixed': 1000},
+                                 'lookup_table': [{'resistance_ohms': 1400, 'temp_f': 100},
+                                                  {'resistance_ohms': 650, 'temp_f': 160}]}}
+        sensors = SensorInterface(mock=True, alpha=1.0, config=config, smoothing={'oversample': 2})
+        # 1400 then 650 ohms against 1k to 5 V
+        volts = iter([5 * 1400 / 2400, 5 * 650 / 1650])
+        sensors.adc.read_all = lambda: {0: 1.0, 1: next(volts), 2: 4.0}
+        telemetry = sensors.poll()
+        # The mean of the converted reads, not the conversion of the mean voltage
+        assert telemetry['water_temp'] == 130.0
+        assert telemetry['oil_pressure'] == 20.0 and telemetry['voltage'] == 12.0
+
+    def test_kalman_stage(self):
+        sensors = SensorInterface(mock=True, smoothing={'stage': 'kalman'})
+        sensors.poll()
+        assert sensors._kalman['voltage'].estimate is not None
+        assert sensors._ema_values['voltage'] is None
@@ -0,0 +1,85 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from history import TelemetryHistory
+
+class FakeClock:
+    """Monotonic and wall clocks that advance together until the wall clock is stepped."""
+    def __init__(self):
+        self.now = 0.0
+        self.step = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now + self.step
+
+class ClockedHistory(TelemetryHistory):
+    """Moves the fake clocks to each sample's timestamp before recording it."""
+    def __init__(self, metrics, retention):
+        self.fake_clock = FakeClock()
+        super().__init__(metrics, retention, clock=self.fake_clock.monotonic, wall_clock=self.fake_clock.time)
+
+    def add(self, snapshot, timestamp):
+        self.fake_clock.now = timestamp - self.fake_clock.step
+        super().add(snapshot, timestamp)
+
+class TestTelemetryHistory:
+    @pytest.fixture
+    def history(self):
+        return ClockedHistory(['oil_pressure', 'voltage'], retention={'1s': 5, '10s': 5, '1m': 5})
+
+    def test_open_bucket_is_returned(self, history):
+        history.add({'oil_pressure': 40.0, 'voltage': 13.8}, 100.2)
+        result = history.query('oil_pressure')
+        assert result['t'] == [100.0]
+        assert result['mean'] == [40.0]
+
+    def test_rollup_min_max_mean(self, history):
+        for i, value in enumerate([10.0, 20.0, 30.0]):
+            history.add({'oil_pressure': value}, 100 + i)
+        history.add({'oil_pressure': 0.0}, 110)
+        result = history.query('oil_pressure', resolution='10s')
+        assert result['t'] == [100.0, 110.0]
+        assert result['min'][0] == 10.0
+        assert result['max'][0] == 30.0
+        assert result['mean'][0] == 20.0
+
+    def test_memory_is_bounded(self, history):
+        for t in range(100):
+            history.add({'oil_pressure': float(t)}, float(t))
+        result = history.query('oil_pressure')
+        # 5 closed buckets plus the open one
+        assert result['t'] == [94.0, 95.0, 96.0, 97.0, 98.0, 99.0]
+
+    def test_since_limits_window(self, history):
+        for t in range(5):
+            history.add({'oil_pressure': float(t)}, float(t))
+        assert history.query('oil_pressure', since=2.5)['t'] == [2.0, 3.0, 4.0]
+
+    def test_missing_metric_values_are_none(self, history):
+        history.add({'oil_pressure': 1.0}, 0.0)
+        history.add({'oil_pressure': 1.0}, 1.0)
+        assert history.query('voltage')['mean'] == [None]
+
+    def test_unknown_metric_or_resolution(self, history):
+        with pytest.raises(ValueError):
+            history.query('boost')
+        with pytest.raises(ValueError):
+            history.query('voltage', resolution='5s')
+
+    def test_wall_clock_step_keeps_order(self, history):
+        for t in range(3):
+            history.add({'oil_pressure': float(t)}, float(100 + t))
+        # NTP steps the wall clock back an hour; buckets stay in order and shift with it
+        history.fake_clock.step = -3600.0
+        history.add({'oil_pressure': 3.0}, 103.0 - 3600.0)
+        result = history.query('oil_pressure')
+        assert result['t'] == [t - 3600.0 for t in (100.0, 101.0, 102.0, 103.0)]
+        assert result['mean'] == [0.0, 1.0, 2.0, 3.0]
+        assert history.query('oil_pressure', since=101.5 - 3600.0)['t'] == [101.0 - 3600.0, 102.0 - 3600.0, 103.0 - 3600.0]
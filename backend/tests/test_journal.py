@@ -0,0 +1,124 @@
+import pytest
+import sys
+import os
+import json
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from journal import EventJournal, THRESHOLD, POWER
+from warning_engine import WarningEngine
+
+
+@pytest.fixture
+def clock():
+    return [1000.0]
+
+
+@pytest.fixture
+def journal(tmp_path, clock):
+    return EventJournal(tmp_path / 'events.jsonl', capacity=100, flush_interval=300, clock=lambda: clock[0])
+
+
+@pytest.fixture
+def engine(journal):
+    engine = WarningEngine({'oil_pressure': (10, 90, 0.5)}, min_duration=2.0)
+    engine.add_listener(journal.warning_changes)
+    return engine
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestEventJournal:
+    def test_records_excursion_with_peak_and_duration(self, journal, engine):
+        engine.update({'oil_pressure': 8.0}, now=100.0)
+        open_event = journal.query()['events'][0]
+        assert open_event['type'] == THRESHOLD
+        assert open_event['end'] is None
+
+        engine.update({'oil_pressure': 4.5}, now=101.0)
+        engine.update({'oil_pressure': 30.0}, now=104.0)
+        event = journal.query()['events'][0]
+        assert event == {'id': 1, 'type': THRESHOLD, 'metric': 'oil_pressure', 'level': 'low',
+                         'start': 100.0, 'end': 104.0, 'duration_s': 4.0, 'value': 8.0, 'peak': 4.5}
+
+    def test_paging_and_filters(self, journal):
+        for i in range(5):
+            journal.record(POWER, state=f'state{i}')
+        journal.record('system', action='reboot')
+
+        page = journal.query(limit=2, kind=POWER)
+        assert [e['state'] for e in page['events']] == ['state4', 'state3']
+        page = journal.query(limit=2, kind=POWER, before=page['next'])
+        assert [e['state'] for e in page['events']] == ['state2', 'state1']
+        page = journal.query(limit=2, kind=POWER, before=page['next'])
+        assert [e['state'] for e in page['events']] == ['state0']
+        assert page['next'] is None
+        with pytest.raises(ValueError):
+            journal.query(limit=0)
+
+    def test_flush_is_rate_limited_and_batched(self, journal, engine):
+        journal.record(POWER, state='on_battery')
+        assert journal.flush() == 1
+        engine.update({'oil_pressure': 95.0}, now=200.0)
+        # Within flush_interval: nothing written until forced
+        assert journal.flush() == 0
+        assert journal.flush(force=True) == 1
+        engine.update({'oil_pressure': 50.0}, now=210.0)
+        assert journal.flush(force=True) == 1
+        lines = read_lines(journal.path)
+        assert [line['id'] for line in lines] == [1, 2, 2]
+        assert lines[-1]['end'] == 210.0
+
+    def test_load_restores_latest_copies(self, journal, engine):
+        engine.update({'oil_pressure': 5.0}, now=300.0)
+        journal.flush(force=True)
+        engine.update({'oil_pressure': 50.0}, now=305.0)
+        journal.record(POWER, state='online')
+        journal.flush(force=True)
+        # Power cut mid-write leaves a partial line
+        with open(journal.path, 'a') as f:
+            f.write('{"id": 9, "ty')
+
+        restored = EventJournal(journal.path, capacity=100)
+        assert restored.load() == 2
+        events = restored.query()['events']
+        assert [e['id'] for e in events] == [2, 1]
+        assert events[1]['duration_s'] == 5.0
+        assert restored.record(POWER, state='on_battery')['id'] == 3
+
+    def test_load_closes_interrupted_excursion(self, journal, engine):
+        engine.update({'oil_pressure': 5.0}, now=300.0)
+        journal.flush(force=True)
+        # The backend stopped before the excursion cleared; last flush at 340
+        os.utime(journal.path, (340.0, 340.0))
+
+        restored = EventJournal(journal.path, capacity=100)
+        assert restored.load() == 1
+        event = restored.query()['events'][0]
+        assert event['end'] == 340.0 and event['duration_s'] == 40.0
+        assert event['interrupted']
+        # Written back closed, so the next load agrees
+        assert restored.flush(force=True) == 1
+        assert read_lines(journal.path)[-1] == event
+
+    def test_rotates_large_file(self, tmp_path):
+        journal = EventJournal(tmp_path / 'events.jsonl', max_file_bytes=200)
+        for i in range(3):
+            journal.record(POWER, state='on_battery', note='x' * 60)
+            journal.flush(force=True)
+        assert (tmp_path / 'events.1.jsonl').exists()
+        # One previous file is kept: the oldest event went with the second rotation
+        restored = EventJournal(tmp_path / 'events.jsonl')
+        assert restored.load() == 2
+        assert [e['id'] for e in restored.query()['events']] == [3, 2]
+
+    def test_pending_is_bounded(self, tmp_path):
+        journal = EventJournal(tmp_path / 'events.jsonl', max_pending=3)
+        for i in range(5):
+            journal.record(POWER, state='grace')
+        assert journal.dropped == 2
+        assert journal.flush() == 3
@@ -0,0 +1,53 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from metrics import MetricsRegistry
+
+class TestMetrics:
+    @pytest.fixture
+    def registry(self):
+        return MetricsRegistry(namespace='test')
+
+    def test_counter(self, registry):
+        counter = registry.counter('errors_total', 'Errors')
+        counter.inc()
+        counter.inc(2)
+        assert counter.value == 3
+        assert registry.counter('errors_total', 'Errors') is counter
+        assert 'test_errors_total 3' in registry.render()
+
+    def test_histogram_buckets(self, registry):
+        histogram = registry.histogram('read_seconds', 'Reads', buckets=(0.001, 0.01, 0.1))
+        for value in (0.0005, 0.001, 0.005, 0.05, 2.0):
+            histogram.observe(value)
+        text = registry.render()
+        assert '# TYPE test_read_seconds histogram' in text
+        # Buckets are cumulative and a value on a bound counts as <= that bound
+        assert 'test_read_seconds_bucket{le="0.001"} 2' in text
+        assert 'test_read_seconds_bucket{le="0.01"} 3' in text
+        assert 'test_read_seconds_bucket{le="0.1"} 4' in text
+        assert 'test_read_seconds_bucket{le="+Inf"} 5' in text
+        assert 'test_read_seconds_count 5' in text
+        assert 'test_read_seconds_sum 2.0565' in text
+
+    def test_quantile(self, registry):
+        histogram = registry.histogram('tick_seconds', 'Ticks', buckets=(0.001, 0.01, 0.1))
+        assert histogram.quantile(0.99) is None
+        for _ in range(98):
+            histogram.observe(0.0005)
+        histogram.observe(0.05)
+        histogram.observe(0.05)
+        assert histogram.quantile(0.5) == 0.001
+        assert histogram.quantile(0.99) == 0.1
+
+    def test_gauge(self, registry):
+        registry.gauge('age_seconds', 'Age', lambda: 1.5)
+        registry.gauge('unknown', 'Not yet known', lambda: None)
+        text = registry.render()
+        assert 'test_age_seconds 1.5' in text
+        assert '# TYPE test_unknown gauge' in text
+        assert '\ntest_unknown ' not in text
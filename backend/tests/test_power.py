@@ -0,0 +1,110 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from power import PowerStateMachine, ONLINE, ON_BATTERY, GRACE, SHUTDOWN
+
+class TestPowerStateMachine:
+    @pytest.fixture
+    def machine(self):
+        machine = PowerStateMachine(loss_voltage=4.0, restore_voltage=4.5, debounce=0.3,
+                                    confirm=2.0, grace_period=10.0, clock=lambda: 0.0)
+        machine.transitions = []
+        machine.add_listener(lambda previous, state, info: machine.transitions.append((previous, state)))
+        return machine
+
+    def test_single_low_reading_does_not_trip(self, machine):
+        machine.update(0.0, now=0.0)
+        machine.tick(now=5.0)
+        machine.update(5.1, now=5.1)
+        assert machine.state == ONLINE
+        assert machine.transitions == []
+
+    def test_debounced_loss(self, machine):
+        machine.update(0.0, now=0.0)
+        machine.update(0.0, now=0.3)
+        assert machine.state == ON_BATTERY
+        assert machine.transitions == [(ONLINE, ON_BATTERY)]
+
+    def test_grace_then_shutdown(self, machine):
+        machine.update(0.0, now=0.0)
+        machine.update(0.0, now=0.3)
+        machine.tick(now=2.5)
+        assert machine.state == GRACE
+        assert machine.seconds_remaining(now=7.5) == pytest.approx(5.0)
+        machine.tick(now=12.5)
+        assert machine.state == SHUTDOWN
+        machine.update(5.1, now=13.0)
+        machine.update(5.1, now=14.0)
+        assert machine.state == SHUTDOWN
+
+    def test_glitch_does_not_cancel_grace(self, machine):
+        machine.update(0.0, now=0.0)
+        machine.update(0.0, now=0.3)
+        machine.tick(now=2.5)
+        machine.update(5.1, now=3.0)
+        machine.update(0.0, now=3.1)
+        assert machine.state == GRACE
+
+    def test_debounced_restore(self, machine):
+        machine.update(0.0, now=0.0)
+        machine.update(0.0, now=0.3)
+        machine.update(5.1, now=1.0)
+        machine.update(5.1, now=1.3)
+        assert machine.state == ONLINE
+        assert machine.transitions[-1] == (ON_BATTERY, ONLINE)
+
+    def test_hysteresis_band_does_not_restore(self, machine):
+        machine.update(0.0, now=0.0)
+        machine.update(0.0, now=0.3)
+        machine.update(4.2, now=1.0)
+        machine.update(4.2, now=2.0)
+        assert machine.state != ONLINE
+
+    def test_reset(self, machine):
+        machine.update(0.0, now=0.0)
+        machine.update(0.0, now=0.3)
+        machine.reset(now=1.0)
+        assert machine.state == ONLINE
+
+class TestRuntimeEstimate:
+    @pytest.fixture
+    def machine(self):
+        return PowerStateMachine(loss_voltage=4.0, restore_voltage=4.5, debounce=0.3, confirm=2.0,
+                                 grace_period=60.0, min_grace_period=15.0, max_grace_period=900.0,
+                                 clock=lambda: 0.0)
+
+    def enter_grace(self, machine):
+        machine.update(0.0, now=0.0)
+        machine.update(0.0, now=0.5)
+        machine.tick(now=2.5)
+        assert machine.state == GRACE
+
+    def test_estimate_extends_deadline(self, machine):
+        self.enter_grace(machine)
+        machine.set_runtime_estimate(300.0, now=12.5)
+        assert machine.seconds_remaining(now=12.5) == pytest.approx(300.0)
+        machine.tick(now=100.0)
+        assert machine.state == GRACE
+
+    def test_estimate_shortens_to_minimum(self, machine):
+        self.enter_grace(machine)
+        machine.set_runtime_estimate(0.0, now=2.5)
+        machine.tick(now=10.0)
+        assert machine.state == GRACE
+        machine.tick(now=17.5)
+        assert machine.state == SHUTDOWN
+
+    def test_estimate_capped_at_maximum(self, machine):
+        self.enter_grace(machine)
+        machine.set_runtime_estimate(10000.0, now=2.5)
+        assert machine.seconds_remaining(now=2.5) == pytest.approx(900.0)
+
+    def test_no_estimate_restores_default(self, machine):
+        machine.set_runtime_estimate(300.0)
+        machine.set_runtime_estimate(None)
+        self.enter_grace(machine)
+        assert machine.seconds_remaining(now=2.5) == pytest.approx(60.0)
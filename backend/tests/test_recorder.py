@@ -0,0 +1,70 @@
+import math
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from recorder import TripRecorder, SegmentReader, list_trips, iter_samples
+
+UPS = {'available': True, 'voltage': 4.1, 'capacity': 90.0, 'input_voltage': 5.1, 'charging': True}
+
+class TestTripRecorder:
+    @pytest.fixture
+    def recorder(self, tmp_path):
+        return TripRecorder(tmp_path, flush_interval=3600)
+
+    def test_nothing_written_until_flush(self, recorder, tmp_path):
+        recorder.record({'oil_pressure': 40.0}, 1000.0, UPS)
+        assert recorder.buffered_rows == 1
+        assert list(tmp_path.iterdir()) == []
+
+    def test_flush_writes_one_chunk(self, recorder, tmp_path):
+        for i in range(100):
+            recorder.record({'oil_pressure': 40.0 + i, 'water_temp': 190.0, 'voltage': 13.8}, 1000.0 + i, UPS)
+        assert recorder.flush(wait=True, timeout=5)
+        assert recorder.buffered_rows == 0
+        assert recorder.chunks_written == 1
+
+        segments = list_trips(tmp_path)[recorder.trip_id]
+        with SegmentReader(segments[0]) as reader:
+            chunks = list(reader.chunks())
+        assert len(chunks) == 1
+        assert chunks[0]['timestamp'][99] == 1099.0
+        assert chunks[0]['oil_pressure'][5] == 45.0
+        assert chunks[0]['ups_capacity'][0] == 90.0
+
+    def test_missing_values_recorded_as_nan(self, recorder, tmp_path):
+        recorder.record({'oil_pressure': 40.0}, 1000.0)
+        recorder.flush(wait=True, timeout=5)
+        segment = list_trips(tmp_path)[recorder.trip_id][0]
+        with SegmentReader(segment) as reader:
+            chunk = next(reader.chunks())
+        assert math.isnan(chunk['ups_voltage'][0])
+        sample = next(iter_samples([segment]))
+        assert 'ups_voltage' not in sample
+        assert sample['oil_pressure'] == 40.0
+
+    def test_segments_roll_over(self, tmp_path):
+        recorder = TripRecorder(tmp_path, flush_interval=3600, max_segment_bytes=1)
+        for batch in range(3):
+            recorder.record({'oil_pressure': float(batch)}, float(batch))
+            recorder.flush(wait=True, timeout=5)
+        segments = list_trips(tmp_path)[recorder.trip_id]
+        assert len(segments) == 3
+        assert [s['timestamp'] for s in iter_samples(segments)] == [0.0, 1.0, 2.0]
+
+    def test_flush_interval_triggers_write(self, tmp_path):
+        recorder = TripRecorder(tmp_path, flush_interval=0)
+        recorder.record({'voltage': 13.8}, 1.0)
+        recorder.flush(wait=True, timeout=5)
+        assert recorder.chunks_written == 1
+
+    def test_truncated_chunk_is_ignored(self, recorder, tmp_path):
+        recorder.record({'voltage': 13.8}, 1.0)
+        recorder.flush(wait=True, timeout=5)
+        segment = list_trips(tmp_path)[recorder.trip_id][0]
+        with open(segment, 'ab') as f:
+            f.write(b'MTRP\x01garbage')
+        assert len(list(iter_samples([segment]))) == 1
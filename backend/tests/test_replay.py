@@ -0,0 +1,69 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from replay import TripReplayer, sample_to_frame, parse_speed
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+SAMPLES = [
+    {'timestamp': 100.0, 'oil_pressure': 40.04},
+    {'timestamp': 101.0, 'oil_pressure': 41.0},
+    {'timestamp': 103.0, 'oil_pressure': 42.0},
+]
+
+class TestTripReplayer:
+    def test_sample_to_frame(self):
+        frame = sample_to_frame({'timestamp': 1.0, 'voltage': 13.84, 'ups_capacity': 90.0, 'ups_charging': 1.0})
+        assert frame == {'voltage': 13.8, 'ups': {'capacity': 90.0, 'charging': True, 'available': True}}
+
+    def test_real_time_pacing(self):
+        clock = FakeClock()
+        frames = []
+        TripReplayer(SAMPLES, frames.append, speed=1.0, clock=clock.clock, sleep=clock.sleep).run()
+        assert clock.sleeps == [1.0, 2.0]
+        assert [f['oil_pressure'] for f in frames] == [40.0, 41.0, 42.0]
+
+    def test_speed_multiplier(self):
+        clock = FakeClock()
+        TripReplayer(SAMPLES, lambda f: None, speed=2.0, clock=clock.clock, sleep=clock.sleep).run()
+        assert clock.sleeps == [0.5, 1.0]
+
+    def test_max_speed_never_sleeps(self):
+        clock = FakeClock()
+        replayer = TripReplayer(SAMPLES, lambda f: None, speed=None, clock=clock.clock, sleep=clock.sleep)
+        assert replayer.run() == 3
+        assert clock.sleeps == []
+
+    def test_late_frames_counted(self):
+        clock = FakeClock()
+
+        def slow_emit(frame):
+            clock.now += 1.5
+
+        replayer = TripReplayer(SAMPLES, slow_emit, speed=1.0, clock=clock.clock, sleep=clock.sleep)
+        replayer.run()
+        assert replayer.late_frames == 1
+        assert replayer.max_lateness == pytest.approx(0.5)
+
+    def test_speed_must_be_positive(self):
+        assert parse_speed('max') is None
+        assert parse_speed('2.5') == 2.5
+        for speed in ('0', '-1', 'nan'):
+            with pytest.raises(ValueError):
+                parse_speed(speed)
+        with pytest.raises(ValueError):
+            TripReplayer(SAMPLES, lambda f: None, speed=0)
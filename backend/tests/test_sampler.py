@@ -0,0 +1,55 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sensors import SensorInterface
+from sampler import SensorSampler
+
+class TestSensorSampler:
+    @pytest.fixture
+    def sampler(self):
+        sensors = SensorInterface(mock=True, alpha=0.5, ema_period=0.1)
+        sampler = SensorSampler(sensors, interval_ms=10)
+        yield sampler
+        sampler.stop(timeout=1)
+
+    def test_latest_empty_before_first_sample(self, sampler):
+        assert sampler.latest() == {}
+        assert sampler.last_update is None
+
+    def test_sample_once_publishes_snapshot(self, sampler):
+        snapshot = sampler.sample_once()
+        assert sampler.latest() is snapshot
+        assert 'oil_pressure' in snapshot
+        assert sampler.last_update is not None
+
+    def test_snapshot_is_replaced_not_mutated(self, sampler):
+        first = sampler.sample_once()
+        first_copy = dict(first)
+        second = sampler.sample_once()
+        assert second is not first
+        assert first == first_copy
+
+    def test_listeners_called(self, sampler):
+        received = []
+        sampler.add_listener(lambda snapshot, ts: received.append((snapshot, ts)))
+        snapshot = sampler.sample_once()
+        assert received[0][0] is snapshot
+
+    def test_listener_errors_are_isolated(self, sampler):
+        def broken(snapshot, ts):
+            raise RuntimeError("boom")
+        sampler.add_listener(broken)
+        assert sampler.sample_once()
+
+    def test_background_thread_samples(self, sampler):
+        sampler.start()
+        deadline = time.time() + 2
+        while not sampler.latest() and time.time() < deadline:
+            time.sleep(0.01)
+        assert 'voltage' in sampler.latest()
+
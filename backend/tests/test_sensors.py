@@ -1,12 +1,14 @@
+import json
 import pytest
 import sys
 import os
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 # Add backend to path so we can import sensors
 sys.path.append(str(Path(__file__).parent.parent))
 
-from sensors import SensorInterface
+from sensors import SensorInterface, ADS1115Driver
 
 class TestSensorInterface:
     @pytest.fixture
@@ -52,9 +54,271 @@ class TestSensorInterface:
         val3 = sensor_interface._apply_ema('test_metric', 20.0)
         assert val3 == 17.5
 
+    def test_ema_uses_elapsed_time(self):
+        sensors = SensorInterface(mock=True, alpha=0.5, ema_period=1.0)
+        sensors._apply_ema('test_metric', 0.0)
+        # Two nominal periods elapsed: same as two alpha=0.5 steps towards 100
+        value = sensors._apply_ema('test_metric', 100.0, dt=2.0)
+        assert value == pytest.approx(75.0)
+
+    def test_warm_seed_within_tolerance(self, sensor_interface):
+        previous = SensorInterface(mock=True, alpha=0.5)
+        previous._apply_ema('water_temp', 180.0)
+        sensor_interface.restore_filter_state(previous.filter_state(), tolerance={'water_temp': 10})
+        # Seeded EMA: 0.5 * 184 + 0.5 * 180
+        assert sensor_interface._smooth('water_temp', 184.0, None) == 182.0
+
+    def test_warm_seed_rejected_when_far_off(self, sensor_interface):
+        previous = SensorInterface(mock=True, alpha=0.5)
+        previous._apply_ema('water_temp', 180.0)
+        sensor_interface.restore_filter_state(previous.filter_state(), tolerance={'water_temp': 10})
+        # Engine cooled down since the state was saved: start from the live reading
+        assert sensor_interface._smooth('water_temp', 70.0, None) == 70.0
+
     def test_get_telemetry_structure(self, sensor_interface):
         telemetry = sensor_interface.get_telemetry()
         assert 'oil_pressure' in telemetry
         assert 'water_temp' in telemetry
         assert 'voltage' in telemetry
         assert isinstance(telemetry['oil_pressure'], (int, float))
+
+
+class FakeADS1115:
+    def __init__(self, i2c, gain=1, data_rate=None, address=0x48):
+        self.gain = gain
+        self.data_rate = data_rate
+        self.address = address
+        self.mode = None
+
+
+class FakeAnalogIn:
+    created = 0
+
+    def __init__(self, ads, pin):
+        FakeAnalogIn.created += 1
+        self.ads = ads
+        self.pin = pin
+
+    @property
+    def voltage(self):
+        return self.pin + self.ads.gain / 10.0
+
+
+@pytest.fixture
+def fake_adafruit():
+    """Install stand-ins for the Blinka/ADS1x15 modules."""
+    ads1115 = MagicMock(ADS1115=FakeADS1115)
+    ads1x15 = MagicMock()
+    ads1x15.Mode.CONTINUOUS = 'continuous'
+    ads1x15.Mode.SINGLE = 'single'
+    analog_in = MagicMock(AnalogIn=FakeAnalogIn)
+    package = MagicMock(ads1115=ads1115, ads1x15=ads1x15, analog_in=analog_in)
+    modules = {
+        'board': MagicMock(),
+        'busio': MagicMock(),
+        'adafruit_ads1x15': package,
+        'adafruit_ads1x15.ads1115': ads1115,
+        'adafruit_ads1x15.ads1x15': ads1x15,
+        'adafruit_ads1x15.analog_in': analog_in,
+    }
+    FakeAnalogIn.created = 0
+    with patch.dict(sys.modules, modules):
+        yield
+
+
+class TestADS1115Driver:
+    def test_channel_objects_built_once(self, fake_adafruit):
+        driver = ADS1115Driver([0, 1, 2])
+        driver.read_all()
+        driver.read_all()
+        assert FakeAnalogIn.created == 3
+
+    def test_read_all_returns_every_channel(self, fake_adafruit):
+        driver = ADS1115Driver([0, 2])
+        readings = driver.read_all()
+        assert set(readings) == {0, 2}
+        assert readings[2] == pytest.approx(2.1)
+
+    def test_per_channel_gain(self, fake_adafruit):
+        driver = ADS1115Driver([0, 1], {'gain': 1, 'channels': {'1': {'gain': '2/3', 'data_rate': 860}}})
+        assert driver.read_channel(1) == pytest.approx(1 + (2 / 3) / 10.0)
+        assert driver.ads.data_rate == 860
+        assert driver.read_channel(0) == pytest.approx(0.1)
+
+    def test_single_channel_uses_continuous_mode(self, fake_adafruit):
+        assert ADS1115Driver([0]).ads.mode == 'continuous'
+        assert ADS1115Driver([0, 1]).ads.mode == 'single'
+
+    def test_sensor_interface_uses_configured_channels(self, fake_adafruit):
+        config = {'voltage': {'type': 'voltage_divider', 'divider_ratio': 1.0, 'channel': 3}}
+        sensors = SensorInterface(mock=False, alpha=1.0, config=config)
+        assert sensors.mock is False
+        assert sensors.get_telemetry()['voltage'] == pytest.approx(3.1)
+
+class TestDeferredHardware:
+    def test_not_ready_until_initialised(self):
+        with patch('sensors.ADS1115Driver', side_effect=ImportError):
+            sensors = SensorInterface(mock=False, defer_hardware=True)
+            assert not sensors.ready
+            assert sensors.poll() is None
+            # Doesn't spin waiting for a reading that can't come
+            assert sensors.get_telemetry() is None
+            sensors.init_hardware()
+        # Missing ADC libraries fall back to mock readings
+        assert sensors.ready and sensors.mock
+        assert sensors.hardware_error == 'ADC libraries not installed'
+        assert sensors.poll() is not None
+
+
+class FlakyADC:
+    """ADC whose listed channels raise like a NACKed I2C read."""
+
+    def __init__(self, voltages):
+        self.voltages = dict(voltages)
+        self.failing = set()
+        self.resets = 0
+
+    def read_channel(self, channel):
+        if channel in self.failing:
+            raise OSError(121, 'Remote I/O error')
+        return self.voltages[channel]
+
+    def read_all(self):
+        return {channel: self.read_channel(channel) for channel in self.voltages}
+
+    def reset(self):
+        self.resets += 1
+
+
+class TestChannelHealth:
+    @pytest.fixture
+    def sensors(self):
+        config = {
+            'oil_pressure': {'type': 'linear', 'min_voltage': 0, 'max_voltage': 5, 'min_value': 0, 'max_value': 100},
+            'water_temp': {'type': 'linear', 'min_voltage': 0, 'max_voltage': 5, 'min_value': 50, 'max_value': 200},
+            'voltage': {'type': 'voltage_divider', 'divider_ratio': 3.0},
+        }
+        sensors = SensorInterface(mock=True, alpha=1.0, config=config,
+                                  health={'fail_after': 3, 'bus_reset_after': 2})
+        sensors.adc = FlakyADC({0: 2.5, 1: 2.0, 2: 4.0})
+        return sensors
+
+    def test_failed_read_holds_last_value(self, sensors):
+        assert sensors.get_telemetry()['oil_pressure'] == 50.0
+        sensors.adc.failing = {0}
+        telemetry = sensors.get_telemetry()
+        # No 0.0 reading smeared into the EMA
+        assert telemetry['oil_pressure'] == 50.0
+        assert telemetry['water_temp'] == 110.0
+        assert telemetry['sensor_health'] == {'oil_pressure': {'state': 'degraded', 'fault': 'i2c_error'}}
+        assert read_failures(sensors) == 1
+
+    def test_failing_channel_is_blanked_and_skipped(self, sensors):
+        sensors.get_telemetry()
+        sensors.adc.failing = {0}
+        for _ in range(3):
+            telemetry = sensors.get_telemetry()
+        assert telemetry['oil_pressure'] is None
+        assert telemetry['voltage'] == 12.0
+        assert telemetry['sensor_health']['oil_pressure'] == {'state': 'failed', 'fault': 'i2c_error'}
+        # Backing off: further passes don't touch the failed channel
+        failures = read_failures(sensors)
+        sensors.get_telemetry()
+        assert read_failures(sensors) == failures
+
+        sensors.adc.failing = set()
+        sensors.health.channels[0].next_retry = 0.0
+        telemetry = sensors.get_telemetry()
+        assert telemetry['oil_pressure'] == 50.0
+        assert telemetry['sensor_health'] == {'oil_pressure': {'state': 'degraded', 'fault': 'i2c_error'}}
+
+    def test_bus_reset_after_every_channel_fails(self, sensors):
+        sensors.adc.failing = {0, 1, 2}
+        sensors.get_telemetry()
+        assert sensors.adc.resets == 0
+        sensors.get_telemetry()
+        assert sensors.adc.resets == 1
+        assert sensors.health.bus_resets == 1
+
+    def test_steady_inputs_only_stuck_with_engine_running(self):
+        sensors = SensorInterface(mock=True, alpha=1.0, adc_config={'gain': '2/3'}, health={'stuck_samples': 5})
+        sensors.health.check_patterns = True
+        # Engine off: 12 V battery, oil sender at 0 V, every input rock steady
+        sensors.adc = FlakyADC({0: 0.0, 1: 2.0, 2: 4.0})
+        for _ in range(10):
+            telemetry = sensors.get_telemetry()
+        assert telemetry['sensor_health'] == {}
+        # Charging at 13.8 V: frozen readings now count, except the oil sender sitting on the 0 V rail
+        sensors.adc.voltages[2] = 4.6
+        for _ in range(10):
+            telemetry = sensors.get_telemetry()
+        stuck = {'state': 'failed', 'fault': 'stuck'}
+        assert telemetry['sensor_health'] == {'water_temp': stuck, 'voltage': stuck}
+        assert sensors.health.engine_running
+
+    def test_read_voltage_returns_none_on_error(self, sensors):
+        sensors.adc.failing = {2}
+        assert sensors.read_voltage(2) is None
+        assert sensors.read_voltage(1) == 2.0
+
+
+class TestUnconvertibleReadings:
+    CONFIG = {
+        'water_temp': {'type': 'steinhart_hart', 'unit': '°C',
+                       'steinhart_hart': {'a': 1.009249522e-03, 'b': 2.378405444e-04, 'c': 2.019202697e-07},
+                       'voltage_divider': {'r_fixed': 10000}},
+    }
+
+    @pytest.mark.parametrize('stage', ['ema', 'kalman'])
+    def test_open_circuit_then_recovery(self, stage):
+        sensors = SensorInterface(mock=True, alpha=0.5, config=self.CONFIG, smoothing={'stage': stage})
+        sensors.adc = FlakyADC({0: 2.5, 1: 5.0, 2: 4.0})
+        telemetry = sensors.get_telemetry()
+        assert telemetry['water_temp'] is None
+        sensors.adc.voltages[1] = 2.5
+        for _ in range(5):
+            telemetry = sensors.get_telemetry()
+        assert telemetry['water_temp'] == pytest.approx(25.0, abs=0.5)
+        # Sender drops out again: the last value is held, nothing non-finite gets through
+        sensors.adc.voltages[1] = 5.0
+        held = sensors.get_telemetry()
+        assert held['water_temp'] == telemetry['water_temp']
+        json.dumps(held, allow_nan=False)
+        sensors.adc.voltages[1] = 2.5
+        assert sensors.get_telemetry()['water_temp'] == pytest.approx(25.0, abs=0.5)
+
+    def test_open_sender_fails_channel(self):
+        sensors = SensorInterface(mock=True, alpha=1.0, config=self.CONFIG, health={'range_samples': 3})
+        sensors.adc = FlakyADC({0: 2.5, 1: 2.5, 2: 4.0})
+        assert sensors.health.channels[1].open_circuit_high == pytest.approx(4.95)
+        sensors.get_telemetry()
+        # Broken wire: the input floats up to v_ref
+        sensors.adc.voltages[1] = 5.0
+        for _ in range(3):
+            telemetry = sensors.get_telemetry()
+        assert telemetry['water_temp'] is None
+        assert telemetry['sensor_health'] == {'water_temp': {'state': 'failed', 'fault': 'invalid_value'}}
+        sensors.adc.voltages[1] = 2.5
+        telemetry = sensors.get_telemetry()
+        assert telemetry['water_temp'] == pytest.approx(25.0, abs=0.5)
+        assert telemetry['sensor_health'] == {}
+
+    def test_open_sender_detected_from_voltage_in_hardware_mode(self):
+        # At gain 2/3 the pulled-up input is well under full scale
+        sensors = SensorInterface(mock=True, alpha=1.0, config=self.CONFIG, adc_config={'gain': '2/3'},
+                                  health={'range_samples': 3})
+        sensors.adc = FlakyADC({0: 2.5, 1: 4.98, 2: 4.0})
+        sensors.health.check_patterns = True
+        for _ in range(3):
+            telemetry = sensors.get_telemetry()
+        assert telemetry['sensor_health']['water_temp'] == {'state': 'failed', 'fault': 'open_circuit'}
+
+    def test_smoothing_skips_non_finite_input(self):
+        sensors = SensorInterface(mock=True, alpha=0.5)
+        assert sensors._apply_ema('water_temp', float('nan')) is None
+        sensors._apply_ema('water_temp', 180.0)
+        assert sensors._apply_ema('water_temp', float('inf')) == 180.0
+
+
+def read_failures(sensors):
+    return sum(health.errors for health in sensors.health.channels.values())
@@ -0,0 +1,91 @@
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from shutdown import ShutdownCoordinator, POWEROFF, REBOOT
+
+class TestShutdownCoordinator:
+    @pytest.fixture
+    def coordinator(self):
+        coordinator = ShutdownCoordinator(lambda action: coordinator.powered_off.append(action), deadline=1.0)
+        coordinator.powered_off = []
+        return coordinator
+
+    def test_priority_order(self, coordinator):
+        calls = []
+        coordinator.register('late', lambda: calls.append('late'), priority=20)
+        coordinator.register('early', lambda: calls.append('early'), priority=0)
+        coordinator.register('middle', lambda: calls.append('middle'), priority=10)
+        results = coordinator.run()
+        assert calls == ['early', 'middle', 'late']
+        assert [r['status'] for r in results] == ['ok', 'ok', 'ok']
+        assert coordinator.powered_off == [POWEROFF]
+
+    def test_same_priority_runs_in_parallel(self, coordinator):
+        barrier = threading.Barrier(2, timeout=0.5)
+        coordinator.register('a', barrier.wait, priority=10)
+        coordinator.register('b', barrier.wait, priority=10)
+        results = coordinator.run()
+        # Each hook only returns once both are running at the same time
+        assert [r['status'] for r in results] == ['ok', 'ok']
+
+    def test_slow_hook_is_abandoned(self, coordinator):
+        release = threading.Event()
+        coordinator.register('stuck', release.wait, priority=0, budget=0.05)
+        coordinator.register('after', lambda: None, priority=10)
+        started = time.monotonic()
+        results = coordinator.run()
+        release.set()
+        assert time.monotonic() - started < 0.5
+        assert results[0]['status'] == 'timeout'
+        assert results[1]['status'] == 'ok'
+        assert coordinator.powered_off == [POWEROFF]
+
+    def test_deadline_skips_remaining_hooks(self, coordinator):
+        coordinator.deadline = 0.05
+        coordinator.register('slow', lambda: time.sleep(0.2), priority=0, budget=1.0)
+        coordinator.register('never', lambda: None, priority=10)
+        results = coordinator.run()
+        assert [r['status'] for r in results] == ['timeout', 'skipped']
+        assert coordinator.powered_off == [POWEROFF]
+
+    def test_failing_hook_does_not_block_power_off(self, coordinator):
+        def fail():
+            raise IOError("disk gone")
+        coordinator.register('broken', fail)
+        results = coordinator.run(REBOOT)
+        assert results[0]['status'] == 'error'
+        assert results[0]['duration'] is not None
+        assert coordinator.powered_off == [REBOOT]
+
+    def test_runs_only_once(self, coordinator):
+        assert coordinator.run(REBOOT) == []
+        assert coordinator.run(POWEROFF) is None
+        assert coordinator.start(POWEROFF) is False
+        assert coordinator.powered_off == [REBOOT]
+
+    def test_hook_cannot_use_neighbours_budget(self, coordinator):
+        coordinator.register('late', lambda: time.sleep(0.2), priority=10, budget=0.05)
+        coordinator.register('slow', lambda: time.sleep(0.3), priority=10, budget=0.5)
+        results = coordinator.run()
+        # Abandoned at its own 0.05s although its neighbour kept the group open longer
+        assert [r['status'] for r in results] == ['timeout', 'ok']
+
+    def test_skipped_power_off_can_run_again(self):
+        coordinator = ShutdownCoordinator(lambda action: False, deadline=1.0)
+        assert coordinator.run(POWEROFF) == []
+        assert not coordinator.in_progress
+        assert coordinator.run(REBOOT) == []
+
+    def test_failed_power_off_can_run_again(self):
+        def power_off(action):
+            raise OSError("sudo: a password is required")
+        coordinator = ShutdownCoordinator(power_off, deadline=1.0)
+        assert coordinator.run(REBOOT) == []
+        assert not coordinator.in_progress
+        assert coordinator.start(REBOOT)
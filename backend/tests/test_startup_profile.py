@@ -0,0 +1,50 @@
+import pytest
+import builtins
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from startup_profile import StartupProfiler
+
+class TestStartupProfiler:
+    def test_disabled_is_noop(self):
+        profiler = StartupProfiler(enabled=False)
+        original = builtins.__import__
+        profiler.mark('config_loaded')
+        profiler.finish('first_telemetry_update')
+        assert builtins.__import__ is original
+        assert profiler.report() == {'enabled': False}
+
+    def test_phases_in_order_and_marked_once(self, capsys):
+        profiler = StartupProfiler(enabled=True)
+        try:
+            profiler.mark('config_loaded')
+            profiler.mark('first_sample')
+            profiler.mark('config_loaded')
+        finally:
+            profiler.finish('first_telemetry_update')
+        phases = [p['phase'] for p in profiler.report()['phases']]
+        assert phases == ['profiler_loaded', 'config_loaded', 'first_sample', 'first_telemetry_update']
+        times = [p['at_s'] for p in profiler.report()['phases']]
+        assert times == sorted(times)
+        assert 'Startup profile' in capsys.readouterr().out
+
+    def test_import_times(self, tmp_path, monkeypatch):
+        (tmp_path / 'profiled_child.py').write_text("X = 1\n")
+        (tmp_path / 'profiled_parent.py').write_text("import profiled_child\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        original = builtins.__import__
+        profiler = StartupProfiler(enabled=True)
+        try:
+            import profiled_parent  # noqa: F401
+        finally:
+            profiler.finish()
+            sys.modules.pop('profiled_parent', None)
+            sys.modules.pop('profiled_child', None)
+        assert builtins.__import__ is original
+        imports = {entry['module']: entry for entry in profiler.report()['imports']}
+        parent, child = imports['profiled_parent'], imports['profiled_child']
+        assert parent['total_ms'] >= child['total_ms']
+        assert parent['self_ms'] == pytest.approx(parent['total_ms'] - child['total_ms'], abs=0.2)
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch
 # Add backend to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from battery import DischargeEstimator
 from ups import UPSInterface
 
 class TestUPSInterface:
@@ -66,3 +67,59 @@ class TestUPSInterface:
         assert status['capacity'] == 80
         assert status['charging'] is True
         assert status['input_voltage'] == 5.0
+
+    def test_parsing_vout_and_partial_lines(self):
+        """Fields are picked up in one pass; missing fields keep their value."""
+        ups = UPSInterface(mock=True)
+        ups._parse_data("SmartUPS V3.1,Vin 5.10,BATCAP 95,Vout 5.05")
+        assert ups.output_voltage == 5.05
+        ups._parse_data("SmartUPS V3.1,BATCAP 94")
+        assert ups.capacity == 94.0
+        assert ups.input_voltage == 5.10
+
+    def test_serial_framing(self):
+        """Lines split across reads are reassembled before parsing."""
+        ups = UPSInterface(mock=True)
+        chunks = [b"SmartUPS V3.1,Vin 5.", b"10,BATCAP 80,Vout 5.10\r\nSmart", b"UPS V3.1,Vin 0.00,BATCAP 79\r\n"]
+
+        class FakeSerial:
+            is_open = True
+            in_waiting = 0
+
+            def read(self, size):
+                if not chunks:
+                    ups.available = False
+                    return b""
+                return chunks.pop(0)
+
+        parsed = []
+        original = ups._parse_data
+        ups._parse_data = lambda line: (parsed.append(line), original(line))
+        ups.serial = FakeSerial()
+        ups.available = True
+        ups._read_serial_loop()
+        assert parsed == ["SmartUPS V3.1,Vin 5.10,BATCAP 80,Vout 5.10", "SmartUPS V3.1,Vin 0.00,BATCAP 79"]
+        assert ups.input_voltage == 0.0
+        assert ups.capacity == 79.0
+
+    def test_frame_listeners(self):
+        """Listeners are called after every parsed frame."""
+        ups = UPSInterface(mock=True)
+        seen = []
+        ups.add_listener(lambda interface: seen.append(interface.input_voltage))
+        ups._parse_data("SmartUPS V3.1,Vin 0.00,BATCAP 90,Vout 5.10")
+        assert seen == [0.0]
+
+    def test_runtime_estimate_in_status(self):
+        """Discharge frames produce a runtime estimate and shutdown deadline."""
+        clock = [0.0]
+        ups = UPSInterface(mock=True, estimator=DischargeEstimator(clock=lambda: clock[0]), shutdown_reserve=20)
+        ups.available = True
+        for t in range(31):
+            clock[0] = float(t)
+            ups._parse_data(f"SmartUPS V3.1,Vin 0.00,BATCAP {90 - t},Vbat {4.0 - 0.001 * t:.3f}")
+        status = ups.get_status()
+        # BATCAP drops 1%/s and reaches 5% at t=85
+        assert status['runtime_minutes'] == pytest.approx(55 / 60.0, abs=0.05)
+        assert ups.safe_runtime() == pytest.approx(35.0)
+        assert status['shutdown_deadline'] is not None
@@ -0,0 +1,62 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from warmstart import WarmStartStore, encode_state, decode_state
+
+class TestStateEncoding:
+    def test_round_trip(self):
+        sections = {'sensors': {'water_temp': {'ema': 88.5, 'kalman': [None, 0.0]}}}
+        saved_at, decoded = decode_state(encode_state(sections, 1234.5))
+        assert saved_at == 1234.5
+        assert decoded == sections
+
+    def test_rejects_damaged_file(self):
+        data = bytearray(encode_state({'ups': {'capacity': 80}}, 0.0))
+        data[-1] ^= 0xFF
+        with pytest.raises(ValueError):
+            decode_state(bytes(data))
+        with pytest.raises(ValueError):
+            decode_state(b'MW')
+
+class TestWarmStartStore:
+    @pytest.fixture
+    def clock(self):
+        return [1000.0]
+
+    @pytest.fixture
+    def store(self, tmp_path, clock):
+        return WarmStartStore(tmp_path / 'state.bin', min_interval=300,
+                              max_age={'sensors': 600}, clock=lambda: clock[0])
+
+    def test_save_and_load(self, store, clock):
+        assert store.save({'sensors': {'voltage': {'ema': 14.1}}, 'discharge': {'capacity': -0.01}})
+        clock[0] += 60
+        assert store.load() == {'sensors': {'voltage': {'ema': 14.1}}, 'discharge': {'capacity': -0.01}}
+
+    def test_stale_sections_dropped(self, store, clock):
+        store.save({'sensors': {'voltage': {'ema': 14.1}}, 'discharge': {'capacity': -0.01}})
+        clock[0] += 3600
+        assert store.load() == {'discharge': {'capacity': -0.01}}
+
+    def test_future_file_ignored(self, store, clock):
+        store.save({'discharge': {'capacity': -0.01}})
+        clock[0] -= 10
+        assert store.load() == {}
+
+    def test_rate_limited(self, store, clock):
+        assert store.save({'ups': {'capacity': 80}})
+        clock[0] += 10
+        assert not store.save({'ups': {'capacity': 79}})
+        assert store.save({'ups': {'capacity': 79}}, force=True)
+        clock[0] += 300
+        # Unchanged state isn't rewritten
+        assert not store.save({'ups': {'capacity': 79}})
+
+    def test_missing_or_corrupt_file(self, store):
+        assert store.load() == {}
+        store.path.write_bytes(b'garbage' * 10)
+        assert store.load() == {}
@@ -0,0 +1,89 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from warning_engine import WarningEngine, LOW, HIGH
+
+THRESHOLDS = {
+    'oil_pressure': (10, 90, 0.5),
+    'water_temp': (None, 220, 0.5),
+}
+
+
+@pytest.fixture
+def engine():
+    return WarningEngine(THRESHOLDS, min_duration=5.0)
+
+
+class TestWarningEngine:
+    def test_starts_on_first_sample_out_of_range(self, engine):
+        events = []
+        engine.add_listener(lambda changes, ended: events.append((changes, ended)))
+        assert engine.update({'oil_pressure': 40, 'water_temp': 180}, now=0.0) == {}
+        changes = engine.update({'oil_pressure': 8.5, 'water_temp': 180}, now=1.0)
+        assert changes == {'oil_pressure': {'level': LOW, 'value': 8.5, 'since': 1.0, 'peak': 8.5}}
+        assert events == [(changes, {})]
+        # Still low: no new event, but the peak follows
+        assert engine.update({'oil_pressure': 7.0}, now=2.0) == {}
+        assert engine.active()['oil_pressure']['value'] == 8.5
+        assert engine.active()['oil_pressure']['peak'] == 7.0
+        assert changes['oil_pressure']['peak'] == 8.5
+
+    def test_clears_after_min_duration(self, engine):
+        ended = []
+        engine.add_listener(lambda changes, finished: ended.append(finished))
+        engine.update({'water_temp': 225}, now=0.0)
+        engine.update({'water_temp': 226}, now=2.0)
+        assert engine.update({'water_temp': 200}, now=6.0) == {}
+        assert engine.update({'water_temp': 200}, now=7.0) == {'water_temp': None}
+        assert engine.active() == {}
+        assert ended[-1] == {'water_temp': {'level': HIGH, 'value': 225, 'since': 0.0, 'peak': 226, 'end': 7.0}}
+
+    def test_hysteresis_holds_warning_near_limit(self, engine):
+        engine.update({'oil_pressure': 9.8}, now=0.0)
+        # Back above min but inside the band
+        assert engine.update({'oil_pressure': 10.2}, now=10.0) == {}
+        assert engine.update({'oil_pressure': 10.5}, now=11.0) == {'oil_pressure': None}
+
+    def test_level_change_is_reported(self, engine):
+        engine.update({'oil_pressure': 5}, now=0.0)
+        changes = engine.update({'oil_pressure': 95}, now=1.0)
+        assert changes['oil_pressure']['level'] == HIGH
+
+    def test_ignores_missing_and_non_numeric_values(self, engine):
+        assert engine.update({'oil_pressure': None, 'water_temp': True}, now=0.0) == {}
+
+    def test_removed_threshold_clears_warning(self, engine):
+        engine.update({'water_temp': 230}, now=0.0)
+        engine.set_thresholds({'oil_pressure': (10, 90, 0.5)}, min_duration=1.0)
+        assert engine.update({'oil_pressure': 40}, now=0.5) == {'water_temp': None}
+        assert engine.min_duration == 1.0
+
+    def test_state_lists_every_metric(self, engine):
+        engine.update({'water_temp': 230}, now=0.0)
+        assert engine.state() == {'oil_pressure': None,
+                                  'water_temp': {'level': HIGH, 'value': 230, 'since': 0.0, 'peak': 230}}
+
+    def test_concurrent_updates_are_serialised(self, engine):
+        events = []
+        relayed = []
+
+        def listener(changes, ended):
+            events.append(changes)
+            if len(events) == 1:
+                # A relayed frame arriving while the sampler's change is being handled waits its turn
+                thread = threading.Thread(target=engine.update, args=({'oil_pressure': 95},), kwargs={'now': 1.0})
+                thread.start()
+                thread.join(0.05)
+                relayed.append((thread, thread.is_alive()))
+
+        engine.add_listener(listener)
+        engine.update({'oil_pressure': 5}, now=0.0)
+        thread, blocked = relayed[0]
+        thread.join(1.0)
+        assert blocked
+        assert [changes['oil_pressure']['level'] for changes in events] == [LOW, HIGH]
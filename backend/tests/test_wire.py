@@ -0,0 +1,58 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from wire import encode_frame, decode_frame, schema, WIRE_VERSION
+
+class TestWireFormat:
+    def test_round_trip(self):
+        frame = {
+            'oil_pressure': 42.5,
+            'water_temp': 187.3,
+            'voltage': 13.9,
+            'ups': {'available': True, 'voltage': 4.02, 'capacity': 88.0, 'charging': False,
+                    'input_voltage': 0.0, 'output_voltage': 5.1, 'runtime_minutes': None,
+                    'shutdown_deadline': 1792224000},
+        }
+        assert decode_frame(encode_frame(frame)) == frame
+
+    def test_delta_frame_is_small(self):
+        frame = {'water_temp': 187.3}
+        data = encode_frame(frame)
+        assert len(data) == 3 + 5
+        assert len(data) < len(json.dumps(frame))
+        assert decode_frame(data) == frame
+
+    def test_unknown_keys_carried_as_extras(self):
+        frame = {'voltage': 13.9, 'replay_sent_at': 1792224000.25, 'ups': {'capacity': 80.0, 'model': 'V3P'}}
+        assert decode_frame(encode_frame(frame)) == frame
+
+    def test_rejects_other_versions(self):
+        data = bytearray(encode_frame({'voltage': 13.9}))
+        data[0] = WIRE_VERSION + 1
+        with pytest.raises(ValueError):
+            decode_frame(bytes(data))
+
+    def test_schema_ids_unique(self):
+        ids = [field['id'] for field in schema()['fields']]
+        assert len(ids) == len(set(ids))
+
+    def test_none_sent_as_nan(self):
+        frame = {'oil_pressure': None, 'ups': {'voltage': None}}
+        data = encode_frame(frame)
+        # Both in fixed fields, no extras block
+        assert len(data) == 3 + 2 * 5
+        assert decode_frame(data) == frame
+
+    def test_values_fields_cannot_hold_go_to_extras(self):
+        frame = {'oil_pressure': 1e40, 'water_temp': 'hot', 'voltage': True,
+                 'ups': {'capacity': 'full', 'charging': None, 'shutdown_deadline': 10 ** 400}}
+        assert decode_frame(encode_frame(frame)) == frame
+
+    def test_oversized_extras_rejected(self):
+        with pytest.raises(ValueError):
+            encode_frame({'note': 'x' * 70000})
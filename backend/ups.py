@@ -3,12 +3,37 @@ import os
 import threading
 import re
 
+from battery import DischargeEstimator
+from metrics import metrics
+
+PARSE_SECONDS = metrics.histogram('ups_parse_seconds', 'Time to parse one UPS line and notify listeners')
+UPS_FRAMES = metrics.counter('ups_frames_total', 'UPS lines parsed')
+UPS_PARSE_ERRORS = metrics.counter('ups_parse_errors_total', 'UPS lines that failed to parse')
+UPS_READ_ERRORS = metrics.counter('ups_read_errors_total', 'UPS serial read errors')
+
+# One pass over a UPSPack V3 line picks up every "<name> <number>" field
+_FIELD_RE = re.compile(r'\b(Vin|BATCAP|Vbat|Vout)\s*([0-9]+(?:\.[0-9]+)?)')
+
+# UART field name -> UPSInterface attribute
+_FIELD_ATTRS = {
+    'Vin': 'input_voltage',
+    'BATCAP': 'capacity',
+    'Vbat': 'voltage',
+    'Vout': 'output_voltage',
+}
+
+# Drop the framing buffer if this much arrives without a newline (line noise)
+MAX_LINE_BYTES = 256
+
 class UPSInterface:
-    def __init__(self, port='/dev/serial0', baudrate=9600, mock=False):
+    def __init__(self, port='/dev/serial0', baudrate=9600, mock=False, estimator=None, shutdown_reserve=20.0,
+                 connect=True):
         self.port = port
         self.baudrate = baudrate
         self.mock = mock
         self.available = False
+        # Why the serial port isn't open (hardware mode), for /api/health
+        self.error = None
         self.serial = None
         self.shutdown_timer_start = None
         self.SHUTDOWN_DELAY = 60  # Seconds to wait before shutdown
@@ -17,19 +42,34 @@ class UPSInterface:
         self.voltage = 0.0      # Battery Voltage
         self.capacity = 100.0   # Battery Percentage
         self.input_voltage = 5.0 # Input (USB) Voltage
+        self.output_voltage = 5.0 # Output (Pi supply) Voltage
         self.charging = True
-        
+
+        # Battery runtime model, fed on every frame while discharging.
+        # shutdown_reserve is the time (s) a clean shutdown needs at the end.
+        self.estimator = estimator or DischargeEstimator()
+        self.shutdown_reserve = shutdown_reserve
+
+        # Called with this interface after every parsed frame
+        self._listeners = []
+        self.frames = 0
+
+        if connect:
+            self.connect()
+
+    def connect(self):
+        """Open the serial port and start the reader thread (no-op in mock mode)."""
         if self.mock:
             print("✅ UPS Interface started in MOCK mode (Passive)")
             # In mock mode, we don't open a serial port.
             # Values remain at defaults unless updated externally or by a simulation hook.
-            self.available = False  # Only becomes True when simulation script connects 
+            # available only becomes True when the simulation script connects.
         else:
             try:
                 import serial
-                self.serial = serial.Serial(port, baudrate, timeout=1)
+                self.serial = serial.Serial(self.port, self.baudrate, timeout=1)
                 self.available = True
-                print(f"✅ UPS Serial connection opened on {port}")
+                print(f"✅ UPS Serial connection opened on {self.port}")
                 
                 # Start a background thread to continuously read serial data
                 self.read_thread = threading.Thread(target=self._read_serial_loop, daemon=True)
@@ -38,56 +78,105 @@ class UPSInterface:
             except ImportError:
                 print("⚠️ pyserial not installed. Install with: pip install pyserial")
                 self.available = False
+                self.error = "pyserial not installed"
             except Exception as e:
                 print(f"⚠️ UPS Serial connection failed: {e}")
                 self.available = False
+                self.error = str(e)
+
+    def add_listener(self, callback):
+        """Register callback(ups_interface), called from the reader thread after each frame."""
+        self._listeners.append(callback)
+
+    def frame_received(self):
+        """Update the battery model and notify listeners with the current readings.
+
+        Called after each parsed serial line, and by the mock simulator.
+        """
+        self.frames += 1
+        self.estimator.add(self.voltage, self.capacity, self.charging)
+        for callback in self._listeners:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error in UPS listener {callback!r}: {e}")
 
     def _read_serial_loop(self):
         """
-        Continuously reads lines from the serial port and parses them.
+        Continuously reads the serial stream and parses each complete line.
         Expected format (V3): "SmartUPS V3.1,Vin 5.10,BATCAP 100,Vout 5.10"
+
+        read() blocks until at least one byte arrives (or the port timeout
+        passes), so a line is parsed as soon as its newline lands instead of on
+        the next polling tick. Lines are framed in a reusable bytearray.
         """
-        buffer = ""
+        buffer = bytearray()
         while self.available and self.serial.is_open:
             try:
-                if self.serial.in_waiting > 0:
-                    line = self.serial.readline().decode('utf-8', errors='ignore').strip()
+                chunk = self.serial.read(self.serial.in_waiting or 1)
+                if not chunk:
+                    continue
+                buffer += chunk
+                newline = buffer.find(b'\n')
+                while newline >= 0:
+                    line = bytes(buffer[:newline]).strip()
+                    del buffer[:newline + 1]
                     if line:
-                        self._parse_data(line)
-                else:
-                    time.sleep(0.1)
+                        self._parse_data(line.decode('ascii', errors='ignore'))
+                    newline = buffer.find(b'\n')
+                if len(buffer) > MAX_LINE_BYTES:
+                    buffer.clear()
             except Exception as e:
+                UPS_READ_ERRORS.inc()
                 print(f"Error reading UPS serial: {e}")
+                buffer.clear()
                 time.sleep(1)
 
     def _parse_data(self, line):
         """
         Parses the UART string from UPSPack V3.
         Example: "SmartUPS V3.1,Vin 5.10,BATCAP 100,Vout 5.10"
+        Some versions also send "Vbat X.XX". Fields missing from a line keep
+        their previous value.
         """
+        start = time.perf_counter()
         try:
-            # Parse Input Voltage (Vin)
-            vin_match = re.search(r'Vin\s*([0-9.]+)', line)
-            if vin_match:
-                self.input_voltage = float(vin_match.group(1))
-
-            # Parse Battery Capacity (BATCAP)
-            cap_match = re.search(r'BATCAP\s*([0-9]+)', line)
-            if cap_match:
-                self.capacity = float(cap_match.group(1))
-            
-            # Parse Battery Voltage (if available, Vbat isn't always in the standard string but Vout is)
-            # Some versions send "Vbat X.XX"
-            vbat_match = re.search(r'Vbat\s*([0-9.]+)', line)
-            if vbat_match:
-                self.voltage = float(vbat_match.group(1))
-            
+            for name, value in _FIELD_RE.findall(line):
+                setattr(self, _FIELD_ATTRS[name], float(value))
+
             # Infer charging status based on Input Voltage
             # If Vin > 4.5V, we are plugged in
             self.charging = self.input_voltage > 4.5
             
         except Exception as e:
+            UPS_PARSE_ERRORS.inc()
             print(f"Error parsing UPS data '{line}': {e}")
+            return
+        UPS_FRAMES.inc()
+        self.frame_received()
+        PARSE_SECONDS.observe(time.perf_counter() - start)
+
+    def battery_readings(self):
+        """Last battery readings, for carrying over to the next run."""
+        return {'voltage': self.voltage, 'capacity': self.capacity}
+
+    def restore_battery_readings(self, readings):
+        """Show readings from an earlier run until the first frame arrives.
+
+        Input voltage is deliberately not restored: power state must come
+        from a live frame.
+        """
+        if self.frames:
+            return
+        self.voltage = readings.get('voltage', self.voltage)
+        self.capacity = readings.get('capacity', self.capacity)
+
+    def safe_runtime(self):
+        """Seconds we can keep running before we must start shutting down, or None if unknown."""
+        remaining = self.estimator.seconds_remaining()
+        if remaining is None:
+            return None
+        return max(0.0, remaining - self.shutdown_reserve)
 
     def get_status(self):
         """
@@ -96,16 +185,24 @@ class UPSInterface:
         - capacity (%)
         - charging (bool)
         - input_voltage (V)
+        - output_voltage (V)
+        - runtime_minutes: estimated battery runtime left (None unless discharging)
+        - shutdown_deadline: unix time by which shutdown must start (None if unknown)
         """
         if not self.available:
             return {"available": False, "voltage": 0, "capacity": 0, "charging": False}
-        
+
+        remaining = self.estimator.seconds_remaining()
+        safe = self.safe_runtime()
         return {
             "available": True,
             "voltage": self.voltage,
             "capacity": self.capacity,
             "charging": self.charging,
-            "input_voltage": self.input_voltage
+            "input_voltage": self.input_voltage,
+            "output_voltage": self.output_voltage,
+            "runtime_minutes": None if remaining is None else round(remaining / 60.0, 1),
+            "shutdown_deadline": None if safe is None else round(time.time() + safe)
         }
 
     def check_power_loss(self):
@@ -0,0 +1,92 @@
+import json
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+
+# File layout (little endian):
+#   header   magic, version, saved_at (unix time), crc32 of payload
+#   payload  zlib(JSON object of {section: state})
+STATE_MAGIC = b'MWST'
+STATE_VERSION = 1
+STATE_HEADER = struct.Struct('<4sBdI')
+
+
+def encode_state(sections, saved_at):
+    payload = zlib.compress(json.dumps(sections, separators=(',', ':')).encode('utf-8'))
+    return STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, saved_at, zlib.crc32(payload)) + payload
+
+
+def decode_state(data):
+    """Return (saved_at, sections). Raises ValueError for a foreign or damaged file."""
+    if len(data) < STATE_HEADER.size:
+        raise ValueError("state file truncated")
+    magic, version, saved_at, crc = STATE_HEADER.unpack_from(data)
+    if magic != STATE_MAGIC or version != STATE_VERSION:
+        raise ValueError("not a warm-start state file")
+    payload = data[STATE_HEADER.size:]
+    if zlib.crc32(payload) != crc:
+        raise ValueError("state file checksum mismatch")
+    return saved_at, json.loads(zlib.decompress(payload))
+
+
+class WarmStartStore:
+    """Small state file that lets the next run start with settled filters.
+
+    save() writes at most once per `min_interval` seconds (unless forced, as
+    on shutdown) and skips writes when nothing changed, to spare the SD card.
+    The file is replaced atomically, so a power cut leaves the old copy.
+
+    load() drops every section older than max_age[section] seconds, and
+    everything when the clock says the file is from the future.
+    """
+
+    def __init__(self, path, min_interval=300, max_age=None, clock=time.time):
+        self.path = Path(path)
+        self.min_interval = min_interval
+        self.max_age = max_age or {}
+        self.clock = clock
+        self._last_save = None
+        self._last_payload = None
+
+    def save(self, sections, force=False):
+        """Write sections ({name: JSON-serialisable state}). Returns True if written."""
+        now = self.clock()
+        if not force and self._last_save is not None and now - self._last_save < self.min_interval:
+            return False
+        self._last_save = now
+        data = encode_state(sections, now)
+        payload = data[STATE_HEADER.size:]
+        if payload == self._last_payload:
+            return False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._last_payload = payload
+        return True
+
+    def load(self):
+        """Return {section: state} for sections still fresh enough to use."""
+        try:
+            saved_at, sections = decode_state(self.path.read_bytes())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring warm-start state {self.path}: {e}")
+            return {}
+
+        age = self.clock() - saved_at
+        fresh = {}
+        for name, state in sections.items():
+            max_age = self.max_age.get(name)
+            if age < 0 or (max_age is not None and age > max_age):
+                continue
+            fresh[name] = state
+        print(f"♻️ Warm start from state saved {age:.0f}s ago: {', '.join(fresh) or 'nothing fresh'}")
+        return fresh
@@ -0,0 +1,110 @@
+import threading
+import time
+
+LOW = 'low'
+HIGH = 'high'
+
+
+class WarningEngine:
+    """Evaluates sensors.thresholds against every sample.
+
+    A warning starts on the first sample beyond a metric's min or max. It
+    clears once the value is back inside the limit by at least the
+    hysteresis band, and min_duration seconds after the value was last out
+    of range, so a reading hovering at a limit doesn't flicker.
+
+    Listeners get callback(changes, ended). changes is {metric: info or
+    None} for the warnings that started (info) or cleared (None) on that
+    sample. ended holds the final info of every excursion that finished,
+    with its 'peak' (most extreme value) and 'end' time.
+
+    update() is called from the sampler thread and for relayed frames, so
+    samples are evaluated, and listeners called, one at a time under a lock.
+    """
+
+    def __init__(self, thresholds=None, min_duration=5.0, clock=time.time):
+        # metric -> (low, high, hysteresis); None where there is no limit
+        self.thresholds = thresholds or {}
+        self.min_duration = min_duration
+        self.clock = clock
+        self._active = {}
+        self._last_out = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def set_thresholds(self, thresholds, min_duration=None):
+        """Swap the threshold table; active warnings are re-checked on the next sample."""
+        self.thresholds = thresholds
+        if min_duration is not None:
+            self.min_duration = min_duration
+
+    def active(self):
+        """{metric: {'level', 'value', 'since', 'peak'}} for every active warning."""
+        with self._lock:
+            return dict(self._active)
+
+    def state(self):
+        """Every thresholded metric mapped to its warning info, or None when clear."""
+        with self._lock:
+            active = dict(self._active)
+            thresholds = self.thresholds
+        return {metric: active.get(metric) for metric in set(thresholds) | set(active)}
+
+    def update(self, values, now=None):
+        """Evaluate one sample (a telemetry dict). Returns the changes, {} if none."""
+        with self._lock:
+            return self._update(values, now)
+
+    def _update(self, values, now):
+        now = self.clock() if now is None else now
+        changes = {}
+        ended = {}
+        for metric, (low, high, band) in self.thresholds.items():
+            value = values.get(metric)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if low is not None and value < low:
+                level = LOW
+            elif high is not None and value > high:
+                level = HIGH
+            else:
+                level = None
+
+            current = self._active.get(metric)
+            if level:
+                self._last_out[metric] = now
+                if current is None or current['level'] != level:
+                    if current is not None:
+                        ended[metric] = dict(current, end=now)
+                    changes[metric] = self._active[metric] = {
+                        'level': level, 'value': value, 'since': now, 'peak': value}
+                elif (value < current['peak']) if level == LOW else (value > current['peak']):
+                    # Replaced, not mutated: info dicts already handed out stay as they were
+                    self._active[metric] = dict(current, peak=value)
+            elif current is not None:
+                limit = low if current['level'] == LOW else high
+                if limit is None:
+                    inside = True
+                elif current['level'] == LOW:
+                    inside = value >= limit + band
+                else:
+                    inside = value <= limit - band
+                if inside and now - self._last_out.get(metric, now) >= self.min_duration:
+                    ended[metric] = dict(self._active.pop(metric), end=now)
+                    changes[metric] = None
+
+        # Metrics whose threshold was removed from the config
+        for metric in [m for m in self._active if m not in self.thresholds]:
+            ended[metric] = dict(self._active.pop(metric), end=now)
+            changes[metric] = None
+
+        if changes:
+            for callback in self._listeners:
+                try:
+                    callback(changes, ended)
+                except Exception as e:
+                    print(f"Error in warning listener: {e}")
+        return changes
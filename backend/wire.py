@@ -0,0 +1,131 @@
+import json
+import struct
+
+JSON = 'json'
+BINARY = 'binary'
+
+# Compact telemetry frame, version 1 (little endian):
+#   header   version u8, reserved u8, field count u8
+#   fields   field id u8 + value, typed per FIELDS
+#   extras   optional: id EXTRAS_ID, u16 length, UTF-8 JSON of keys not in FIELDS
+# Field ids are stable: new fields get new ids, removed ids are never reused.
+# None in a float field is sent as NaN. A value its field can't hold (not a
+# number, beyond float32 range, None or non-bool in a bool field) goes in the
+# extras instead. Version changes only for layout changes.
+WIRE_VERSION = 1
+FRAME_HEADER = struct.Struct('<BBB')
+EXTRAS_ID = 255
+EXTRAS_LENGTH = struct.Struct('<H')
+MAX_EXTRAS_BYTES = 0xFFFF
+
+# (id, key, struct code). 'ups.x' fields live in the nested ups dict.
+FIELDS = (
+    (1, 'oil_pressure', 'f'),
+    (2, 'water_temp', 'f'),
+    (3, 'voltage', 'f'),
+    (16, 'ups.available', '?'),
+    (17, 'ups.voltage', 'f'),
+    (18, 'ups.capacity', 'f'),
+    (19, 'ups.charging', '?'),
+    (20, 'ups.input_voltage', 'f'),
+    (21, 'ups.output_voltage', 'f'),
+    (22, 'ups.runtime_minutes', 'f'),
+    # Unix time: float32 would round it to minutes
+    (23, 'ups.shutdown_deadline', 'd'),
+)
+
+_ENCODE = {key: (field_id, struct.Struct('<B' + code)) for field_id, key, code in FIELDS}
+_DECODE = {field_id: (key, struct.Struct('<' + code)) for field_id, key, code in FIELDS}
+_NAN = float('nan')
+
+
+def schema():
+    """Field table sent to clients when they negotiate the binary format."""
+    return {
+        'version': WIRE_VERSION,
+        'fields': [{'id': field_id, 'key': key, 'type': code} for field_id, key, code in FIELDS],
+    }
+
+
+def _pack(field, value):
+    """Pack one field, or return None if its type can't hold the value."""
+    field_id, packer = field
+    if packer.format == '<B?':
+        return packer.pack(field_id, value) if isinstance(value, bool) else None
+    if value is None:
+        value = _NAN
+    elif isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    try:
+        return packer.pack(field_id, value)
+    except (OverflowError, struct.error):
+        # Beyond float32 range, or an int too large for a double
+        return None
+
+
+def encode_frame(frame):
+    """Encode a telemetry_update dict as a compact binary frame (bytes).
+
+    Raises ValueError if the extras don't fit in one frame (over 64 KiB of
+    JSON); send that frame as JSON instead.
+    """
+    parts = []
+    extras = {}
+    for key, value in frame.items():
+        if key == 'ups' and isinstance(value, dict):
+            for ups_key, ups_value in value.items():
+                field = _ENCODE.get('ups.' + ups_key)
+                packed = None if field is None else _pack(field, ups_value)
+                if packed is None:
+                    extras.setdefault('ups', {})[ups_key] = ups_value
+                else:
+                    parts.append(packed)
+            continue
+        field = _ENCODE.get(key)
+        packed = None if field is None else _pack(field, value)
+        if packed is None:
+            extras[key] = value
+        else:
+            parts.append(packed)
+
+    data = FRAME_HEADER.pack(WIRE_VERSION, 0, len(parts)) + b''.join(parts)
+    if extras:
+        blob = json.dumps(extras, separators=(',', ':')).encode('utf-8')
+        if len(blob) > MAX_EXTRAS_BYTES:
+            raise ValueError(f"telemetry extras too large for a binary frame ({len(blob)} bytes)")
+        data += bytes((EXTRAS_ID,)) + EXTRAS_LENGTH.pack(len(blob)) + blob
+    return data
+
+
+def decode_frame(data):
+    """Decode a binary frame back into the equivalent telemetry_update dict.
+
+    float32 values are rounded to 4 decimals, undoing the float32 noise on
+    values that were rounded before sending.
+    """
+    version, _, count = FRAME_HEADER.unpack_from(data)
+    if version != WIRE_VERSION:
+        raise ValueError(f"unsupported telemetry wire version {version}")
+    frame = {}
+    offset = FRAME_HEADER.size
+    for _ in range(count):
+        key, value_struct = _DECODE[data[offset]]
+        value, = value_struct.unpack_from(data, offset + 1)
+        offset += 1 + value_struct.size
+        if value != value:
+            value = None
+        elif value_struct.format == '<f':
+            value = round(value, 4)
+        if key.startswith('ups.'):
+            frame.setdefault('ups', {})[key[4:]] = value
+        else:
+            frame[key] = value
+    if offset < len(data) and data[offset] == EXTRAS_ID:
+        length, = EXTRAS_LENGTH.unpack_from(data, offset + 1)
+        start = offset + 1 + EXTRAS_LENGTH.size
+        extras = json.loads(data[start:start + length].decode('utf-8'))
+        ups_extras = extras.pop('ups', None)
+        frame.update(extras)
+        if ups_extras:
+            frame.setdefault('ups', {}).update(ups_extras)
+    return frame
@@ -6,6 +6,7 @@ import CarPlay from './components/CarPlay';
 import Equalizer from './components/Equalizer';
 import { LayoutDashboard, Smartphone, Settings, Battery, BatteryCharging, AudioLines } from 'lucide-react';
 import logo from './assets/logo.png';
+import { WIRE_VERSION, buildFieldTable, decodeTelemetryFrame } from './telemetryWire';
 
 // Use current hostname for API. 
 // Priority: 
@@ -31,6 +32,7 @@ function App() {
   const [isTelemetryStale, setIsTelemetryStale] = useState(false);
   const lastUpdateRef = useRef(Date.now());
   const mountTimeRef = useRef(Date.now());
+  const fieldTableRef = useRef(null);
 
   // Splash screen timer
   useEffect(() => {
@@ -58,15 +60,19 @@ function App() {
     return () => clearInterval(checkInterval);
   }, []);
 
-  // Fetch configuration from backend
+  // Fetch configuration from backend, and again whenever the config file is edited
   useEffect(() => {
-    fetch(`http://${API_HOST}:5001/api/config`)
+    const loadConfig = () => fetch(`http://${API_HOST}:5001/api/config`)
       .then(res => res.json())
       .then(data => {
         setConfig(data);
         setVisualWarningsEnabled(data.ui?.visual_warnings?.enabled ?? true);
       })
       .catch(err => console.error('Failed to load config:', err));
+
+    loadConfig();
+    socket.on('config_changed', loadConfig);
+    return () => socket.off('config_changed', loadConfig);
   }, []);
 
   useEffect(() => {
@@ -82,18 +88,49 @@ function App() {
       console.log('Connected to backend');
     });
 
-    socket.on('telemetry_update', (data) => {
+    const applyTelemetry = (data) => {
       setTelemetry(prev => ({ ...prev, ...data }));
       lastUpdateRef.current = Date.now();
       setIsTelemetryStale(false);
+    };
+
+    socket.on('telemetry_update', applyTelemetry);
+
+    // Compact binary frames, once negotiated (see telemetry_format below)
+    socket.on('telemetry_format', (reply) => {
+      fieldTableRef.current = reply.format === 'binary' ? buildFieldTable(reply) : null;
+    });
+    socket.on('telemetry_binary', (data) => {
+      if (!fieldTableRef.current) return;
+      try {
+        applyTelemetry(decodeTelemetryFrame(data, fieldTableRef.current));
+      } catch (err) {
+        console.error('Failed to decode telemetry frame:', err);
+      }
     });
 
     return () => {
       socket.off('connect');
       socket.off('telemetry_update');
+      socket.off('telemetry_format');
+      socket.off('telemetry_binary');
     };
   }, []);
 
+  // Ask for binary telemetry frames when the config says so, on every (re)connect
+  const telemetryFormat = config?.frontend?.telemetry_format;
+  useEffect(() => {
+    if (telemetryFormat !== 'binary') return;
+    const negotiate = () => socket.emit('telemetry_format', { format: 'binary', version: WIRE_VERSION });
+    if (socket.connected) negotiate();
+    socket.on('connect', negotiate);
+    return () => {
+      socket.off('connect', negotiate);
+      // Back to JSON when a config edit turns binary off
+      if (socket.connected) socket.emit('telemetry_format', { format: 'json' });
+    };
+  }, [telemetryFormat]);
+
   // Listen for CarPlay status updates
   useEffect(() => {
     const port = config?.carplay?.port || 5006;
@@ -204,6 +241,7 @@ function App() {
             warningsEnabled={visualWarningsEnabled}
             config={config}
             isStale={isTelemetryStale}
+            socket={socket}
           />
         )}
 
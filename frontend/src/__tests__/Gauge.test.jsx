@@ -24,6 +24,14 @@ describe('Gauge Component', () => {
         expect(screen.getByText('50')).toBeInTheDocument();
     });
 
+    test('shows dashes when the sensor value is missing', () => {
+        const fault = { state: 'failed', fault: 'i2c_error' };
+        const { container } = render(<Gauge {...defaultProps} value={null} fault={fault} />);
+        expect(screen.getByText('--')).toBeInTheDocument();
+        expect(container.firstChild).toHaveClass('fault');
+        expect(container.firstChild).toHaveAttribute('title', 'Sensor failed: i2c_error');
+    });
+
     test('applies warning class when warning prop is true', () => {
         const { container } = render(<Gauge {...defaultProps} warning={true} />);
         // The outer div should have the 'warning' class
@@ -0,0 +1,40 @@
+import { buildFieldTable, decodeTelemetryFrame } from '../telemetryWire';
+
+// Field table and frame as produced by backend/wire.py (schema() and encode_frame())
+const SCHEMA = {
+    version: 1,
+    fields: [
+        { id: 1, key: 'oil_pressure', type: 'f' },
+        { id: 2, key: 'water_temp', type: 'f' },
+        { id: 3, key: 'voltage', type: 'f' },
+        { id: 16, key: 'ups.available', type: '?' },
+        { id: 18, key: 'ups.capacity', type: 'f' },
+        { id: 22, key: 'ups.runtime_minutes', type: 'f' },
+        { id: 23, key: 'ups.shutdown_deadline', type: 'd' },
+    ],
+};
+
+// {oil_pressure: 42.5, water_temp: 187.3, ups: {available: true, capacity: 88, runtime_minutes: null,
+//  shutdown_deadline: 1792224000, model: 'V3P'}, replay_sent_at: 12.5}
+const FRAME = [1, 0, 6, 1, 0, 0, 42, 66, 2, 205, 76, 59, 67, 16, 1, 18, 0, 0, 176, 66, 22, 0, 0, 192, 127, 23, 0, 0,
+    0, 192, 202, 180, 218, 65, 255, 45, 0, 123, 34, 117, 112, 115, 34, 58, 123, 34, 109, 111, 100, 101, 108, 34, 58,
+    34, 86, 51, 80, 34, 125, 44, 34, 114, 101, 112, 108, 97, 121, 95, 115, 101, 110, 116, 95, 97, 116, 34, 58, 49,
+    50, 46, 53, 125];
+
+describe('telemetry wire format', () => {
+    test('decodes a backend frame', () => {
+        const frame = decodeTelemetryFrame(new Uint8Array(FRAME).buffer, buildFieldTable(SCHEMA));
+        expect(frame).toEqual({
+            oil_pressure: 42.5,
+            water_temp: 187.3,
+            ups: { available: true, capacity: 88, runtime_minutes: null, shutdown_deadline: 1792224000, model: 'V3P' },
+            replay_sent_at: 12.5,
+        });
+    });
+
+    test('rejects other versions', () => {
+        const bytes = new Uint8Array(FRAME);
+        bytes[0] = 2;
+        expect(() => decodeTelemetryFrame(bytes.buffer, buildFieldTable(SCHEMA))).toThrow();
+    });
+});
@@ -0,0 +1,38 @@
+import { renderHook, act } from '@testing-library/react';
+import { vi } from 'vitest';
+import { useWarnings } from '../hooks/useWarnings';
+
+const createSocket = () => {
+    const handlers = {};
+    return {
+        handlers,
+        on: vi.fn((event, handler) => { handlers[event] = handler; }),
+        off: vi.fn((event) => { delete handlers[event]; }),
+        emit: vi.fn(),
+    };
+};
+
+describe('useWarnings', () => {
+    test('requests the current state and applies warning_state changes', () => {
+        const socket = createSocket();
+        const { result } = renderHook(() => useWarnings(socket, true));
+        expect(socket.emit).toHaveBeenCalledWith('warning_state');
+
+        act(() => socket.handlers.warning_state({
+            oil_pressure: { level: 'low', value: 8.5, since: 1000 },
+            water_temp: null,
+        }));
+        expect(result.current.oil_pressure.level).toBe('low');
+        expect(result.current.water_temp).toBeUndefined();
+
+        act(() => socket.handlers.warning_state({ oil_pressure: null }));
+        expect(result.current).toEqual({});
+    });
+
+    test('ignores the backend while disabled', () => {
+        const socket = createSocket();
+        const { result } = renderHook(() => useWarnings(socket, false));
+        expect(socket.on).not.toHaveBeenCalled();
+        expect(result.current).toEqual({});
+    });
+});
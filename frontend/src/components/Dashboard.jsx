@@ -3,10 +3,11 @@ import React from 'react';
 import Gauge from './Gauge';
 import { useWarnings } from '../hooks/useWarnings';
 
-const Dashboard = ({ telemetry, warningsEnabled, config, isStale }) => {
+const Dashboard = ({ telemetry, warningsEnabled, config, isStale, socket }) => {
     const thresholds = config?.sensors?.thresholds || {};
-    const minDuration = config?.ui?.visual_warnings?.min_duration_ms || 5000;
-    const warnings = useWarnings(telemetry, warningsEnabled, thresholds, minDuration);
+    const warnings = useWarnings(socket, warningsEnabled);
+    // Only channels that aren't healthy are listed
+    const sensorHealth = telemetry.sensor_health || {};
 
     return (
         <div className="dashboard-container" style={{ position: 'relative' }}>
@@ -48,7 +49,8 @@ const Dashboard = ({ telemetry, warningsEnabled, config, isStale }) => {
                     label="Oil Press"
                     unit="PSI"
                     color="var(--accent-green)"
-                    warning={warnings.oil_pressure}
+                    warning={Boolean(warnings.oil_pressure)}
+                    fault={sensorHealth.oil_pressure}
                     thresholds={thresholds.oil_pressure}
                 />
                 <Gauge
@@ -58,7 +60,8 @@ const Dashboard = ({ telemetry, warningsEnabled, config, isStale }) => {
                     label="Water Temp"
                     unit="°F"
                     color="var(--accent-blue)"
-                    warning={warnings.water_temp}
+                    warning={Boolean(warnings.water_temp)}
+                    fault={sensorHealth.water_temp}
                     thresholds={thresholds.water_temp}
                 />
                 <Gauge
@@ -68,7 +71,8 @@ const Dashboard = ({ telemetry, warningsEnabled, config, isStale }) => {
                     label="Voltage"
                     unit="V"
                     color="var(--accent-yellow)"
-                    warning={warnings.voltage}
+                    warning={Boolean(warnings.voltage)}
+                    fault={sensorHealth.voltage}
                     thresholds={thresholds.voltage}
                 />
             </div>
@@ -1,11 +1,14 @@
 import React from 'react';
 
-const Gauge = ({ value, min, max, label, unit, color, warning, thresholds }) => {
+const Gauge = ({ value, min, max, label, unit, color, warning, thresholds, fault }) => {
     const radius = 80;
     const stroke = 12;
     const normalizedRadius = radius - stroke * 2;
     const circumference = normalizedRadius * 2 * Math.PI;
 
+    // null while the sensor channel has failed: show '--' with an empty arc
+    const missing = value === null || value === undefined;
+
     // Track peak value
     const [peak, setPeak] = React.useState(min);
 
@@ -18,11 +21,11 @@ const Gauge = ({ value, min, max, label, unit, color, warning, thresholds }) =>
 
     // Reset peak on click
     const handleResetPeak = () => {
-        setPeak(value);
+        setPeak(missing ? min : value);
     };
 
     // Clamp value between min and max
-    const clampedValue = Math.min(Math.max(value, min), max);
+    const clampedValue = missing ? min : Math.min(Math.max(value, min), max);
     const clampedPeak = Math.min(Math.max(peak, min), max);
 
     // Calculate percentage (0 to 1)
@@ -100,10 +103,10 @@ const Gauge = ({ value, min, max, label, unit, color, warning, thresholds }) =>
 
     return (
         <div
-            className={`gauge-container ${warning ? 'warning' : ''}`}
+            className={`gauge-container ${warning ? 'warning' : ''} ${fault ? 'fault' : ''}`}
             onClick={handleResetPeak}
             style={{ cursor: 'pointer' }}
-            title="Click to reset peak"
+            title={fault ? `Sensor ${fault.state}: ${fault.fault}` : 'Click to reset peak'}
         >
             <div className="gauge-wrapper">
                 {/* Glow effect behind the gauge */}
@@ -187,8 +190,8 @@ const Gauge = ({ value, min, max, label, unit, color, warning, thresholds }) =>
 
                 {/* Value Display */}
                 <div className="gauge-value-container">
-                    <span className={`gauge-value ${warning ? 'text-red-500' : ''}`} style={{ color: warning ? 'var(--accent-red)' : 'white' }}>
-                        {Math.round(value)}
+                    <span className={`gauge-value ${warning ? 'text-red-500' : ''}`} style={{ color: warning ? 'var(--accent-red)' : (missing ? 'var(--text-secondary)' : 'white') }}>
+                        {missing ? '--' : Math.round(value)}
                     </span>
                     <span className="gauge-unit">{unit}</span>
                 </div>
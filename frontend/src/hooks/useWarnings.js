@@ -1,10 +1,11 @@
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect } from 'react';
 
-const DEFAULT_MIN_WARNING_DURATION = 5000; // 5 seconds in milliseconds
-
-export const useWarnings = (telemetry, enabled = true, thresholds = {}, minDuration = DEFAULT_MIN_WARNING_DURATION) => {
+// Threshold warnings are evaluated by the backend on every sample. It sends
+// warning_state with {metric: {level, value, since} | null} whenever a
+// warning starts (object) or clears (null), and the full state on connect
+// or when asked.
+export const useWarnings = (socket, enabled = true) => {
     const [activeWarnings, setActiveWarnings] = useState({});
-    const warningTimers = useRef({});
 
     useEffect(() => {
         if (!enabled) {
@@ -12,46 +13,25 @@ export const useWarnings = (telemetry, enabled = true, thresholds = {}, minDurat
             return;
         }
 
-        const checkWarnings = () => {
-            const now = Date.now();
+        const onWarningState = (changes) => {
             setActiveWarnings(prev => {
                 const next = { ...prev };
-                let changed = false;
-
-                Object.keys(thresholds).forEach(key => {
-                    const value = telemetry[key];
-                    const threshold = thresholds[key];
-                    if (value === undefined || !threshold) return;
-
-                    const isLow = threshold.min !== undefined && value < threshold.min;
-                    const isHigh = threshold.max !== undefined && value > threshold.max;
-                    const isTriggered = isLow || isHigh;
-
-                    if (isTriggered) {
-                        // Extend expiration
-                        warningTimers.current[key] = now + minDuration;
-                        if (!next[key]) {
-                            next[key] = true;
-                            changed = true;
-                        }
+                Object.entries(changes).forEach(([metric, warning]) => {
+                    if (warning) {
+                        next[metric] = warning;
                     } else {
-                        // Check expiration
-                        if (next[key] && now >= (warningTimers.current[key] || 0)) {
-                            delete next[key];
-                            changed = true;
-                        }
+                        delete next[metric];
                     }
                 });
-
-                return changed ? next : prev;
+                return next;
             });
         };
 
-        checkWarnings();
-        const interval = setInterval(checkWarnings, 500); // Check every 500ms
-        return () => clearInterval(interval);
-
-    }, [telemetry, enabled, thresholds, minDuration]);
+        socket.on('warning_state', onWarningState);
+        // Ask for the current state: warnings may have started before this view mounted
+        socket.emit('warning_state');
+        return () => socket.off('warning_state', onWarningState);
+    }, [socket, enabled]);
 
     return activeWarnings;
 };
@@ -0,0 +1,69 @@
+// Decoder for the backend's compact binary telemetry frames (backend/wire.py).
+// The field table comes from the backend's telemetry_format reply, so new
+// fields need no frontend change.
+
+export const WIRE_VERSION = 1;
+const EXTRAS_ID = 255;
+
+const READERS = {
+    f: { size: 4, read: (view, offset) => view.getFloat32(offset, true) },
+    d: { size: 8, read: (view, offset) => view.getFloat64(offset, true) },
+    '?': { size: 1, read: (view, offset) => view.getUint8(offset) !== 0 },
+};
+
+export const buildFieldTable = (schema) => {
+    const table = {};
+    (schema?.fields || []).forEach(({ id, key, type }) => {
+        table[id] = { key, type };
+    });
+    return table;
+};
+
+const toDataView = (data) => {
+    if (data instanceof ArrayBuffer) return new DataView(data);
+    return new DataView(data.buffer, data.byteOffset, data.byteLength);
+};
+
+export const decodeTelemetryFrame = (data, fieldTable) => {
+    const view = toDataView(data);
+    const version = view.getUint8(0);
+    if (version !== WIRE_VERSION) {
+        throw new Error(`Unsupported telemetry wire version ${version}`);
+    }
+    const count = view.getUint8(2);
+    const frame = {};
+    const set = (key, value) => {
+        if (key.startsWith('ups.')) {
+            frame.ups = frame.ups || {};
+            frame.ups[key.slice(4)] = value;
+        } else {
+            frame[key] = value;
+        }
+    };
+
+    let offset = 3;
+    for (let i = 0; i < count; i++) {
+        const field = fieldTable[view.getUint8(offset)];
+        if (!field) throw new Error(`Unknown telemetry field id ${view.getUint8(offset)}`);
+        const reader = READERS[field.type];
+        let value = reader.read(view, offset + 1);
+        offset += 1 + reader.size;
+        if (Number.isNaN(value)) {
+            value = null;
+        } else if (field.type === 'f') {
+            // Undo float32 noise on values the backend already rounded
+            value = Math.round(value * 10000) / 10000;
+        }
+        set(field.key, value);
+    }
+
+    if (offset < view.byteLength && view.getUint8(offset) === EXTRAS_ID) {
+        const length = view.getUint16(offset + 1, true);
+        const start = view.byteOffset + offset + 3;
+        const extras = JSON.parse(new TextDecoder().decode(new Uint8Array(view.buffer, start, length)));
+        const { ups, ...rest } = extras;
+        Object.assign(frame, rest);
+        if (ups) frame.ups = { ...(frame.ups || {}), ...ups };
+    }
+    return frame;
+};
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Load test the backend's telemetry relay with many concurrent Socket.IO clients.
+
+Connects --clients dashboard clients that only listen, plus --emitters
+simulators that each send telemetry_update at --rate Hz, like
+simulate_telemetry.py does. The backend relays every emitted frame to every
+client (handle_telemetry_update). Each frame carries its emitter, sequence
+number and send time, so listeners can measure relay latency and count
+frames that never arrived.
+
+Backend CPU and memory are sampled from /proc while the test runs. Pass
+--pid, or the script finds a local server.py/app.py process. Latency uses
+wall clocks, so run it on the backend host or on a machine with a synced
+clock. The load generator's own event-loop lag is reported too. If it is
+high, the generator is the bottleneck, not the backend.
+
+Usage:
+    ./load_test.py                                   # 50 clients, 1 emitter at 10 Hz, 30 s
+    ./load_test.py --clients 300 --emitters 3 --rate 20 --duration 60
+    ./load_test.py --clients 100,200,400 --output load.json   # step through client counts
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+import socketio
+
+DEFAULT_URL = "http://localhost:5001"
+
+parser = argparse.ArgumentParser(description="Socket.IO load generator for Mellitainment")
+parser.add_argument("--url", default=DEFAULT_URL, help="Backend Socket.IO URL")
+parser.add_argument("--clients", default="50", help="Listening clients, or a comma-separated list to run in steps")
+parser.add_argument("--emitters", type=int, default=1, help="Simulators emitting telemetry_update")
+parser.add_argument("--rate", type=float, default=10.0, help="Frames per second per emitter")
+parser.add_argument("--duration", type=float, default=30.0, help="Seconds of emitting per step")
+parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which clients connect")
+parser.add_argument("--drain", type=float, default=2.0, help="Seconds to wait for in-flight frames after emitting")
+parser.add_argument("--polling", action="store_true", help="Allow long-polling instead of websocket only")
+parser.add_argument("--pid", type=int, help="Backend process id for CPU/memory (default: auto-detect)")
+parser.add_argument("--output", help="Write the results as JSON to this file")
+args = parser.parse_args()
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def find_backend_pid():
+    """PID of a local python process running the backend, or None."""
+    for entry in Path('/proc').glob('[0-9]*'):
+        try:
+            cmdline = (entry / 'cmdline').read_bytes().split(b'\0')
+        except OSError:
+            continue
+        if any(b'python' in part for part in cmdline[:1]) and \
+                any(part.endswith((b'server.py', b'app.py')) for part in cmdline[1:]):
+            return int(entry.name)
+    return None
+
+
+class ProcessSampler:
+    """Samples CPU % (of one core) and RSS of a process from /proc once a second."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.cpu = []
+        self.rss_mb = []
+
+    def _read(self):
+        with open(f'/proc/{self.pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        ticks = int(fields[11]) + int(fields[12])  # utime + stime
+        with open(f'/proc/{self.pid}/status') as f:
+            rss_kb = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+        return ticks, rss_kb
+
+    async def run(self, stop):
+        hz = os.sysconf('SC_CLK_TCK')
+        try:
+            ticks, _ = self._read()
+            wall = time.monotonic()
+            while not stop.is_set():
+                await asyncio.sleep(1.0)
+                now_ticks, rss_kb = self._read()
+                now = time.monotonic()
+                self.cpu.append((now_ticks - ticks) / hz / (now - wall) * 100)
+                self.rss_mb.append(rss_kb / 1024)
+                ticks, wall = now_ticks, now
+        except (OSError, StopIteration, ValueError) as e:
+            print(f"⚠️ Stopped sampling backend process {self.pid}: {e}")
+
+    def summary(self):
+        if not self.cpu:
+            return None
+        return {
+            'pid': self.pid,
+            'cpu_percent_mean': round(sum(self.cpu) / len(self.cpu), 1),
+            'cpu_percent_max': round(max(self.cpu), 1),
+            'rss_mb_max': round(max(self.rss_mb), 1),
+        }
+
+
+async def monitor_loop_lag(stop, lags, interval=0.05):
+    """Record how late asyncio.sleep wakes up: high values mean this script is saturated."""
+    while not stop.is_set():
+        start = time.monotonic()
+        await asyncio.sleep(interval)
+        lags.append(time.monotonic() - start - interval)
+
+
+async def connect(url):
+    client = socketio.AsyncClient(reconnection=False)
+    transports = None if args.polling else ['websocket']
+    await client.connect(url, transports=transports)
+    return client
+
+
+async def run_step(n_clients):
+    latencies = []
+    received = [0]
+    disconnects = [0]
+    sent = {}
+    measuring = [False]
+
+    def on_telemetry(data):
+        sent_at = data.get('load_sent_at')
+        if sent_at is None or not measuring[0]:
+            return
+        received[0] += 1
+        latencies.append(time.time() - sent_at)
+
+    def on_disconnect():
+        # Ignore the disconnects this script makes when the step ends
+        if measuring[0]:
+            disconnects[0] += 1
+
+    print(f"🔌 Connecting {n_clients} clients over {args.ramp:g}s...")
+    listeners = []
+    failures = 0
+
+    async def open_listener(delay):
+        nonlocal failures
+        await asyncio.sleep(delay)
+        try:
+            client = await connect(args.url)
+        except Exception as e:
+            failures += 1
+            if failures <= 3:
+                print(f"⚠️ Client failed to connect: {e}")
+            return
+        client.on('telemetry_update', on_telemetry)
+        client.on('disconnect', on_disconnect)
+        listeners.append(client)
+
+    await asyncio.gather(*(open_listener(args.ramp * i / max(1, n_clients)) for i in range(n_clients)))
+    emitters = [await connect(args.url) for _ in range(args.emitters)]
+    print(f"✅ {len(listeners)} clients and {len(emitters)} emitters connected ({failures} failed)")
+
+    stop = asyncio.Event()
+    lags = []
+    lag_task = asyncio.create_task(monitor_loop_lag(stop, lags))
+    pid = args.pid or find_backend_pid()
+    process = ProcessSampler(pid) if pid else None
+    process_task = asyncio.create_task(process.run(stop)) if process else None
+
+    async def emit_loop(index, client):
+        interval = 1.0 / args.rate
+        next_send = time.monotonic() + random.uniform(0, interval)
+        end = time.monotonic() + args.duration
+        seq = 0
+        while next_send < end:
+            await asyncio.sleep(max(0.0, next_send - time.monotonic()))
+            await client.emit('telemetry_update', {
+                'oil_pressure': round(random.uniform(20, 80), 1),
+                'water_temp': round(random.uniform(160, 220), 1),
+                'voltage': round(random.uniform(12.5, 14.5), 1),
+                'load_emitter': index,
+                'load_seq': seq,
+                'load_sent_at': time.time(),
+            })
+            seq += 1
+            sent[index] = seq
+            next_send += interval
+
+    measuring[0] = True
+    started = time.monotonic()
+    print(f"📡 Emitting {args.emitters} x {args.rate:g} Hz for {args.duration:g}s...")
+    await asyncio.gather(*(emit_loop(i, client) for i, client in enumerate(emitters)))
+    await asyncio.sleep(args.drain)
+    measuring[0] = False
+    elapsed = time.monotonic() - started
+
+    stop.set()
+    await lag_task
+    if process_task:
+        await process_task
+    await asyncio.gather(*(client.disconnect() for client in listeners + emitters), return_exceptions=True)
+
+    frames_sent = sum(sent.values())
+    expected = frames_sent * len(listeners)
+    latencies.sort()
+    result = {
+        'clients': n_clients,
+        'connected': len(listeners),
+        'connect_failures': failures,
+        'disconnects': disconnects[0],
+        'emitters': args.emitters,
+        'rate_hz': args.rate,
+        'frames_sent': frames_sent,
+        'deliveries_expected': expected,
+        'deliveries_received': received[0],
+        'dropped_percent': round((expected - received[0]) / expected * 100, 2) if expected else 0.0,
+        'deliveries_per_s': round(received[0] / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 1),
+            'p90': round(percentile(latencies, 90) * 1000, 1),
+            'p99': round(percentile(latencies, 99) * 1000, 1),
+            'max': round(latencies[-1] * 1000, 1),
+        } if latencies else None,
+        'generator_loop_lag_ms_max': round(max(lags) * 1000, 1) if lags else None,
+        'backend': process.summary() if process else None,
+    }
+    return result
+
+
+def print_result(result):
+    latency = result['latency_ms']
+    print(f"📊 {result['connected']} clients: {result['deliveries_received']}/{result['deliveries_expected']} "
+          f"deliveries ({result['dropped_percent']}% dropped, {result['disconnects']} disconnects), "
+          f"{result['deliveries_per_s']:.0f}/s")
+    if latency:
+        print(f"   ⏱️ latency p50 {latency['p50']}ms  p90 {latency['p90']}ms  p99 {latency['p99']}ms  max {latency['max']}ms")
+    print(f"   🐢 load generator loop lag max {result['generator_loop_lag_ms_max']}ms")
+    backend = result['backend']
+    if backend:
+        print(f"   🖥️ backend pid {backend['pid']}: CPU mean {backend['cpu_percent_mean']}% "
+              f"max {backend['cpu_percent_max']}%, RSS max {backend['rss_mb_max']}MB")
+    else:
+        print("   🖥️ backend process not found (use --pid for CPU/memory)")
+
+
+async def main():
+    steps = [int(n) for n in args.clients.split(',') if n]
+    results = []
+    for n_clients in steps:
+        result = await run_step(n_clients)
+        print_result(result)
+        results.append(result)
+    if args.output:
+        Path(args.output).write_text(json.dumps({'url': args.url, 'steps': results}, indent=2))
+        print(f"💾 Saved {args.output}")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("🛑 Stopping load test")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Replay a recorded trip through the backend's telemetry_update path.
+
+Reads trip segments written by the backend's trip recorder (data/trips by
+default) and emits each sample as a telemetry_update, exactly like
+simulate_telemetry.py, so the backend relays it to every connected dashboard.
+With --backend the backend replays the trip itself (POST /api/replay), with
+no Socket.IO hop in between.
+
+Usage:
+    ./replay_trip.py --list                 # show recorded trips
+    ./replay_trip.py                        # replay the latest trip in real time
+    ./replay_trip.py --trip trip-20261017-081500 --speed 10
+    ./replay_trip.py --speed max --measure  # load test: no pacing, report relay latency
+    ./replay_trip.py --backend --speed 10   # replay inside the backend
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+import socketio
+
+sys.path.append(str(Path(__file__).parent / 'backend'))
+
+from recorder import list_trips, iter_samples
+from replay import TripReplayer, parse_speed
+
+DEFAULT_URL = "http://localhost:5001"
+DEFAULT_DIR = Path(__file__).parent / 'data' / 'trips'
+
+parser = argparse.ArgumentParser(description="Trip replay for Mellitainment")
+parser.add_argument("--url", default=DEFAULT_URL, help="Backend Socket.IO URL")
+parser.add_argument("--dir", default=str(DEFAULT_DIR), help="Directory containing recorded trips")
+parser.add_argument("--trip", help="Trip id (default: most recent)")
+def speed_arg(value):
+    try:
+        return parse_speed(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+parser.add_argument("--speed", default=1.0, type=speed_arg,
+                    help="Playback speed multiplier (above 0), or 'max' for no pacing")
+parser.add_argument("--loop", action="store_true", help="Restart the trip when it ends")
+parser.add_argument("--measure", action="store_true", help="Measure relay latency of each frame")
+parser.add_argument("--list", action="store_true", help="List recorded trips and exit")
+parser.add_argument("--backend", action="store_true",
+                    help="Have the backend replay the trip from its own trip directory (--trip, --speed, --loop)")
+parser.add_argument("--stop", action="store_true", help="Stop a replay running in the backend and exit")
+args = parser.parse_args()
+
+sio = socketio.Client()
+latencies = []
+
+@sio.event
+def connect():
+    print(f"✅ Connected to {args.url}")
+
+@sio.event
+def disconnect():
+    print("⚠️ Disconnected from backend")
+
+@sio.on('telemetry_update')
+def on_telemetry(data):
+    sent_at = data.get('replay_sent_at')
+    if sent_at is not None:
+        latencies.append(time.time() - sent_at)
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def replay_in_backend():
+    if args.stop:
+        reply = requests.delete(f"{args.url}/api/replay", timeout=5)
+    else:
+        reply = requests.post(f"{args.url}/api/replay", timeout=5, json={
+            'trip': args.trip, 'speed': 'max' if args.speed is None else args.speed, 'loop': args.loop})
+    body = reply.json()
+    if reply.ok:
+        print(f"✅ {body.get('replay') or 'Replay stopped'}")
+    else:
+        print(f"❌ {body.get('message')}")
+
+def main():
+    if args.backend or args.stop:
+        replay_in_backend()
+        return
+    trips = list_trips(args.dir)
+    if args.list:
+        for trip_id, segments in trips.items():
+            print(f"{trip_id}  ({len(segments)} segment{'s' if len(segments) != 1 else ''})")
+        return
+    if not trips:
+        print(f"No trips found in {args.dir}")
+        return
+    trip_id = args.trip or sorted(trips)[-1]
+    if trip_id not in trips:
+        print(f"Unknown trip '{trip_id}'. Use --list to see recorded trips.")
+        return
+    speed = args.speed
+
+    def emit(frame):
+        if args.measure:
+            frame['replay_sent_at'] = time.time()
+        sio.emit('telemetry_update', frame)
+
+    sio.connect(args.url)
+    stop = threading.Event()
+    print(f"▶️ Replaying {trip_id} at {'max' if speed is None else f'{speed:g}x'} speed")
+    try:
+        while True:
+            replayer = TripReplayer(iter_samples(trips[trip_id]), emit, speed=speed)
+            started = time.monotonic()
+            sent = replayer.run(stop)
+            elapsed = time.monotonic() - started
+            print(f"📼 Sent {sent} frames in {elapsed:.1f}s "
+                  f"({sent / elapsed if elapsed else 0:.0f}/s, {replayer.late_frames} late, "
+                  f"max lateness {replayer.max_lateness * 1000:.1f}ms)")
+            if not args.loop:
+                break
+    except KeyboardInterrupt:
+        stop.set()
+        print("🛑 Stopping replay")
+    finally:
+        if args.measure:
+            time.sleep(0.5)  # Let the last relays arrive
+            if latencies:
+                print(f"⏱️ Relay latency over {len(latencies)} frames: "
+                      f"p50 {percentile(latencies, 50) * 1000:.1f}ms, "
+                      f"p99 {percentile(latencies, 99) * 1000:.1f}ms, "
+                      f"max {max(latencies) * 1000:.1f}ms")
+        sio.disconnect()
+
+if __name__ == "__main__":
+    main()
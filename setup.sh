@@ -152,7 +152,7 @@ Type=simple
 User=$USER
 WorkingDirectory=$(pwd)
 Environment=PYTHONUNBUFFERED=1
-ExecStart=$(pwd)/backend/venv/bin/python3 $(pwd)/backend/app.py
+ExecStart=$(pwd)/backend/venv/bin/python3 $(pwd)/backend/server.py
 Restart=always
 RestartSec=3
 # Log settings - 1 hour retention
@@ -7,7 +7,7 @@ echo "🚀 Starting Infotainment Simulation..."
 echo "🐍 Starting Backend..."
 cd /home/mellis/mellitainment/backend
 source venv/bin/activate
-python3 app.py &
+python3 server.py &
 BACKEND_PID=$!
 
 # Start CarPlay Server